@@ -0,0 +1,45 @@
+import pandas as pd
+
+# ===== ANALYTICS HELPERS =====
+# Whole-frame (grouped, vectorized) versions of the per-agency loops the
+# dashboard used to run on every request.
+
+
+def find_dropoffs(df, value_col="normalized", date_col="month", group_col="Agency"):
+    # A drop-off is a row at 0 right after a row above 0 for the same agency
+    # (rows in date order). For each one we also report when the agency
+    # recovered (next row above 0) and how many months it stayed at 0;
+    # drop-offs that haven't recovered yet run to the agency's last row.
+    #
+    # -> DataFrame[agency, date, recovery, duration_months, recovered]
+    columns = ["agency", "date", "recovery", "duration_months", "recovered"]
+    if df.empty:
+        return pd.DataFrame(columns=columns)
+
+    frame = df[[group_col, date_col, value_col]].sort_values([group_col, date_col], kind="stable")
+    groups = frame.groupby(group_col, sort=False, observed=True)
+    values = frame[value_col]
+    previous = groups[value_col].shift(1)
+    is_drop = (previous > 0) & (values == 0)
+    if not is_drop.any():
+        return pd.DataFrame(columns=columns)
+
+    # next month with activity, looking forward within each agency
+    active_month = frame[date_col].where(values > 0)
+    next_active = active_month.groupby(frame[group_col], sort=False, observed=True).bfill()
+    last_month = groups[date_col].transform("max")
+
+    drops = frame.loc[is_drop, [group_col, date_col]]
+    recovery = next_active[is_drop]
+    recovered = recovery.notna()
+    # months at zero: up to the recovery, or through the last row if still at zero
+    end = recovery.where(recovered, last_month[is_drop] + pd.DateOffset(months=1))
+    duration = (end.dt.year - drops[date_col].dt.year) * 12 + (end.dt.month - drops[date_col].dt.month)
+
+    return pd.DataFrame({
+        "agency": drops[group_col].astype(str).to_numpy(),
+        "date": drops[date_col].to_numpy(),
+        "recovery": recovery.to_numpy(),
+        "duration_months": duration.astype("int64").to_numpy(),
+        "recovered": recovered.to_numpy(),
+    })
@@ -0,0 +1,165 @@
+import gzip
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+from flask import Blueprint, Response, request
+
+from data_cache import load_series_versioned
+from figure_cache import LRUCache
+from timeseries import FREQUENCIES
+
+try:
+    import brotli
+except ImportError:  # optional (pip install brotli): gzip only
+    brotli = None
+
+# ===== QUERY API (JSON / CSV, outside the Dash callbacks) =====
+#   GET /api/monthly?agency=EPA,DOJ&from=2020-01&to=2024-12&granularity=quarter&format=csv
+# agency     comma-separated and/or repeated (default: every agency)
+# from, to   first / last period start to include, any date pandas parses
+# granularity day | week | month (default) | quarter | year
+# format     json (default) | csv
+# Rows are [period, agency, datasets_created, normalized], only periods with
+# datasets; normalized is the count over the agency's largest period at that
+# granularity (its whole history, like the dashboard's monthly line).
+#
+# Served from the same in-memory time-series engine as the dashboard
+# (data_cache.load_series_versioned). The ETag is the data version + the
+# query, so it changes exactly when the answer can: If-None-Match gets a 304
+# without touching the data, and Cache-Control lets a CDN / browser keep it
+# for INKWELL_API_MAX_AGE seconds. Bodies are gzip (or brotli, when
+# installed) encoded per Accept-Encoding, and the encoded bytes are kept in an
+# LRU per worker, so a repeated query is a dictionary lookup.
+
+API_MAX_AGE = int(os.environ.get("INKWELL_API_MAX_AGE", 300))
+API_MIN_COMPRESS = 1024  # bytes; smaller bodies go out as they are
+FORMATS = {"json": "application/json", "csv": "text/csv; charset=utf-8"}
+
+blueprint = Blueprint("api", __name__)
+# encoded response bodies, keyed by (ETag base, content encoding)
+response_cache = LRUCache(maxsize=int(os.environ.get("INKWELL_API_CACHE_SIZE", 256)))
+
+
+class BadRequest(ValueError):
+    pass
+
+
+def parse_query(args):
+    # -> canonical query dict (sorted agencies, ISO dates), or BadRequest
+    agencies = sorted({a.strip() for value in args.getlist("agency") for a in value.split(",") if a.strip()})
+    granularity = args.get("granularity", "month")
+    if granularity not in FREQUENCIES:
+        raise BadRequest(f"granularity must be one of {', '.join(FREQUENCIES)}")
+    fmt = args.get("format", "json")
+    if fmt not in FORMATS:
+        raise BadRequest(f"format must be one of {', '.join(FORMATS)}")
+    query = {"agency": agencies, "granularity": granularity, "format": fmt}
+    for name in ("from", "to"):
+        value = args.get(name)
+        try:
+            query[name] = None if not value else pd.Timestamp(value).strftime("%Y-%m-%d")
+        except ValueError:
+            raise BadRequest(f"{name} is not a date: {value!r}")
+    return query
+
+
+def query_etag(version, query):
+    key = json.dumps([version, query], sort_keys=True)
+    return hashlib.sha1(key.encode()).hexdigest()[:20]
+
+
+def choose_encoding():
+    accepted = request.accept_encodings
+    if brotli is not None and accepted["br"]:
+        return "br"
+    if accepted["gzip"]:
+        return "gzip"
+    return None
+
+
+def build_rows(series, query):
+    if query["agency"]:
+        unknown = [a for a in query["agency"] if not series.has(a)]
+        if unknown:
+            raise BadRequest(f"unknown agency: {', '.join(unknown)}")
+    df = series.resample(query["granularity"], query["from"], query["to"], query["agency"] or None)
+    peaks = series.peaks(query["granularity"]).reindex(df["Agency"]).to_numpy("float64")
+    counts = df["datasets_created"].to_numpy("float64")
+    return pd.DataFrame({
+        "period": pd.DatetimeIndex(df["period"]).strftime("%Y-%m-%d"),
+        "agency": df["Agency"].astype(str),
+        "datasets_created": df["datasets_created"].astype("int64"),
+        "normalized": np.divide(counts, peaks, out=np.zeros(len(counts)), where=peaks > 0).round(6),
+    })
+
+
+def render(rows, query, version):
+    if query["format"] == "csv":
+        return rows.to_csv(index=False).encode()
+    return json.dumps({
+        "version": version,
+        "granularity": query["granularity"],
+        "from": query["from"],
+        "to": query["to"],
+        "agencies": sorted(rows["agency"].unique().tolist()),
+        "rows": rows.to_dict("records"),
+    }, separators=(",", ":")).encode()
+
+
+def encode(body, encoding):
+    if encoding == "br":
+        return brotli.compress(body, quality=5)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=6)
+    return body
+
+
+def caching_headers(response, etag):
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = f"public, max-age={API_MAX_AGE}"
+    response.headers["Vary"] = "Accept-Encoding"
+    response.headers["Access-Control-Allow-Origin"] = "*"  # the static site reads it from another origin
+    return response
+
+
+def error(status, message):
+    response = Response(json.dumps({"error": message}), status=status, mimetype="application/json")
+    response.headers["Access-Control-Allow-Origin"] = "*"
+    return response
+
+
+@blueprint.route("/api/monthly")
+def monthly():
+    try:
+        query = parse_query(request.args)
+    except BadRequest as e:
+        return error(400, str(e))
+    series, version = load_series_versioned()
+    if series is None:
+        return error(503, "no data yet")
+
+    wanted = choose_encoding()
+    base = query_etag(version, query)
+    # one ETag per encoding (the bytes differ), all of them still valid while
+    # the data version is: a cache holding any of them gets its 304
+    for etag in (base, f"{base}-gzip", f"{base}-br"):
+        if request.if_none_match.contains_weak(etag):
+            return caching_headers(Response(status=304), etag)
+
+    cached = response_cache.get((base, wanted))
+    if cached is None:
+        try:
+            body = render(build_rows(series, query), query, version)
+        except BadRequest as e:
+            return error(400, str(e))
+        encoding = wanted if len(body) >= API_MIN_COMPRESS else None
+        cached = (encode(body, encoding), encoding)
+        response_cache.put((base, wanted), cached)
+    payload, encoding = cached
+    response = Response(payload, mimetype=FORMATS[query["format"]])
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    return caching_headers(response, base if encoding is None else f"{base}-{encoding}")
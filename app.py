@@ -1,15 +1,101 @@
 import dash
 from dash import dcc, html
-from dash.dependencies import Input, Output
+from dash.dependencies import Input, Output, State, ClientsideFunction
+import numpy as np
 import pandas as pd
-import plotly.express as px
 import os
+import threading
+import time
+from flask import jsonify, request, g, Response
+
+from data_cache import (
+    load_combined_versioned, load_agency_monthly, load_rollups, load_timeseries, load_timeseries_versioned, cache_stats
+)
+from data.rollups import (
+    recent_months, window_cutoff, window_totals, slope_series, lookup_window_totals, lookup_slope_series
+)
+from figure_cache import FigureCache
+from analytics import find_dropoffs
+from downsample import downsample_lines, aggregate_bars, sum_bars, MAX_LINE_POINTS, MAX_BARS
+from data import metrics
+from data import store
+from data import registry
+from data.metrics import stage, stage_timer, timed_callback
+import refresh
+import api
+from timeseries import EPOCH, FREQUENCIES
 
 # ===== STEP 3: DASHBOARD IT======
 app = dash.Dash(__name__)
 server = app.server 
 app.title = "Dataset Transparency Dashboard"
 
+# Hit/miss/reload counters for the in-memory caches (per worker)
+@server.route("/cache-stats")
+def dataset_cache_stats():
+    return jsonify({"datasets": cache_stats(), "figures": figure_cache.stats(), "api_responses": api.response_cache.stats()})
+
+# Stage / callback / request timing histograms (Prometheus text format), plus
+# the last data/fetch.py run if it left data/fetch_metrics.prom behind
+FETCH_METRICS_FILE = os.path.join("data", "fetch_metrics.prom")
+
+@server.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+@server.after_request
+def record_request_time(response):
+    start = g.pop("request_start", None)
+    if start is not None:
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        metrics.REQUEST_SECONDS.observe(time.perf_counter() - start, route, str(response.status_code))
+    return response
+
+@server.route("/metrics")
+def prometheus_metrics():
+    if not os.path.exists(FETCH_METRICS_FILE):
+        return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+    # the fetch families come from the file, also when refresh.py ran the
+    # pipeline in this process (same registry)
+    text = metrics.render(metrics.APP_METRICS)
+    with open(FETCH_METRICS_FILE) as f:
+        text += f.read()
+    return Response(text, mimetype="text/plain; version=0.0.4")
+
+# Per-agency last refresh time / duration / error from the background
+# scheduler (INKWELL_REFRESH=1, see refresh.py)
+@server.route("/refresh-status")
+def refresh_status():
+    return jsonify(refresh.status())
+
+# JSON / CSV query API for non-Dash consumers (services/dashboard, reports),
+# cacheable by ETag / Cache-Control, see api.py
+server.register_blueprint(api.blueprint)
+
+# Dropdown choices (also used to pre-warm the figure cache)
+WINDOW_OPTIONS = [
+    {"label": "15 years", "value": 180},
+    {"label": "10 years", "value": 120},
+    {'label': '5 years', 'value': 60},
+    {'label': '1 year', 'value': 12},
+    {"label": "6 months", "value": 6},
+    {'label': '3 months', 'value': 3}
+]
+SLOPE_MONTH_OPTIONS = [{"label": month, "value": i} for i, month in enumerate([
+    "January", "February", "March", "April", "May", "June",
+    "July", "August", "September", "October", "November", "December"
+], 1)]
+# Single-agency chart resolution; "auto" is monthly, summed up for long ranges
+GRANULARITY_OPTIONS = [
+    {"label": "Auto", "value": "auto"},
+    {"label": "Daily", "value": "day"},
+    {"label": "Weekly", "value": "week"},
+    {"label": "Monthly", "value": "month"},
+    {"label": "Quarterly", "value": "quarter"},
+    {"label": "Yearly", "value": "year"}
+]
+RESOLUTION_LABELS = {"day": "daily", "week": "weekly", "month": "monthly", "quarter": "quarterly", "year": "yearly"}
+
 # Update your layout
 app.layout = html.Div(
     style={
@@ -43,14 +129,7 @@ app.layout = html.Div(
         html.Label("Select Time Window:", style={"marginTop": "10px"}),
         dcc.Dropdown(
             id='month-window',
-            options=[
-                {"label": "15 years", "value": 180},
-                {"label": "10 years", "value": 120},
-                {'label': '5 years', 'value': 60},
-                {'label': '1 year', 'value': 12},
-                {"label": "6 months", "value": 6},
-                {'label': '3 months', 'value': 3}
-            ],
+            options=WINDOW_OPTIONS,
             value=6,
             clearable=False,
             style={
@@ -68,10 +147,7 @@ app.layout = html.Div(
         html.Label("Compare Change In Number of Datasets Released (Month Over Year):", style={"marginTop": "20px"}),
         dcc.Dropdown(
             id='slope-month',
-            options=[{"label": month, "value": i} for i, month in enumerate([
-                "January", "February", "March", "April", "May", "June",
-                "July", "August", "September", "October", "November", "December"
-            ], 1)],
+            options=SLOPE_MONTH_OPTIONS,
             value=(pd.Timestamp.today().month - 1) or 12,  # defaults to last month
             clearable=False,
             style={
@@ -90,9 +166,7 @@ app.layout = html.Div(
                     html.Label("Select Agency:", style={"marginBottom": "5px", "display": "block"}),
                     dcc.Dropdown(
                         id='single-agency',
-                        options=[{"label": agency, "value": agency} for agency in [
-                            "CDC", "Census", "DOJ", "EPA", "HHS", "NSF", "NOAA", "USDA"
-                                ]],
+                        options=registry.dropdown_options(),  # every agency in data/registry.py
                         value="CDC",
                         clearable=False,
                         style={
@@ -124,7 +198,22 @@ app.layout = html.Div(
                             "fontSize": "14px"
                 }
             )
-        ])
+        ]),
+                html.Div([
+                    html.Label("Granularity:", style={"marginBottom": "5px", "display": "block"}),
+                    dcc.Dropdown(
+                        id='agency-granularity',
+                        options=GRANULARITY_OPTIONS,
+                        value="auto",
+                        clearable=False,
+                        style={
+                            "width": "200px",
+                            "backgroundColor": "#1e1e1e",
+                            "color": "#ffffff",
+                            "fontSize": "14px"
+                        }
+                    )
+                ])
     ]
 ),
 
@@ -161,102 +250,79 @@ app.layout = html.Div(
     ]
     )
 
-# === CALLBACK: Update Graphs Based on Month Range ===
-
-@app.callback(
-    Output('line-graph', 'figure'),
-    Output('bar-graph', 'figure'),
-    Output('slope-graph', 'figure'),
-    Output('line-graph-explanation', 'children'),
-    Input('month-window', 'value'),
-    Input('slope-month', 'value')
-)
-def update_graphs(months_back, slope_window):
-    # Load all monthly data files
-    combined_df = pd.read_csv("data/combined_monthly.csv", parse_dates=['month'])
+# === FIGURE BUILDERS (pure: data in, figures out) ===
+# plotly.express is imported by the builders themselves, so the server
+# starts answering before it is loaded (first figure pays for it once).
 
+def build_window_figures(combined_df, months_back, rollups=None):
+    import plotly.express as px
     # Filter for selected number of months
-    cutoff = pd.Timestamp.today().replace(day=1) - pd.DateOffset(months=months_back)
-    recent_df = combined_df[combined_df["month"] >= cutoff]
+    with stage("update_graphs", "filter"):
+        recent_df = recent_months(combined_df, months_back)
 
     # === Graph 1: Line Chart with Drop-off Detection
-    fig_line = px.line(
-        recent_df,
-        x="month",
-        y="normalized",
-        color="Agency",
-        title=f"Dataset Releases (Normalized, Last {months_back} Months)",
-        labels={"month": "Month", "normalized": "Relative Activity"},
-        markers=True
-    )
-    fig_line.update_layout(
-        plot_bgcolor="#31363A",
-        paper_bgcolor="#31363A",
-        font_color="#FFFFFF"
-    )
-
-    dropoff_lines = []
-    for agency in recent_df["Agency"].unique():
-        agency_df = recent_df[recent_df["Agency"] == agency].sort_values("month")
-        previous = None
-        for _, row in agency_df.iterrows():
-            if previous and previous > 0 and row["normalized"] == 0:
-                dropoff_lines.append({"agency": agency, "date": row["month"]})
-            previous = row["normalized"]
-    for event in dropoff_lines:
-        fig_line.add_vline(
-            x=event["date"],
-            line_dash="dash",
-            line_color="red",
-            annotation_text=f"{event['agency']} drop-off",
-            annotation_position="top left"
+    # long windows / many agencies: thinned with LTTB and drawn with WebGL
+    with stage("update_graphs", "downsample"):
+        line_df, downsampled = downsample_lines(recent_df, "month", "normalized")
+    with stage("update_graphs", "plot_line"):
+        fig_line = px.line(
+            line_df,
+            x="month",
+            y="normalized",
+            color="Agency",
+            title=f"Dataset Releases (Normalized, Last {months_back} Months)",
+            labels={"month": "Month", "normalized": "Relative Activity"},
+            markers=True,
+            render_mode="webgl" if downsampled else "auto"
+        )
+        fig_line.update_layout(
+            plot_bgcolor="#31363A",
+            paper_bgcolor="#31363A",
+            font_color="#FFFFFF"
         )
-    # === explaination of normalized graphs ===
-    explanation = html.Div(
-    children=f"""
-        📈 This graph shows dataset publication trends over the last {months_back} months for each agency. 
-        The values are normalized: each point represents the number of datasets published in that period 
-        as a proportion of the busiest month on record for that agency (since 2010).
 
-        A value of 1.0 means the agency matched or exceeded its historical peak. 
-        Lower values indicate less activity relative to its own past—not compared to other agencies.
+    with stage("update_graphs", "dropoffs"):
+        for event in find_dropoffs(recent_df).itertuples():
+            fig_line.add_vline(
+                x=event.date,
+                line_dash="dash",
+                line_color="red",
+                annotation_text=f"{event.agency} drop-off",
+                annotation_position="top left"
+            )
 
-        This normalization allows fair trend comparisons without larger publishers like NOAA flattening the scale.
-    """,
-    style={
-        "marginTop": "10px",
-        "marginBottom": "20px",
-        "fontSize": "14px",
-        "lineHeight": "1.6",
-        "color": "#CCCCCC",
-        "width": "100%",
-        "display": "flex", 
-        "justifyContent": "center"},)
-        
-    # === Graph 2: Bar Chart of Totals
-    total_recent = recent_df.groupby("Agency")["datasets_created"].sum().reset_index()
-    fig_bar = px.bar(
-        total_recent,
-        x="Agency",
-        y="datasets_created",
-        title=f"Total Datasets Published (Last {months_back} Months)",
-        labels={"datasets_created": "Total Datasets"},
-        color="Agency"
-    )
-    fig_bar.update_layout(
-        plot_bgcolor="#31363A",
-        paper_bgcolor="#31363A",
-        font_color="#FFFFFF"
-    )
+    # === Graph 2: Bar Chart of Totals (precomputed at fetch time when available)
+    with stage("update_graphs", "totals"):
+        found, total_recent = lookup_window_totals(rollups, months_back)
+        if not found:
+            total_recent = window_totals(recent_df)
+    with stage("update_graphs", "plot_bar"):
+        fig_bar = px.bar(
+            total_recent,
+            x="Agency",
+            y="datasets_created",
+            title=f"Total Datasets Published (Last {months_back} Months)",
+            labels={"datasets_created": "Total Datasets"},
+            color="Agency"
+        )
+        fig_bar.update_layout(
+            plot_bgcolor="#31363A",
+            paper_bgcolor="#31363A",
+            font_color="#FFFFFF"
+        )
+    return fig_line, fig_bar
 
-    # === Graph 3: Slope Chart: Year-over-Year for Selected Month ===
-    target_month = int(slope_window)
-    slope_data = combined_df[combined_df["month"].dt.month == target_month].copy()
 
-    # Get the most recent two years that have data for this month
-    available_years = sorted(slope_data["month"].dt.year.unique(), reverse=True)[:3]
+def build_slope_figure(combined_df, target_month, rollups=None):
+    import plotly.express as px
+    # === Graph 3: Slope Chart: Year-over-Year for Selected Month ===
+    # Series over the most recent (up to three) years that have data for this month
+    with stage("update_graphs", "slope_series"):
+        found, slope_df = lookup_slope_series(rollups, target_month)
+        if not found:
+            slope_df = slope_series(combined_df, target_month)
 
-    if len(available_years) < 2:
+    if slope_df is None:
         # Not enough data — fallback empty chart with message
         fig_slope = px.line(
             pd.DataFrame(columns=["MonthLabel", "datasets_created", "Agency"]),
@@ -274,11 +340,6 @@ def update_graphs(months_back, slope_window):
             align="center"
         )
     else:
-        # Filter for only the selected years
-        slope_data = slope_data[slope_data["month"].dt.year.isin(available_years)]
-        slope_data["MonthLabel"] = slope_data["month"].dt.strftime("%b %Y")
-        slope_df = slope_data.groupby(["Agency", "MonthLabel"])["datasets_created"].sum().reset_index()
-
         fig_slope = px.line(
             slope_df,
             x="MonthLabel",
@@ -297,42 +358,294 @@ def update_graphs(months_back, slope_window):
     )
     fig_slope.update_traces(marker=dict(size=10)  # Adjust size as needed
     )
-    return fig_line, fig_bar, fig_slope, explanation
+    return (fig_slope,)
+
+
+def explain_window(months_back):
+    # === explaination of normalized graphs ===
+    return html.Div(
+    children=f"""
+        📈 This graph shows dataset publication trends over the last {months_back} months for each agency. 
+        The values are normalized: each point represents the number of datasets published in that period 
+        as a proportion of the busiest month on record for that agency (since 2010).
+
+        A value of 1.0 means the agency matched or exceeded its historical peak. 
+        Lower values indicate less activity relative to its own past—not compared to other agencies.
+
+        This normalization allows fair trend comparisons without larger publishers like NOAA flattening the scale.
+    """,
+    style={
+        "marginTop": "10px",
+        "marginBottom": "20px",
+        "fontSize": "14px",
+        "lineHeight": "1.6",
+        "color": "#CCCCCC",
+        "width": "100%",
+        "display": "flex", 
+        "justifyContent": "center"},)
+
+
+# === FIGURE CACHE ===
+# The window figures depend on (window, current month, data version) and the
+# slope figure on (month, data version), so for one data snapshot there are
+# only len(WINDOW_OPTIONS) + 12 distinct builds. Set INKWELL_PREWARM_FIGURES=1
+# to build all of them in the background whenever the data changes.
+figure_cache = FigureCache(maxsize=int(os.environ.get("INKWELL_FIGURE_CACHE_SIZE", 128)))
+PREWARM_FIGURES = os.environ.get("INKWELL_PREWARM_FIGURES", "0") == "1"
+_prewarm_lock = threading.Lock()
+_prewarmed_version = None
+
+
+def window_key(months_back, version):
+    # the cutoff moves with the calendar month, so it is part of the key
+    return ("window", months_back, pd.Timestamp.today().strftime("%Y-%m"), version)
+
+
+def slope_key(target_month, version):
+    return ("slope", target_month, version)
+
+
+def prewarm_figures(combined_df, version):
+    rollups = load_rollups(combined_df, version)
+    for option in WINDOW_OPTIONS:
+        months_back = option["value"]
+        figure_cache.get_or_build(window_key(months_back, version),
+                                  lambda: build_window_figures(combined_df, months_back, rollups))
+    for option in SLOPE_MONTH_OPTIONS:
+        target_month = option["value"]
+        figure_cache.get_or_build(slope_key(target_month, version),
+                                  lambda: build_slope_figure(combined_df, target_month, rollups))
+    print(f"✅ Figure cache pre-warmed for data version {version}")
+
+
+def maybe_prewarm(combined_df, version):
+    global _prewarmed_version
+    if not PREWARM_FIGURES:
+        return
+    with _prewarm_lock:
+        if version == _prewarmed_version:
+            return
+        _prewarmed_version = version
+    threading.Thread(target=prewarm_figures, args=(combined_df, version), daemon=True).start()
+
+
+# === CALLBACK: Update Graphs Based on Month Range ===
+
+@timed_callback("update_graphs")
+def update_graphs(months_back, slope_window):
+    # Load all monthly data files (cached, re-read only when the file changes)
+    with stage("update_graphs", "load"):
+        combined_df, version = load_combined_versioned()
+    maybe_prewarm(combined_df, version)
+
+    with stage("update_graphs", "rollups"):
+        rollups = load_rollups(combined_df, version)
+
+    months_back = int(months_back)
+    target_month = int(slope_window)
+    fig_line, fig_bar = figure_cache.get_or_build(
+        window_key(months_back, version),
+        lambda: build_window_figures(combined_df, months_back, rollups),
+        timer=stage_timer("update_graphs", "window_")
+    )
+    (fig_slope,) = figure_cache.get_or_build(
+        slope_key(target_month, version),
+        lambda: build_slope_figure(combined_df, target_month, rollups),
+        timer=stage_timer("update_graphs", "slope_")
+    )
+    return fig_line, fig_bar, fig_slope, explain_window(months_back)
     
 # === graph 4: Update Single-Agency Monthly Upload Chart ===
-@app.callback(
-    Output("monthly-agency-bar", "figure"),
-    Input("single-agency", "value"),
-    Input("month-range", "value")
-)
-def update_agency_bar(agency, months_back):
+@timed_callback("update_agency_bar")
+def update_agency_bar(agency, months_back, granularity="auto"):
+    import plotly.express as px
 
     if not agency:
         return px.bar(title="No agency selected")
 
-    file = f"data/{agency.lower()}_monthly.csv"
-    if not os.path.exists(file):
-        return px.bar(title=f"No data file found for {agency}")
-
-    df = pd.read_csv(file, parse_dates=["month"])
-    cutoff = pd.Timestamp.today().replace(day=1) - pd.DateOffset(months=months_back)
-    df = df[df["month"] >= cutoff]
-
-    fig = px.bar(
-        df,
-        x="month",
-        y="datasets_created",
-        title=f"{agency} - Monthly Dataset Uploads (Last {months_back} Months)",
-        labels={"month": "Month", "datasets_created": "Datasets Published"},
-        color_discrete_sequence=["#1f77b4"]
+    with stage("update_agency_bar", "load"):
+        series = load_timeseries()
+
+    if series is not None and series.has(agency):
+        # any resolution straight from the daily arrays
+        resolution = "month" if granularity in (None, "auto") else granularity
+        if resolution in ("day", "week") and series.resolutions[store.normalize_agency(agency)] == "month":
+            resolution = "month"  # only monthly counts exist for this agency
+        with stage("update_agency_bar", "filter"):
+            df = series.resample(resolution, start=window_cutoff(months_back), agencies=[agency])
+            df = df.rename(columns={"period": "month"})
+        resolution = RESOLUTION_LABELS[resolution]
+    else:
+        with stage("update_agency_bar", "load_monthly"):
+            df = load_agency_monthly(agency)
+        if df is None:
+            return px.bar(title=f"No data file found for {agency}")
+        with stage("update_agency_bar", "filter"):
+            df = recent_months(df, months_back)
+        resolution = "monthly"
+        if granularity in ("quarter", "year"):
+            # monthly counts sum exactly into quarters / years (day / week
+            # are disabled in the dropdown, see update_granularity_options)
+            with stage("update_agency_bar", "resample"):
+                df = sum_bars(df, "month", "datasets_created", FREQUENCIES[granularity])
+            resolution = RESOLUTION_LABELS[granularity]
+
+    # too many bars for the width: sum into quarters (or years)
+    if granularity in (None, "auto"):
+        with stage("update_agency_bar", "downsample"):
+            df, resolution = aggregate_bars(df, "month", "datasets_created")
+
+    with stage("update_agency_bar", "plot"):
+        fig = px.bar(
+            df,
+            x="month",
+            y="datasets_created",
+            title=f"{agency} - {resolution.capitalize()} Dataset Uploads (Last {months_back} Months)",
+            labels={"month": "Month", "datasets_created": "Datasets Published"},
+            color_discrete_sequence=["#1f77b4"]
+        )
+        fig.update_layout(
+            plot_bgcolor="#31363A",
+            paper_bgcolor="#31363A",
+            font_color="#FFFFFF",
+            xaxis_tickformat="%Y" if resolution == "yearly" else "%b\n%Y"
+        )
+    return fig
+
+
+# === Granularity choices for the selected agency ===
+@timed_callback("update_granularity_options")
+def update_granularity_options(agency, granularity):
+    # Daily / Weekly only where daily counts exist: not without a store (a
+    # fresh checkout has only the monthly CSVs), nor for the monthly-only
+    # agencies. A choice that gets disabled goes back to Auto.
+    series = load_timeseries()
+    daily = (bool(agency) and series is not None and series.has(agency)
+             and series.resolutions[store.normalize_agency(agency)] == "day")
+    options = [dict(option, disabled=option["value"] in ("day", "week") and not daily)
+               for option in GRANULARITY_OPTIONS]
+    if not daily and granularity in ("day", "week"):
+        granularity = "auto"
+    return options, granularity
+
+
+# === CLIENTSIDE MODE ===
+# INKWELL_CLIENTSIDE=1: the whole (compact) series goes to the browser once,
+# into the `series-store` dcc.Store, and the window / range / granularity
+# dropdowns are handled by assets/js/inkwell_clientside.js - no round trip,
+# no server CPU per interaction. Only the slope chart stays server-side.
+# Off by default; the server callbacks above are the fallback.
+CLIENTSIDE = os.environ.get("INKWELL_CLIENTSIDE", "0") == "1"
+
+
+def build_series_payload(combined_df, series):
+    import plotly.express as px
+    import plotly.io as pio
+    # columnar arrays, agencies as indexes into `agencies` (in groupby order)
+    agencies = [str(a) for a in combined_df.groupby("Agency", observed=True).size().index]
+    codes = pd.Categorical(combined_df["Agency"].astype(str), categories=agencies).codes
+    template = pio.templates[pio.templates.default]
+    payload = {
+        "agencies": agencies,
+        "monthly": {
+            "agency": codes.tolist(),
+            "month": combined_df["month"].dt.strftime("%Y-%m-%d").tolist(),
+            "count": combined_df["datasets_created"].astype("int64").tolist(),
+            "normalized": combined_df["normalized"].astype("float64").tolist(),
+        },
+        "daily": None,
+        "lod": {"max_points": MAX_LINE_POINTS, "max_bars": MAX_BARS},
+        "template": template,
+        "colors": list(template.layout.colorway or px.colors.qualitative.Plotly),
+        "explanation": explain_window("{months_back}"),
+    }
+    if series is not None:
+        # non-zero days only: (agency row, day ordinal since EPOCH, count)
+        rows, days = np.nonzero(series.values)
+        payload["daily"] = {
+            "agencies": series.agencies,
+            "resolutions": series.resolutions,
+            "epoch": str(EPOCH),
+            "agency": rows.tolist(),
+            "day": days.tolist(),
+            "count": series.values[rows, days].tolist(),
+        }
+    return payload
+
+
+@timed_callback("publish_series")
+def publish_series(pathname):
+    # once per page load; cached per data version like the figures
+    with stage("publish_series", "load"):
+        combined_df, version = load_combined_versioned()
+        series, series_version = load_timeseries_versioned()
+    return figure_cache.get_or_build(
+        ("series", version, series_version),
+        lambda: [build_series_payload(combined_df, series)],
+        timer=stage_timer("publish_series")
+    )[0]
+
+
+@timed_callback("update_slope")
+def update_slope(slope_window):
+    with stage("update_slope", "load"):
+        combined_df, version = load_combined_versioned()
+        rollups = load_rollups(combined_df, version)
+    target_month = int(slope_window)
+    (fig_slope,) = figure_cache.get_or_build(
+        slope_key(target_month, version),
+        lambda: build_slope_figure(combined_df, target_month, rollups),
+        timer=stage_timer("update_slope", "slope_")
     )
-    fig.update_layout(
-        plot_bgcolor="#31363A",
-        paper_bgcolor="#31363A",
-        font_color="#FFFFFF",
-        xaxis_tickformat="%b\n%Y"
+    return fig_slope
+
+
+# === CALLBACK REGISTRATION ===
+app.callback(
+    Output("agency-granularity", "options"),
+    Output("agency-granularity", "value"),
+    Input("single-agency", "value"),
+    State("agency-granularity", "value")
+)(update_granularity_options)
+if CLIENTSIDE:
+    app.layout.children += [dcc.Store(id="series-store"), dcc.Location(id="url")]
+    app.callback(Output("series-store", "data"), Input("url", "pathname"))(publish_series)
+    app.callback(Output('slope-graph', 'figure'), Input('slope-month', 'value'))(update_slope)
+    app.clientside_callback(
+        ClientsideFunction(namespace="inkwell", function_name="windowFigures"),
+        Output('line-graph', 'figure'),
+        Output('bar-graph', 'figure'),
+        Output('line-graph-explanation', 'children'),
+        Input('month-window', 'value'),
+        Input("series-store", "data")
     )
-    return fig
+    app.clientside_callback(
+        ClientsideFunction(namespace="inkwell", function_name="agencyBar"),
+        Output("monthly-agency-bar", "figure"),
+        Input("single-agency", "value"),
+        Input("month-range", "value"),
+        Input("agency-granularity", "value"),
+        Input("series-store", "data")
+    )
+else:
+    app.callback(
+        Output('line-graph', 'figure'),
+        Output('bar-graph', 'figure'),
+        Output('slope-graph', 'figure'),
+        Output('line-graph-explanation', 'children'),
+        Input('month-window', 'value'),
+        Input('slope-month', 'value')
+    )(update_graphs)
+    app.callback(
+        Output("monthly-agency-bar", "figure"),
+        Input("single-agency", "value"),
+        Input("month-range", "value"),
+        Input("agency-granularity", "value")
+    )(update_agency_bar)
+
+# === BACKGROUND REFRESH ===
+if refresh.REFRESH_ENABLED:
+    refresh.start_background_refresh()
 
 # === RUN THE APP ===
 if __name__ == '__main__':
@@ -0,0 +1,265 @@
+// ===== CLIENTSIDE DASHBOARD (INKWELL_CLIENTSIDE=1) =====
+// Browser versions of build_window_figures / update_agency_bar in app.py.
+// The server sends the data once into the `series-store` dcc.Store (see
+// build_series_payload); after that, window / range / granularity changes
+// are computed here without a round trip.
+
+(function () {
+    var BG = "#31363A";
+    var DAY_MS = 86400000;
+
+    function isoDate(ms) {
+        return new Date(ms).toISOString().slice(0, 10);
+    }
+
+    function windowStart(monthsBack) {
+        // same cutoff as data/rollups.window_cutoff: first of this month,
+        // minus monthsBack months, at the current time of day
+        var now = new Date();
+        return Date.UTC(now.getFullYear(), now.getMonth() - monthsBack, 1,
+                        now.getHours(), now.getMinutes(), now.getSeconds());
+    }
+
+    function periodStart(ms, granularity) {
+        var d = new Date(ms);
+        var y = d.getUTCFullYear(), m = d.getUTCMonth();
+        switch (granularity) {
+            case "day": return ms;
+            case "week": return ms - ((d.getUTCDay() + 6) % 7) * DAY_MS;  // Monday
+            case "month": return Date.UTC(y, m, 1);
+            case "quarter": return Date.UTC(y, m - (m % 3), 1);
+            default: return Date.UTC(y, 0, 1);
+        }
+    }
+
+    function baseLayout(series, title, xTitle, yTitle) {
+        return {
+            template: series.template,
+            title: {text: title},
+            xaxis: {anchor: "y", domain: [0, 1], title: {text: xTitle}},
+            yaxis: {anchor: "x", domain: [0, 1], title: {text: yTitle}},
+            legend: {tracegroupgap: 0},
+            font: {color: "#FFFFFF"},
+            plot_bgcolor: BG,
+            paper_bgcolor: BG
+        };
+    }
+
+    function placeholder(series, title) {
+        // what px.bar(title=...) gives the server callback
+        return {
+            data: [{type: "bar", name: "", legendgroup: "", showlegend: false, orientation: "v", textposition: "auto",
+                    xaxis: "x", yaxis: "y", marker: {color: series.colors[0], pattern: {shape: ""}},
+                    hovertemplate: "<extra></extra>"}],
+            layout: {template: series.template, title: {text: title}, barmode: "relative", legend: {tracegroupgap: 0},
+                     xaxis: {anchor: "y", domain: [0, 1]}, yaxis: {anchor: "x", domain: [0, 1]}}
+        };
+    }
+
+    function lttb(x, y, threshold) {
+        // indices kept by largest-triangle-three-buckets (downsample.lttb_indices)
+        var n = x.length;
+        if (threshold >= n || threshold < 3) {
+            return x.map(function (_, i) { return i; });
+        }
+        var edges = [];
+        for (var e = 0; e < threshold - 1; e++) {
+            edges.push(Math.floor(1 + e * (n - 2) / (threshold - 2)));
+        }
+        var keep = [0], a = 0;
+        for (var i = 0; i < threshold - 2; i++) {
+            var start = edges[i], end = edges[i + 1];
+            var nextEnd = i + 2 < edges.length ? edges[i + 2] : n;
+            var avgX = 0, avgY = 0;
+            for (var j = end; j < nextEnd; j++) { avgX += x[j]; avgY += y[j]; }
+            avgX /= (nextEnd - end); avgY /= (nextEnd - end);
+            var best = -1, bestIndex = start;
+            for (var k = start; k < end; k++) {
+                var area = Math.abs((x[a] - avgX) * (y[k] - y[a]) - (x[a] - x[k]) * (avgY - y[a]));
+                if (area > best) { best = area; bestIndex = k; }
+            }
+            a = bestIndex;
+            keep.push(a);
+        }
+        keep.push(n - 1);
+        return keep;
+    }
+
+    function explanation(series, monthsBack) {
+        // explain_window() rendered by the server with a "{months_back}" placeholder
+        var div = JSON.parse(JSON.stringify(series.explanation));
+        div.props.children = div.props.children.replace("{months_back}", monthsBack);
+        return div;
+    }
+
+    // === line chart + drop-offs + totals for one month-window ===
+    function windowFigures(monthsBack, series) {
+        var noUpdate = window.dash_clientside.no_update;
+        if (!series || monthsBack === null || monthsBack === undefined) {
+            return [noUpdate, noUpdate, noUpdate];
+        }
+        var monthly = series.monthly;
+        var cutoff = windowStart(Number(monthsBack));
+
+        // rows in the window, grouped by agency in order of first appearance
+        // (the order px gives the line colours)
+        var groups = [], byAgency = {};
+        for (var r = 0; r < monthly.month.length; r++) {
+            if (Date.parse(monthly.month[r]) < cutoff) { continue; }
+            var name = series.agencies[monthly.agency[r]];
+            if (!byAgency[name]) {
+                byAgency[name] = {name: name, index: monthly.agency[r], month: [], normalized: [], count: 0};
+                groups.push(byAgency[name]);
+            }
+            byAgency[name].month.push(monthly.month[r]);
+            byAgency[name].normalized.push(monthly.normalized[r]);
+            byAgency[name].count += monthly.count[r];
+        }
+        var points = groups.reduce(function (sum, g) { return sum + g.month.length; }, 0);
+        var downsampled = points > series.lod.max_points;
+        var perGroup = Math.max(3, Math.floor(series.lod.max_points / Math.max(groups.length, 1)));
+
+        // agencies in groupby order (drop-off markers, bar totals)
+        var sorted = groups.slice().sort(function (a, b) { return a.index - b.index; });
+
+        var shapes = [], annotations = [];
+        sorted.forEach(function (g) {
+            // drop-off: a month at 0 right after a month above 0 (analytics.find_dropoffs)
+            for (var k = 1; k < g.normalized.length; k++) {
+                if (g.normalized[k - 1] > 0 && g.normalized[k] === 0) {
+                    shapes.push({type: "line", x0: g.month[k], x1: g.month[k], xref: "x", y0: 0, y1: 1, yref: "y domain",
+                                 line: {color: "red", dash: "dash"}});
+                    annotations.push({text: g.name + " drop-off", x: g.month[k], xref: "x", y: 1, yref: "y domain",
+                                      showarrow: false, xanchor: "right", yanchor: "top"});
+                }
+            }
+        });
+
+        var lineTraces = groups.map(function (g, i) {
+            var x = g.month, y = g.normalized;
+            if (downsampled) {
+                var keep = lttb(x.map(function (m) { return Date.parse(m); }), y, perGroup);
+                x = keep.map(function (k) { return g.month[k]; });
+                y = keep.map(function (k) { return g.normalized[k]; });
+            }
+            var trace = {
+                type: "scatter",
+                mode: "lines+markers", name: g.name, legendgroup: g.name, showlegend: true,
+                x: x, y: y, xaxis: "x", yaxis: "y", orientation: "v",
+                line: {color: series.colors[i % series.colors.length], dash: "solid"}, marker: {symbol: "circle"},
+                hovertemplate: "Agency=" + g.name + "<br>Month=%{x}<br>Relative Activity=%{y}<extra></extra>"
+            };
+            if (downsampled || points > 1000) {
+                // WebGL, like px's render_mode="webgl" / "auto" over 1000 points
+                trace.type = "scattergl";
+                delete trace.orientation;
+            }
+            return trace;
+        });
+        var lineLayout = baseLayout(series, "Dataset Releases (Normalized, Last " + monthsBack + " Months)",
+                                    "Month", "Relative Activity");
+        if (groups.length) { lineLayout.legend.title = {text: "Agency"}; }
+        if (shapes.length) {
+            lineLayout.shapes = shapes;
+            lineLayout.annotations = annotations;
+        }
+
+        var barTraces = sorted.map(function (g, i) {
+            return {
+                type: "bar", name: g.name, legendgroup: g.name, showlegend: true, orientation: "v",
+                x: [g.name], y: [g.count], xaxis: "x", yaxis: "y", textposition: "auto",
+                marker: {color: series.colors[i % series.colors.length], pattern: {shape: ""}},
+                hovertemplate: "Agency=%{x}<br>Total Datasets=%{y}<extra></extra>"
+            };
+        });
+        var barLayout = baseLayout(series, "Total Datasets Published (Last " + monthsBack + " Months)",
+                                   "Agency", "Total Datasets");
+        if (groups.length) { barLayout.legend.title = {text: "Agency"}; }
+        barLayout.barmode = "relative";
+        barLayout.xaxis.categoryorder = "array";
+        barLayout.xaxis.categoryarray = sorted.map(function (g) { return g.name; });
+
+        return [{data: lineTraces, layout: lineLayout}, {data: barTraces, layout: barLayout}, explanation(series, monthsBack)];
+    }
+
+    // === single-agency bars at any granularity ===
+    function bucket(entries, granularity, cutoff) {
+        // [[start ms, count], ...] -> sorted [[period start ms, sum]] with start >= cutoff
+        var sums = {};
+        entries.forEach(function (entry) {
+            var start = periodStart(entry[0], granularity);
+            sums[start] = (sums[start] || 0) + entry[1];
+        });
+        return Object.keys(sums).map(Number).filter(function (start) {
+            return start >= cutoff && sums[start] > 0;
+        }).sort(function (a, b) { return a - b; }).map(function (start) { return [start, sums[start]]; });
+    }
+
+    function agencyBar(agency, monthsBack, granularity, series) {
+        var noUpdate = window.dash_clientside.no_update;
+        if (!series || monthsBack === null || monthsBack === undefined) {
+            return noUpdate;
+        }
+        if (!agency) {
+            return placeholder(series, "No agency selected");
+        }
+        // daily entries from the time-series engine, else the agency's monthly rows
+        var daily = series.daily, entries = [], r;
+        var row = daily ? daily.agencies.indexOf(agency) : -1;
+        if (row >= 0) {
+            var epoch = Date.parse(daily.epoch);
+            for (r = 0; r < daily.count.length; r++) {
+                if (daily.agency[r] === row) { entries.push([epoch + daily.day[r] * DAY_MS, daily.count[r]]); }
+            }
+        } else {
+            var index = series.agencies.indexOf(agency);
+            for (r = 0; r < series.monthly.count.length; r++) {
+                if (series.monthly.agency[r] === index) {
+                    entries.push([Date.parse(series.monthly.month[r]), series.monthly.count[r]]);
+                }
+            }
+        }
+        if (!entries.length) {
+            return placeholder(series, "No data file found for " + agency);
+        }
+
+        var auto = !granularity || granularity === "auto";
+        var resolution = auto ? "month" : granularity;
+        if ((resolution === "day" || resolution === "week") &&
+                (row < 0 || daily.resolutions[agency] === "month")) {
+            resolution = "month";  // only monthly counts exist for this agency
+        }
+        var cutoff = windowStart(Number(monthsBack));
+        var bars = bucket(entries, resolution, cutoff);
+        if (auto) {
+            // too many bars for the width: sum into quarters (or years)
+            ["quarter", "year"].forEach(function (coarser) {
+                if (bars.length > series.lod.max_bars) {
+                    bars = bucket(bars, coarser, -Infinity);
+                    resolution = coarser;
+                }
+            });
+        }
+        var label = {day: "Daily", week: "Weekly", month: "Monthly", quarter: "Quarterly", year: "Yearly"}[resolution];
+
+        var layout = baseLayout(series, agency + " - " + label + " Dataset Uploads (Last " + monthsBack + " Months)",
+                                "Month", "Datasets Published");
+        layout.barmode = "relative";
+        layout.xaxis.tickformat = resolution === "year" ? "%Y" : "%b\n%Y";
+        return {
+            data: [{
+                type: "bar", name: "", legendgroup: "", showlegend: false, orientation: "v", textposition: "auto",
+                x: bars.map(function (b) { return isoDate(b[0]); }),
+                y: bars.map(function (b) { return b[1]; }),
+                xaxis: "x", yaxis: "y",
+                marker: {color: "#1f77b4", pattern: {shape: ""}},
+                hovertemplate: "Month=%{x}<br>Datasets Published=%{y}<extra></extra>"
+            }],
+            layout: layout
+        };
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        inkwell: {windowFigures: windowFigures, agencyBar: agencyBar, lttb: lttb}
+    });
+})();
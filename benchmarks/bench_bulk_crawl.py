@@ -0,0 +1,126 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import numpy as np
+
+REPO = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, REPO)
+from data.bulk import month_ranges  # noqa: E402
+from data.ckan import CKANClient  # noqa: E402
+from mock_ckan import MockCatalog, serve  # noqa: E402
+
+# ===== BENCHMARK: per-agency crawls vs the bulk facet crawl =====
+# A mock catalog with --orgs organizations of very different sizes (log-normal
+# around --packages, like data.gov: a few huge publishers, many small ones) is
+# counted per organization per month twice:
+#
+#   per-agency   what run() does for every registered agency: one keyset crawl
+#                per org (id + metadata_created), FETCH_AGENCY_WORKERS orgs
+#                at a time sharing one client
+#   bulk         what `fetch.py --all-orgs` does: one rows=0 search per month,
+#                faceted on organization
+#
+# and the two sets of monthly counts are checked against each other. Reports
+# requests, MB and wall time for each, per --orgs value.
+#
+#   python benchmarks/bench_bulk_crawl.py --orgs 10,100,500 --packages 2000 --latency 0.05
+
+RESULTS_DIR = os.path.join(REPO, "benchmarks", "results")
+
+
+def catalog_orgs(n, packages, seed=0):
+    sizes = np.random.default_rng(seed).lognormal(np.log(packages), 1.0, n).astype(int) + 1
+    return {f"org{i:04d}-gov": int(size) for i, size in enumerate(sizes)}
+
+
+def per_agency(base_url, orgs, workers, agency_workers):
+    # -> {(org, "YYYY-MM"): count}
+    counts = Counter()
+    with CKANClient(base_url=base_url, max_workers=workers) as client:
+        def crawl(org):
+            return org, Counter(created[:7] for created in client.created_dates(org))
+
+        with ThreadPoolExecutor(max_workers=agency_workers) as pool:
+            for org, months in pool.map(crawl, orgs):
+                counts.update({(org, month): n for month, n in months.items()})
+    return counts
+
+
+def bulk(base_url, workers, start_year):
+    counts = Counter()
+    with CKANClient(base_url=base_url, max_workers=workers) as client:
+        for start, month in client.monthly_facets(month_ranges(start_year)):
+            if month is None:
+                raise RuntimeError(f"facet search for {start:%Y-%m} failed")
+            counts.update({(org, start.strftime("%Y-%m")): n for org, n in month.items()})
+    return counts
+
+
+def measure(catalog, fn, *args):
+    requests_before, bytes_before = catalog.requests, catalog.bytes_sent
+    start = time.perf_counter()
+    counts = fn(*args)
+    return counts, {
+        "seconds": round(time.perf_counter() - start, 3),
+        "requests": catalog.requests - requests_before,
+        "mb": round((catalog.bytes_sent - bytes_before) / 1e6, 2),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-agency crawls vs the bulk facet crawl")
+    parser.add_argument("--orgs", default="10,100,500", help="comma-separated organization counts")
+    parser.add_argument("--packages", type=int, default=2000, help="median packages per organization")
+    parser.add_argument("--latency", type=float, default=0.05, help="mock seconds per request")
+    parser.add_argument("--workers", type=int, default=8, help="CKANClient max_workers (CKAN_MAX_WORKERS)")
+    parser.add_argument("--agency-workers", type=int, default=6, help="orgs crawled at once (FETCH_AGENCY_WORKERS)")
+    parser.add_argument("--output", default=None, help="results JSON path (default: benchmarks/results/)")
+    args = parser.parse_args()
+
+    print(f"{'orgs':>5} {'packages':>10} {'mode':<11} {'requests':>9} {'MB':>8} {'seconds':>8}")
+    runs = []
+    for n in [int(o) for o in args.orgs.split(",")]:
+        orgs = catalog_orgs(n, args.packages)
+        catalog = MockCatalog(orgs, latency=args.latency)
+        server, base_url = serve(catalog)
+        try:
+            crawled, crawl_stats = measure(catalog, per_agency, base_url, list(orgs), args.workers,
+                                           args.agency_workers)
+            faceted, bulk_stats = measure(catalog, bulk, base_url, args.workers, 2010)
+        finally:
+            server.shutdown()
+        if crawled != faceted:
+            sys.exit(f"⚠️ {n} orgs: bulk counts differ from the per-agency crawl")
+        total = sum(orgs.values())
+        for mode, stats in (("per-agency", crawl_stats), ("bulk", bulk_stats)):
+            runs.append({"orgs": n, "packages": total, "mode": mode, **stats})
+            print(f"{n:>5} {total:>10,} {mode:<11} {stats['requests']:>9} {stats['mb']:>8.2f} {stats['seconds']:>8.2f}")
+
+    results = {
+        "benchmark": "bulk_crawl",
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "config": vars(args),
+        "runs": runs,
+    }
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"bulk_crawl-{results['commit'] or 'nogit'}-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\n✅ Results saved to {output} (monthly counts identical in both modes)")
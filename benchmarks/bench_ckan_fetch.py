@@ -0,0 +1,76 @@
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from data.ckan import CKANClient  # noqa: E402
+from mock_ckan import MockCatalog, serve  # noqa: E402
+
+# ===== BENCHMARK: serial paging vs pooled concurrent CKAN client =====
+# Runs against the local mock server, e.g.
+#   python benchmarks/bench_ckan_fetch.py --packages 20000 --latency 0.5
+
+
+def serial_created_dates(base_url, org):
+    # the loop data/fetch.py used before: bare requests.get, one page at a time
+    search_url = f"{base_url}/api/3/action/package_search"
+    params = {"fq": f"organization:{org}", "rows": 1000, "start": 0}
+    created_dates = []
+    while True:
+        r = requests.get(search_url, params=params)
+        results = r.json()["result"]["results"]
+        if not results:
+            break
+        created_dates.extend(item["metadata_created"] for item in results if item.get("metadata_created"))
+        params["start"] += len(results)
+        if len(results) < 1000:
+            break
+    return created_dates
+
+
+def run_serial(base_url, orgs):
+    return {org: len(serial_created_dates(base_url, org)) for org in orgs}
+
+
+def run_concurrent(base_url, orgs, max_workers, rate_limit):
+    # full records, same as the serial loop, so only concurrency is compared
+    with CKANClient(base_url=base_url, max_workers=max_workers, rate_limit=rate_limit, fields=None) as client:
+        with ThreadPoolExecutor(max_workers=len(orgs)) as pool:
+            jobs = {org: pool.submit(client.created_dates, org) for org in orgs}
+            return {org: len(job.result()) for org, job in jobs.items()}
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serial vs concurrent CKAN fetch benchmark")
+    parser.add_argument("--packages", type=int, default=10000, help="packages per organization")
+    parser.add_argument("--orgs", type=int, default=4, help="number of organizations")
+    parser.add_argument("--latency", type=float, default=0.5, help="mock server seconds per request")
+    parser.add_argument("--workers", type=int, default=8, help="CKANClient max_workers")
+    parser.add_argument("--rate-limit", type=float, default=None, help="CKANClient requests per second")
+    args = parser.parse_args()
+
+    orgs = {f"agency{i}-gov": args.packages for i in range(args.orgs)}
+    catalog = MockCatalog(orgs, latency=args.latency)
+    server, base_url = serve(catalog)
+
+    serial_time, serial_counts = timed(run_serial, base_url, orgs)
+    serial_requests = catalog.requests
+    concurrent_time, concurrent_counts = timed(run_concurrent, base_url, orgs, args.workers, args.rate_limit)
+    server.shutdown()
+
+    assert serial_counts == concurrent_counts, (serial_counts, concurrent_counts)
+    print(f"catalog: {args.orgs} orgs x {args.packages} packages, {args.latency * 1000:.0f} ms/request")
+    print(f"serial loop      : {serial_time:7.2f} s  ({serial_requests} requests)")
+    print(f"CKANClient       : {concurrent_time:7.2f} s  ({catalog.requests - serial_requests} requests,"
+          f" {args.workers} workers)")
+    print(f"speedup          : {serial_time / concurrent_time:7.1f}x")
@@ -0,0 +1,40 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from data.ckan import CKANClient, LIGHT_FIELDS  # noqa: E402
+from mock_ckan import MockCatalog, serve  # noqa: E402
+
+# ===== BENCHMARK: full package documents vs fl=id,metadata_created =====
+#   python benchmarks/bench_ckan_projection.py --packages 50000
+# Also checks the fallback against servers that ignore or strip `fl`.
+
+
+def run(base_url, org, fields):
+    with CKANClient(base_url=base_url, fields=fields) as client:
+        start = time.perf_counter()
+        dates = client.created_dates(org)
+        elapsed = time.perf_counter() - start
+        return len(dates), elapsed, client.agency_stats[org]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="CKAN field projection benchmark")
+    parser.add_argument("--packages", type=int, default=20000)
+    parser.add_argument("--latency", type=float, default=0.0)
+    args = parser.parse_args()
+
+    org = "noaa-gov"
+    print(f"{'server':<10} {'mode':<10} {'packages':>9} {'requests':>9} {'MB':>8} {'parse s':>8} {'wall s':>8}")
+    for fl_support in ("yes", "ignore", "strip"):
+        catalog = MockCatalog({org: args.packages}, latency=args.latency, fl_support=fl_support)
+        server, base_url = serve(catalog)
+        runs = [("full", None), ("light", LIGHT_FIELDS)] if fl_support == "yes" else [("light", LIGHT_FIELDS)]
+        for label, fields in runs:
+            count, elapsed, stats = run(base_url, org, fields)
+            assert count == args.packages, count
+            print(f"fl={fl_support:<7} {stats['mode']:<10} {count:>9} {stats['requests']:>9} "
+                  f"{stats['bytes'] / 1e6:>8.1f} {stats['parse_seconds']:>8.2f} {elapsed:>8.2f}")
+        server.shutdown()
@@ -0,0 +1,305 @@
+import argparse
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import requests
+
+REPO = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, REPO)
+from data import rollups  # noqa: E402
+from data import store  # noqa: E402
+
+# ===== BENCHMARK: Dash callback latency under concurrent users =====
+# Builds a scratch data/ directory from data/combined_monthly.csv scaled up to
+# --rows (extra copies of every agency with jittered counts), starts the
+# dashboard under gunicorn with --workers workers (or in-process with
+# --workers 0) and drives /_dash-update-component with a mix of
+# `month-window` / `slope-month` (update_graphs) and `single-agency` /
+# `month-range` / `agency-granularity` (update_agency_bar) requests from
+# --concurrency clients.
+#
+# Reports p50/p95/p99 latency, throughput (total and per worker) and response
+# size per callback; results go to benchmarks/results/*.json.
+#
+#   python benchmarks/bench_dash_callbacks.py --rows 366,100000,1000000 --workers 2
+#   python benchmarks/bench_dash_callbacks.py --no-figure-cache --no-rollups
+
+BASE_FILE = os.path.join(REPO, "data", "combined_monthly.csv")
+RESULTS_DIR = os.path.join(REPO, "benchmarks", "results")
+
+WINDOWS = [180, 120, 60, 12, 6, 3]
+AGENCIES = ["CDC", "Census", "DOJ", "EPA", "HHS", "NSF", "NOAA", "USDA"]
+GRANULARITIES = ["auto", "day", "week", "month", "quarter", "year"]
+
+GRAPHS_OUTPUTS = [("line-graph", "figure"), ("bar-graph", "figure"),
+                  ("slope-graph", "figure"), ("line-graph-explanation", "children")]
+AGENCY_OUTPUTS = [("monthly-agency-bar", "figure")]
+
+
+# === synthetic data ===
+def scaled_combined(rows, seed=0):
+    # today's combined_monthly.csv, shifted so its last month is this month,
+    # plus copies of every agency ("EPA-2", ...) up to about `rows` rows
+    base = pd.read_csv(BASE_FILE, parse_dates=["month"])
+    shift = (pd.Timestamp.today().to_period("M") - base["month"].max().to_period("M")).n
+    base["month"] = base["month"] + pd.DateOffset(months=shift)
+
+    rng = np.random.default_rng(seed)
+    copies = max(1, round(rows / len(base)))
+    frames = [base[["month", "datasets_created", "Agency"]]]
+    for k in range(2, copies + 1):
+        copy = base[["month", "datasets_created", "Agency"]].copy()
+        copy["datasets_created"] = rng.poisson(copy["datasets_created"].to_numpy())
+        copy["Agency"] = copy["Agency"] + f"-{k}"
+        # the pipeline only writes months that had datasets, so no zero rows
+        frames.append(copy[copy["datasets_created"] > 0])
+    df = pd.concat(frames, ignore_index=True)
+    peak = df.groupby("Agency")["datasets_created"].transform("max")
+    df["normalized"] = (df["datasets_created"] / peak.where(peak > 0)).fillna(0.0)
+    return df
+
+
+def build_workdir(workdir, rows, with_rollups, with_store):
+    data_dir = os.path.join(workdir, "data")
+    os.makedirs(data_dir, exist_ok=True)
+    combined = scaled_combined(rows)
+    combined.assign(month=combined["month"].dt.strftime("%Y-%m-%d")).to_csv(
+        os.path.join(data_dir, "combined_monthly.csv"), index=False)
+    for agency in AGENCIES:
+        monthly = combined[combined["Agency"] == agency][["month", "datasets_created", "Agency"]]
+        monthly.assign(month=monthly["month"].dt.strftime("%Y-%m-%d")).to_csv(
+            os.path.join(data_dir, f"{agency.lower()}_monthly.csv"), index=False)
+    if with_store:
+        store_dir = os.path.join(data_dir, "store")
+        store.save("monthly", combined.drop(columns="normalized"), store_dir=store_dir)
+        store.save("combined", combined, replace=True, store_dir=store_dir)
+    if with_rollups:
+        # from the table the dashboard will read (the store normalizes labels)
+        source = store.load("combined", store_dir=os.path.join(data_dir, "store")) if with_store else combined
+        rollups.save_rollups(rollups.build_rollups(source), os.path.join(data_dir, "rollups.json"))
+    return len(combined), combined["Agency"].nunique()
+
+
+# === request mix ===
+def pick(rng, values, default, p_default=0.5):
+    # most visitors keep the dropdown default, the rest pick anything
+    return default if rng.random() < p_default else rng.choice(values)
+
+
+def dash_payload(outputs, inputs, changed):
+    if len(outputs) == 1:
+        output = f"{outputs[0][0]}.{outputs[0][1]}"
+    else:
+        output = ".." + "...".join(f"{i}.{p}" for i, p in outputs) + ".."
+    return {
+        "output": output,
+        "outputs": [{"id": i, "property": p} for i, p in outputs]
+                   if len(outputs) > 1 else {"id": outputs[0][0], "property": outputs[0][1]},
+        "inputs": [{"id": i, "property": "value", "value": v} for i, v in inputs],
+        "changedPropIds": [f"{changed}.value"],
+        "state": [],
+    }
+
+
+def request_mix(n, agency_share, seed=0):
+    rng = random.Random(seed)
+    last_month = (pd.Timestamp.today().month - 1) or 12
+    mix = []
+    for _ in range(n):
+        if rng.random() < agency_share:
+            inputs = [("single-agency", pick(rng, AGENCIES, "CDC")),
+                      ("month-range", pick(rng, list(range(1, 181)), 12)),
+                      ("agency-granularity", pick(rng, GRANULARITIES, "auto", p_default=0.8))]
+            mix.append(("update_agency_bar", dash_payload(AGENCY_OUTPUTS, inputs, rng.choice(inputs)[0])))
+        else:
+            inputs = [("month-window", pick(rng, WINDOWS, 6)),
+                      ("slope-month", pick(rng, list(range(1, 13)), last_month))]
+            mix.append(("update_graphs", dash_payload(GRAPHS_OUTPUTS, inputs, rng.choice(inputs)[0])))
+    return mix
+
+
+# === servers ===
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_gunicorn(workdir, workers, threads, env):
+    port = free_port()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "--chdir", workdir, "--pythonpath", REPO,
+         "-w", str(workers), "--threads", str(threads), "--timeout", "600",
+         "-b", f"127.0.0.1:{port}", "app:server"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 120
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(f"{base_url}/_dash-layout", timeout=5).status_code == 200:
+                return proc, base_url
+        except requests.ConnectionError:
+            pass
+        if proc.poll() is not None:
+            break
+        time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError("gunicorn did not come up")
+
+
+class HTTPClient:
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self._local = threading.local()
+
+    def post(self, payload):
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        r = session.post(f"{self.base_url}/_dash-update-component", json=payload, timeout=600)
+        return r.status_code, len(r.content)
+
+
+class InProcessClient:
+    # Flask test client, one per thread; no gunicorn, no sockets
+    def __init__(self, server):
+        self.server = server
+        self._local = threading.local()
+
+    def post(self, payload):
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = self.server.test_client()
+        r = client.post("/_dash-update-component", json=payload)
+        return r.status_code, len(r.data)
+
+
+# === load run ===
+def drive(client, mix, concurrency):
+    def one(item):
+        name, payload = item
+        start = time.perf_counter()
+        status, size = client.post(payload)
+        return name, time.perf_counter() - start, status, size
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        samples = list(pool.map(one, mix))
+    return samples, time.perf_counter() - start
+
+
+def summarize(samples, wall, workers):
+    def stats(rows):
+        latencies = np.array([r[1] for r in rows]) * 1000
+        return {
+            "requests": len(rows),
+            "errors": sum(1 for r in rows if r[2] != 200),
+            "p50_ms": round(float(np.percentile(latencies, 50)), 2),
+            "p95_ms": round(float(np.percentile(latencies, 95)), 2),
+            "p99_ms": round(float(np.percentile(latencies, 99)), 2),
+            "mean_payload_kb": round(sum(r[3] for r in rows) / len(rows) / 1024, 1),
+        }
+
+    throughput = len(samples) / wall
+    summary = {
+        "wall_seconds": round(wall, 3),
+        "throughput_rps": round(throughput, 2),
+        "throughput_rps_per_worker": round(throughput / max(workers, 1), 2),
+        "all": stats(samples),
+        "callbacks": {},
+    }
+    for name in sorted({s[0] for s in samples}):
+        summary["callbacks"][name] = stats([s for s in samples if s[0] == name])
+    return summary
+
+
+def print_summary(rows, agencies, summary):
+    print(f"\n📦 {rows:,} rows ({agencies} agencies): {summary['throughput_rps']:.1f} req/s "
+          f"({summary['throughput_rps_per_worker']:.1f} per worker), {summary['wall_seconds']:.1f}s")
+    for name, s in [("all", summary["all"]), *summary["callbacks"].items()]:
+        print(f"   {name:<18} n={s['requests']:<5} p50 {s['p50_ms']:>9.1f} ms  p95 {s['p95_ms']:>9.1f} ms  "
+              f"p99 {s['p99_ms']:>9.1f} ms  {s['mean_payload_kb']:>8.1f} KB"
+              + (f"  ⚠️ {s['errors']} errors" if s["errors"] else ""))
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load / latency benchmark for the dashboard callbacks")
+    parser.add_argument("--rows", default="366,10000,100000", help="comma-separated combined_monthly sizes")
+    parser.add_argument("--requests", type=int, default=300, help="measured requests per size")
+    parser.add_argument("--warmup", type=int, default=20, help="unmeasured requests per size")
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent clients")
+    parser.add_argument("--workers", type=int, default=2, help="gunicorn workers (0 = in-process test client)")
+    parser.add_argument("--threads", type=int, default=1, help="gunicorn threads per worker")
+    parser.add_argument("--agency-share", type=float, default=0.4, help="share of update_agency_bar requests")
+    parser.add_argument("--no-figure-cache", action="store_true", help="INKWELL_FIGURE_CACHE_SIZE=0")
+    parser.add_argument("--no-rollups", action="store_true", help="don't precompute rollups.json")
+    parser.add_argument("--store", action="store_true", help="also build the Parquet store (one partition per agency)")
+    parser.add_argument("--output", default=None, help="results JSON path (default: benchmarks/results/)")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    if args.no_figure_cache:
+        env["INKWELL_FIGURE_CACHE_SIZE"] = "0"
+    os.environ.update(env)
+
+    results = {
+        "benchmark": "dash_callbacks",
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "config": vars(args),
+        "sizes": [],
+    }
+    for target in [int(r) for r in args.rows.split(",")]:
+        workdir = tempfile.mkdtemp(prefix="inkwell-dash-")
+        rows, agencies = build_workdir(workdir, target, not args.no_rollups, args.store)
+        mix = request_mix(args.warmup + args.requests, args.agency_share, seed=target)
+
+        proc = None
+        if args.workers:
+            proc, base_url = start_gunicorn(workdir, args.workers, args.threads, env)
+            client = HTTPClient(base_url)
+        else:
+            # one app per size: the caches are keyed on the file, not the directory
+            os.chdir(workdir)
+            for name in ("app", "data_cache", "figure_cache"):
+                sys.modules.pop(name, None)
+            import app  # noqa: E402
+            client = InProcessClient(app.server)
+        try:
+            drive(client, mix[:args.warmup], args.concurrency)
+            samples, wall = drive(client, mix[args.warmup:], args.concurrency)
+        finally:
+            if proc:
+                proc.terminate()
+                proc.wait()
+
+        summary = summarize(samples, wall, args.workers)
+        print_summary(rows, agencies, summary)
+        results["sizes"].append({"rows": rows, "agencies": agencies, **summary})
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"dash_callbacks-{results['commit'] or 'nogit'}-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\n✅ Results saved to {output}")
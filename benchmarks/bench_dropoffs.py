@@ -0,0 +1,69 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from analytics import find_dropoffs  # noqa: E402
+
+# ===== BENCHMARK: iterrows drop-off loop vs analytics.find_dropoffs =====
+#   python benchmarks/bench_dropoffs.py --agencies 50 --years 15
+
+
+def synthetic_monthly(agencies, years, seed=0):
+    rng = np.random.default_rng(seed)
+    months = pd.date_range("2010-01-01", periods=years * 12, freq="MS")
+    rows = []
+    for a in range(agencies):
+        counts = rng.poisson(40, len(months))
+        counts[rng.random(len(months)) < 0.15] = 0  # sprinkle some silent months
+        rows.append(pd.DataFrame({"month": months, "datasets_created": counts, "Agency": f"AG{a:02d}"}))
+    df = pd.concat(rows, ignore_index=True)
+    df["normalized"] = df["datasets_created"] / df.groupby("Agency")["datasets_created"].transform("max")
+    return df
+
+
+def iterrows_dropoffs(recent_df):
+    # the loop update_graphs used to run
+    dropoff_lines = []
+    for agency in recent_df["Agency"].unique():
+        agency_df = recent_df[recent_df["Agency"] == agency].sort_values("month")
+        previous = None
+        for _, row in agency_df.iterrows():
+            if previous and previous > 0 and row["normalized"] == 0:
+                dropoff_lines.append({"agency": agency, "date": row["month"]})
+            previous = row["normalized"]
+    return dropoff_lines
+
+
+def best_of(fn, df, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(df)
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Drop-off detection micro-benchmark")
+    parser.add_argument("--agencies", type=int, default=50)
+    parser.add_argument("--years", type=int, default=15)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    df = synthetic_monthly(args.agencies, args.years)
+    loop_time, loop_result = best_of(iterrows_dropoffs, df, args.repeat)
+    vec_time, vec_result = best_of(find_dropoffs, df, args.repeat)
+
+    expected = sorted((e["agency"], pd.Timestamp(e["date"])) for e in loop_result)
+    actual = sorted(zip(vec_result["agency"], pd.to_datetime(vec_result["date"])))
+    assert expected == actual, "vectorized drop-offs differ from the iterrows loop"
+
+    print(f"{args.agencies} agencies x {args.years * 12} months = {len(df)} rows, {len(vec_result)} drop-offs")
+    print(f"iterrows loop    : {loop_time * 1000:8.2f} ms")
+    print(f"find_dropoffs    : {vec_time * 1000:8.2f} ms  (also returns recovery + duration)")
+    print(f"speedup          : {loop_time / vec_time:8.1f}x")
@@ -0,0 +1,165 @@
+import argparse
+import csv
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from mock_catalog import MockCDC, MockServerState, SOURCES, serve, urls
+from mock_ckan import MockCatalog
+
+# ===== BENCHMARK: end-to-end refresh of the whole pipeline =====
+# Runs the real data/fetch.py (CKAN agencies + CDC sources + combine +
+# rollups) as a subprocess against benchmarks/mock_catalog.py, in a scratch
+# working directory, twice:
+#
+#   full          `fetch.py --full` on an empty data/ directory
+#   incremental   plain `fetch.py` after the mock publishes new packages
+#
+# and reports wall time, peak RSS of the fetch process, requests and bytes
+# (per source too), and how many of the catalog's packages ended up counted
+# (--fail-rate / --max-rate inject 503s and 429s to check nothing is lost). Results go to benchmarks/results/*.json; pass
+# --compare <older.json> to print the change against an earlier commit.
+#
+#   python benchmarks/bench_fetch_e2e.py --packages 20000 --latency 0.05
+
+REPO = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+FETCH_SCRIPT = os.path.join(REPO, "data", "fetch.py")
+RESULTS_DIR = os.path.join(REPO, "benchmarks", "results")
+
+ORGS = ("epa-gov", "hhs-gov", "doj-gov", "usda-gov", "nsf-gov")
+
+
+def missing_packages(workdir, catalog):
+    # org -> packages in the mock catalog that are not in the saved daily counts
+    missing = {}
+    for org in ORGS:
+        path = os.path.join(workdir, "data", f"{org.split('-')[0]}_dataset_counts.csv")
+        counted = 0
+        if os.path.exists(path):
+            with open(path) as f:
+                rows = list(csv.DictReader(f))
+            counted = sum(int(row["datasets_created"]) for row in rows)
+        missing[org] = catalog.orgs[org] - counted
+    return missing
+
+
+def run_fetch(state, env, workdir, fetch_args, log):
+    # one fetch.py process -> measurements for this run
+    state.reset_counters()
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, FETCH_SCRIPT, *fetch_args], cwd=workdir, env=env,
+                            stdout=log, stderr=subprocess.STDOUT)
+    # wait4 gives the rusage of this child only (peak RSS)
+    _, status, usage = os.wait4(proc.pid, 0)
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    wall = time.perf_counter() - start
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak_rss = usage.ru_maxrss if sys.platform == "darwin" else usage.ru_maxrss * 1024
+    totals = state.totals()
+    return {
+        "exit_code": proc.returncode,
+        "wall_seconds": round(wall, 3),
+        "peak_rss_mb": round(peak_rss / 2**20, 1),
+        "requests": totals["requests"],
+        "bytes": totals["bytes"],
+        "sources": {source: dict(counters) for source, counters in state.counters.items()},
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_run(name, run):
+    print(f"\n📦 {name}: {run['wall_seconds']:.2f}s wall, {run['peak_rss_mb']:.1f} MB peak RSS, "
+          f"{run['requests']} requests, {run['bytes'] / 2**20:.2f} MB"
+          + ("" if run["exit_code"] == 0 else f"  ⚠️ exit code {run['exit_code']}"))
+    for source in SOURCES:
+        c = run["sources"][source]
+        print(f"   {source:<8} {c['requests']:>6} req  {c['bytes'] / 2**20:>8.2f} MB  "
+              f"{c['not_modified']:>3} not modified  {c['failed']:>3} failed  {c['throttled']:>4} throttled")
+    missing = {org: n for org, n in run["missing_packages"].items() if n}
+    print(f"   {'✅ every package counted' if not missing else f'⚠️ packages missing: {missing}'}")
+
+
+def print_comparison(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"\n🔍 vs {os.path.basename(baseline_path)} (commit {baseline.get('commit')})")
+    for name, run in results["runs"].items():
+        old = baseline["runs"].get(name)
+        if not old:
+            continue
+        for metric in ("wall_seconds", "peak_rss_mb", "requests", "bytes"):
+            before, after = old[metric], run[metric]
+            change = f"{(after - before) / before:+.1%}" if before else "n/a"
+            print(f"   {name:<12} {metric:<13} {before:>12} -> {after:<12} {change}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="End-to-end full / incremental refresh benchmark")
+    parser.add_argument("--packages", type=int, default=5000, help="CKAN packages per organization")
+    parser.add_argument("--new-packages", type=int, default=100, help="packages each org publishes before the incremental run")
+    parser.add_argument("--socrata", type=int, default=2000, help="Socrata views")
+    parser.add_argument("--latency", type=float, default=0.05, help="mock seconds per CKAN request")
+    parser.add_argument("--cdc-latency", type=float, default=0.2, help="mock seconds per CDC request")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="probability of a 503 on any request")
+    parser.add_argument("--max-rate", type=float, default=0.0, help="CKAN requests/s the mock allows before 429s")
+    parser.add_argument("--workdir", default=None, help="scratch directory (default: a new temp dir)")
+    parser.add_argument("--output", default=None, help="results JSON path (default: benchmarks/results/)")
+    parser.add_argument("--compare", default=None, help="earlier results JSON to compare against")
+    args = parser.parse_args()
+
+    catalog = MockCatalog({org: args.packages for org in ORGS})
+    state = MockServerState(
+        catalog,
+        MockCDC(socrata=args.socrata),
+        latency={"ckan": args.latency, **{s: args.cdc_latency for s in SOURCES if s != "ckan"}},
+        failures={source: args.fail_rate for source in SOURCES},
+        rate_limits={"ckan": args.max_rate},
+    )
+    server, base_url = serve(state)
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="inkwell-e2e-")
+    os.makedirs(os.path.join(workdir, "data"), exist_ok=True)
+    env = {**os.environ, **urls(base_url)}
+    print(f"🧪 Mock catalog on {base_url}, working in {workdir}")
+
+    runs = {}
+    with open(os.path.join(workdir, "fetch.log"), "w") as log:
+        runs["full"] = run_fetch(state, env, workdir, ["--full"], log)
+        runs["full"]["missing_packages"] = missing_packages(workdir, catalog)
+        print_run("full", runs["full"])
+
+        for org in ORGS:
+            catalog.add_packages(org, args.new_packages)
+        state.cdc.bump()
+        runs["incremental"] = run_fetch(state, env, workdir, [], log)
+        runs["incremental"]["missing_packages"] = missing_packages(workdir, catalog)
+        print_run("incremental", runs["incremental"])
+    server.shutdown()
+
+    results = {
+        "benchmark": "fetch_e2e",
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "config": vars(args),
+        "runs": runs,
+    }
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"fetch_e2e-{results['commit'] or 'nogit'}-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\n✅ Results saved to {output} (fetch log: {os.path.join(workdir, 'fetch.log')})")
+
+    if args.compare:
+        print_comparison(results, args.compare)
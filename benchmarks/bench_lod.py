@@ -0,0 +1,99 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import downsample  # noqa: E402
+from app import build_window_figures  # noqa: E402
+from bench_dash_callbacks import scaled_combined  # noqa: E402
+from plotly.utils import PlotlyJSONEncoder  # noqa: E402
+import plotly.express as px  # noqa: E402
+import json  # noqa: E402
+
+# ===== BENCHMARK: full detail vs level-of-detail figures =====
+# For combined_monthly scaled to --rows, builds the line chart of every
+# window with LOD off (every point, SVG) and on (LTTB + scattergl), and the
+# single-agency bar over 180 months of daily or monthly bars vs aggregated
+# bars. Reports points sent, payload size and build + serialize time; if
+# kaleido is installed also a static render (fig.to_image) as a stand-in for
+# the browser's render time.
+#
+#   python benchmarks/bench_lod.py --rows 366,20000,100000
+
+
+def figure_cost(fig, render):
+    start = time.perf_counter()
+    payload = json.dumps(fig, cls=PlotlyJSONEncoder)
+    serialize = time.perf_counter() - start
+    points = sum(len(trace.x) for trace in fig.data if trace.x is not None)
+    result = {
+        "points": points,
+        "traces": len(fig.data),
+        "type": fig.data[0].type if fig.data else "-",
+        "payload_kb": len(payload) / 1024,
+        "serialize_ms": serialize * 1000,
+    }
+    if render:
+        start = time.perf_counter()
+        fig.to_image(format="png", width=1200, height=500)
+        result["render_ms"] = (time.perf_counter() - start) * 1000
+    return result
+
+
+def with_lod(enabled, build):
+    # LOD "off" = thresholds nobody reaches
+    saved = downsample.MAX_LINE_POINTS, downsample.MAX_BARS
+    if not enabled:
+        downsample.MAX_LINE_POINTS = downsample.MAX_BARS = 10**12
+    try:
+        start = time.perf_counter()
+        fig = build()
+        return fig, (time.perf_counter() - start) * 1000
+    finally:
+        downsample.MAX_LINE_POINTS, downsample.MAX_BARS = saved
+
+
+def agency_bar(daily):
+    df, resolution = downsample.aggregate_bars(daily, "created_date", "datasets_created")
+    return px.bar(df, x="created_date", y="datasets_created", title=f"{resolution} uploads")
+
+
+def print_row(label, mode, build_ms, cost):
+    render = f"{cost['render_ms']:>9.0f} ms" if "render_ms" in cost else "        -"
+    print(f"   {label:<22} {mode:<5} {cost['type']:<10} {cost['traces']:>6} traces {cost['points']:>9,} pts "
+          f"{cost['payload_kb']:>9.1f} KB  build {build_ms:>8.1f} ms  json {cost['serialize_ms']:>7.1f} ms  render {render}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Payload / render cost with and without level of detail")
+    parser.add_argument("--rows", default="366,20000,100000", help="comma-separated combined_monthly sizes")
+    parser.add_argument("--windows", default="180,120,60", help="month-window values")
+    args = parser.parse_args()
+
+    try:
+        import kaleido  # noqa: F401
+        render = True
+    except ImportError:
+        render = False
+        print("⚠️ kaleido not installed: no render timings, payload/points only")
+
+    for rows in [int(r) for r in args.rows.split(",")]:
+        combined = scaled_combined(rows)
+        print(f"\n📦 {len(combined):,} rows, {combined['Agency'].nunique()} agencies "
+              f"(LOD at > {downsample.MAX_LINE_POINTS} points / > {downsample.MAX_BARS} bars)")
+        for months_back in [int(w) for w in args.windows.split(",")]:
+            for enabled in (False, True):
+                fig, build_ms = with_lod(enabled, lambda: build_window_figures(combined, months_back)[0])
+                print_row(f"line, {months_back} months", "on" if enabled else "off", build_ms, figure_cost(fig, render))
+
+    # one agency, 15 years of daily counts (the *_dataset_counts.csv shape)
+    days = pd.date_range(pd.Timestamp.today().normalize() - pd.DateOffset(years=15), pd.Timestamp.today(), freq="D")
+    daily = pd.DataFrame({"created_date": days, "datasets_created": np.random.default_rng(0).poisson(3, len(days))})
+    print(f"\n📦 single agency, {len(daily):,} daily rows")
+    for enabled in (False, True):
+        fig, build_ms = with_lod(enabled, lambda: agency_bar(daily))
+        print_row("bar, 15 years daily", "on" if enabled else "off", build_ms, figure_cost(fig, render))
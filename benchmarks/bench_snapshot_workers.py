@@ -0,0 +1,167 @@
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+REPO = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, REPO)
+from data import store  # noqa: E402
+
+# ===== BENCHMARK: per-worker data memory, shared snapshot vs private copies =====
+# Builds a synthetic store (--agencies agencies with a daily row for every day
+# since 2010, their monthly and combined tables), then starts W worker
+# processes at once that each load what a dashboard worker loads (combined,
+# every agency's monthly rows, the daily time-series engine) through
+# data_cache, and measures, while they are all alive:
+#
+#   load s     slowest worker's time to its first complete data set
+#   publishes  how many workers parsed the store (snapshot mode)
+#   RSS / PSS  summed over the workers, minus W idle workers that only
+#              imported the modules - i.e. what the data itself costs. PSS
+#              splits shared pages between the processes that map them.
+#
+# once with the shared snapshot (a fresh one: the first worker publishes it)
+# and once with INKWELL_SNAPSHOT=0.
+#
+#   python benchmarks/bench_snapshot_workers.py --agencies 200 --workers 1,2,4,8
+
+RESULTS_DIR = os.path.join(REPO, "benchmarks", "results")
+
+WORKER = """
+import json, sys, time
+sys.path.insert(0, {repo!r})
+import data_cache
+from data import store
+print(json.dumps({{"ready": True}}), flush=True)
+sys.stdin.readline()  # go
+start = time.perf_counter()
+if {load}:
+    combined, _ = data_cache.load_combined_versioned()
+    agencies = [str(a) for a in combined["Agency"].cat.categories]
+    for agency in agencies:
+        data_cache.load_agency_monthly(agency)
+    data_cache.load_timeseries_versioned()[0].resample("month")
+stats = data_cache.cache_stats().get("snapshot", {{}})
+print(json.dumps({{"seconds": time.perf_counter() - start, "publishes": stats.get("publishes", 0)}}), flush=True)
+sys.stdin.readline()  # measured, exit
+"""
+
+
+def build_store(workdir, agencies):
+    store_dir = os.path.join(workdir, "data", "store")
+    days = pd.date_range("2010-01-01", pd.Timestamp.today().normalize(), freq="D")
+    rng = np.random.default_rng(0)
+    names = [f"A{i:04d}" for i in range(agencies)]
+    daily = pd.DataFrame({
+        "created_date": np.tile(days, agencies),
+        "Agency": np.repeat(names, len(days)),
+        "datasets_created": rng.poisson(3, len(days) * agencies),
+    })
+    monthly = daily.assign(month=daily["created_date"].dt.to_period("M").dt.start_time)
+    monthly = monthly.groupby(["month", "Agency"], as_index=False)["datasets_created"].sum()
+    combined = monthly.assign(
+        normalized=monthly["datasets_created"] / monthly.groupby("Agency")["datasets_created"].transform("max"))
+    store.save("daily", daily, store_dir=store_dir)
+    store.save("monthly", monthly, store_dir=store_dir)
+    store.save("combined", combined, replace=True, store_dir=store_dir)
+    return len(daily), len(combined)
+
+
+def memory(pids):
+    totals = {"Rss": 0, "Pss": 0}
+    for pid in pids:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                name, _, value = line.partition(":")
+                if name in totals:
+                    totals[name] += int(value.split()[0])  # kB
+    return totals["Rss"] / 1024, totals["Pss"] / 1024
+
+
+def read_report(proc):
+    # next JSON line from a worker (the publishing worker also prints progress)
+    while True:
+        line = proc.stdout.readline()
+        if not line or line.startswith("{"):
+            return json.loads(line)
+
+
+def run_workers(workdir, n, snapshot, load=True):
+    env = {**os.environ, "INKWELL_SNAPSHOT": "1" if snapshot else "0"}
+    code = WORKER.format(repo=REPO, load=load)
+    procs = [subprocess.Popen([sys.executable, "-c", code], cwd=workdir, env=env, text=True,
+                              stdin=subprocess.PIPE, stdout=subprocess.PIPE) for _ in range(n)]
+    for proc in procs:
+        read_report(proc)  # imports done
+    for proc in procs:
+        proc.stdin.write("\n")
+        proc.stdin.flush()
+    reports = [read_report(proc) for proc in procs]
+    rss, pss = memory([proc.pid for proc in procs])
+    for proc in procs:
+        proc.stdin.write("\n")
+        proc.stdin.flush()
+        proc.wait()
+    return {
+        "load_seconds": round(max(r["seconds"] for r in reports), 3),
+        "publishes": sum(r["publishes"] for r in reports),
+        "rss_mb": rss,
+        "pss_mb": pss,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Worker memory with and without the shared data snapshot")
+    parser.add_argument("--agencies", type=int, default=200, help="synthetic agencies (one daily row per day each)")
+    parser.add_argument("--workers", default="1,2,4,8", help="comma-separated worker counts")
+    parser.add_argument("--output", default=None, help="results JSON path (default: benchmarks/results/)")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="inkwell-snapshot-")
+    daily_rows, combined_rows = build_store(workdir, args.agencies)
+    print(f"🧪 {daily_rows:,} daily / {combined_rows:,} combined rows, {args.agencies} agencies in {workdir}")
+    print(f"{'mode':<10} {'workers':>7} {'load s':>8} {'publishes':>9} {'RSS MB':>9} {'PSS MB':>9} {'PSS/worker':>10}")
+
+    runs = []
+    for n in [int(w) for w in args.workers.split(",")]:
+        idle = run_workers(workdir, n, snapshot=False, load=False)
+        for mode, snapshot in (("snapshot", True), ("private", False)):
+            shutil.rmtree(os.path.join(workdir, "data", "snapshot"), ignore_errors=True)
+            result = run_workers(workdir, n, snapshot)
+            # what the data costs on top of n workers that only imported the code
+            result["rss_mb"] = round(result["rss_mb"] - idle["rss_mb"], 1)
+            result["pss_mb"] = round(result["pss_mb"] - idle["pss_mb"], 1)
+            runs.append({"mode": mode, "workers": n, **result})
+            print(f"{mode:<10} {n:>7} {result['load_seconds']:>8.2f} {result['publishes']:>9} "
+                  f"{result['rss_mb']:>9.1f} {result['pss_mb']:>9.1f} {result['pss_mb'] / n:>10.1f}")
+
+    results = {
+        "benchmark": "snapshot_workers",
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "config": vars(args),
+        "daily_rows": daily_rows,
+        "combined_rows": combined_rows,
+        "runs": runs,
+    }
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"snapshot_workers-{results['commit'] or 'nogit'}-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\n✅ Results saved to {output}")
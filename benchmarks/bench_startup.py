@@ -0,0 +1,146 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import requests
+
+REPO = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, REPO)
+from bench_dash_callbacks import GRAPHS_OUTPUTS, build_workdir, dash_payload, free_port  # noqa: E402
+
+# ===== BENCHMARK: startup time of the fetch CLI and the Dash server =====
+# Fresh processes in a scratch data/ directory (bench_dash_callbacks' data at
+# --rows rows), median of --repeat runs each:
+#
+#   fetch import     `import data.fetch` in a new interpreter
+#   fetch dry run    `python data/fetch.py --dry-run`, process start to exit
+#   app import       `import app` in a new interpreter
+#   server first /   gunicorn app:server (1 worker) start to the first 200 on /
+#   first callback   the page's first update_graphs request right after that
+#   warm callback    the same request again
+#
+# plus which heavy modules (dash, plotly.express, bs4, feedparser) each
+# import pulled in.
+#
+#   python benchmarks/bench_startup.py --repeat 5
+
+RESULTS_DIR = os.path.join(REPO, "benchmarks", "results")
+HEAVY_MODULES = ("dash", "plotly.express", "bs4", "feedparser", "IPython")
+
+IMPORT = """
+import json, sys, time
+sys.path.insert(0, {path!r})
+start = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start
+print(json.dumps({{"seconds": seconds, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def time_import(workdir, module, path):
+    code = IMPORT.format(path=path, module=module, heavy=HEAVY_MODULES)
+    out = subprocess.run([sys.executable, "-c", code], cwd=workdir, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def time_dry_run(workdir):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, os.path.join(REPO, "data", "fetch.py"), "--dry-run"],
+                   cwd=workdir, capture_output=True, check=True)
+    return time.perf_counter() - start
+
+
+def time_server(workdir):
+    # gunicorn start -> first page, then the page's first and second callback
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "--chdir", workdir, "--pythonpath", REPO, "-w", "1",
+         "-b", f"127.0.0.1:{port}", "app:server"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while True:
+            try:
+                if requests.get(base_url, timeout=30).status_code == 200:
+                    break
+            except requests.ConnectionError:
+                if proc.poll() is not None or time.perf_counter() - start > 120:
+                    raise RuntimeError("gunicorn did not come up")
+                time.sleep(0.01)
+        first_page = time.perf_counter() - start
+        last_month = (datetime.now().month - 1) or 12
+        payload = dash_payload(GRAPHS_OUTPUTS, [("month-window", 6), ("slope-month", last_month)], "month-window")
+        callbacks = []
+        for _ in range(2):
+            t = time.perf_counter()
+            requests.post(f"{base_url}/_dash-update-component", json=payload, timeout=120).raise_for_status()
+            callbacks.append(time.perf_counter() - t)
+    finally:
+        proc.terminate()
+        proc.wait()
+    return first_page, callbacks[0], callbacks[1]
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Startup time of the fetch CLI and the Dash server")
+    parser.add_argument("--rows", type=int, default=366, help="combined rows in the scratch data directory")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per measurement (median reported)")
+    parser.add_argument("--output", default=None, help="results JSON path (default: benchmarks/results/)")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="inkwell-startup-")
+    build_workdir(workdir, args.rows, with_rollups=True, with_store=True)
+    print(f"🧪 {args.rows:,} rows in {workdir}, median of {args.repeat} runs")
+
+    samples = {name: [] for name in ("fetch_import", "fetch_dry_run", "app_import",
+                                     "server_first_page", "first_callback", "warm_callback")}
+    loaded = {}
+    for _ in range(args.repeat):
+        fetch_import = time_import(workdir, "data.fetch", REPO)
+        app_import = time_import(workdir, "app", REPO)
+        samples["fetch_import"].append(fetch_import["seconds"])
+        samples["app_import"].append(app_import["seconds"])
+        loaded = {"fetch": fetch_import["loaded"], "app": app_import["loaded"]}
+        samples["fetch_dry_run"].append(time_dry_run(workdir))
+        first_page, first_callback, warm_callback = time_server(workdir)
+        samples["server_first_page"].append(first_page)
+        samples["first_callback"].append(first_callback)
+        samples["warm_callback"].append(warm_callback)
+
+    medians = {name: round(statistics.median(values), 3) for name, values in samples.items()}
+    for name, seconds in medians.items():
+        print(f"{name:<18} {seconds:>7.3f}s")
+    for module, names in loaded.items():
+        print(f"import {module:<6} loads {', '.join(names) or '(none of ' + ', '.join(HEAVY_MODULES) + ')'}")
+
+    results = {
+        "benchmark": "startup",
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "config": vars(args),
+        "seconds": medians,
+        "samples": samples,
+        "heavy_modules_loaded": loaded,
+    }
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"startup-{results['commit'] or 'nogit'}-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\n✅ Results saved to {output}")
@@ -0,0 +1,91 @@
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from data.aggregate import CreatedCounter  # noqa: E402
+
+# ===== BENCHMARK: peak memory of accumulate-then-parse vs streaming counters =====
+#   python benchmarks/bench_streaming_memory.py --packages 500000
+# Pages are generated in-process (id + metadata_created, as with fl
+# projection) so only the aggregation strategy is measured. Wall times include
+# generating the pages under tracemalloc, so compare them with each other only.
+
+START = datetime(2010, 1, 1)
+SPAN_SECONDS = 15 * 365 * 24 * 3600
+
+
+def synthetic_pages(packages, page_size=1000):
+    step = SPAN_SECONDS / packages
+    for start in range(0, packages, page_size):
+        yield [
+            {
+                "id": f"pkg-{i:08d}",
+                "metadata_created": (START + timedelta(seconds=i * step)).strftime("%Y-%m-%dT%H:%M:%S.%f"),
+            }
+            for i in range(start, min(start + page_size, packages))
+        ]
+
+
+def all_results_then_parse(pages, start_year=2010):
+    # old EPA/USDA fetchers: keep every package dict, then pull the dates
+    all_results = []
+    for page in pages:
+        all_results.extend(page)
+    created_dates = [r.get("metadata_created") for r in all_results if r.get("metadata_created")]
+    df = pd.DataFrame({"createdAt": pd.to_datetime(created_dates, errors="coerce")})
+    df = df[df["createdAt"].dt.year >= start_year]
+    df["created_date"] = df["createdAt"].dt.date
+    return df.groupby("created_date").size()
+
+
+def timestamps_then_parse(pages, start_year=2010):
+    # old NOAA/generic CKAN fetchers: keep every timestamp string, parse at the end
+    created_dates = []
+    for page in pages:
+        created_dates.extend(item["metadata_created"] for item in page if "metadata_created" in item)
+    df = pd.DataFrame({"createdAt": pd.to_datetime(created_dates, errors="coerce")})
+    df = df[df["createdAt"].dt.year >= start_year]
+    df["created_date"] = df["createdAt"].dt.date
+    return df.groupby("created_date").size()
+
+
+def streaming(pages, start_year=2010):
+    counts = CreatedCounter(start_year).add_pages(pages).daily_counts("X")
+    return counts.set_index("created_date")["datasets_created"]
+
+
+def measure(fn, packages):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn(synthetic_pages(packages))
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, peak, elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Streaming aggregation memory benchmark")
+    parser.add_argument("--packages", type=int, default=500000)
+    args = parser.parse_args()
+
+    print(f"synthetic catalog: {args.packages} packages")
+    reference = None
+    for name, fn in [("all_results + to_datetime", all_results_then_parse),
+                     ("timestamp list + to_datetime", timestamps_then_parse),
+                     ("streaming CreatedCounter", streaming)]:
+        result, peak, elapsed = measure(fn, args.packages)
+        total = int(result.sum())
+        if reference is None:
+            reference = result
+        else:
+            assert result.sort_index().tolist() == reference.sort_index().tolist()
+        print(f"{name:<30} peak {peak / 1e6:8.1f} MB   {elapsed:6.2f} s   {total} datasets, {len(result)} days")
@@ -0,0 +1,248 @@
+import hashlib
+import json
+import random
+import threading
+import time
+from datetime import date, datetime, timedelta
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+from mock_ckan import MockCatalog
+
+# ===== MOCK CATALOG SERVER (every source the pipeline fetches) =====
+# One local server standing in for all upstreams of data/fetch.py and
+# data/fetch_cdc.py:
+#
+#   /api/3/action/package_search       CKAN (catalog.data.gov), see mock_ckan.py
+#   /api/views/metadata/v1             CDC Socrata metadata (JSON)
+#   /api/v2/resources/media/403372.rss MMWR RSS feed
+#   /data/datasets.html                VAERS downloads page
+#   /nchs/nvss/vsrr.htm                NCHS VSRR releases page
+#
+# Sizes and per-source latencies are configurable, CDC documents carry an
+# ETag and answer If-None-Match with 304, `failures` injects 503s with a
+# given probability per source and `rate_limits` answers 429 + Retry-After
+# above that many requests/s per source. Requests and bytes are counted per source.
+#
+# The pipeline is pointed at it through CKAN_URL and CDC_*_URL (see urls()).
+
+SOURCES = ("ckan", "socrata", "mmwr", "vaers", "vsrr")
+
+PATHS = {
+    "/api/3/action/package_search": "ckan",
+    "/api/views/metadata/v1": "socrata",
+    "/api/v2/resources/media/403372.rss": "mmwr",
+    "/data/datasets.html": "vaers",
+    "/nchs/nvss/vsrr.htm": "vsrr",
+}
+
+START = datetime(2010, 1, 1)
+
+
+class MockCDC:
+    # Synthetic CDC documents; bump() publishes more so the next fetch is a 200
+    def __init__(self, socrata=2000, mmwr=200, vaers_years=15, vsrr=120):
+        self.sizes = {"socrata": socrata, "mmwr": mmwr, "vaers": vaers_years, "vsrr": vsrr}
+        self._lock = threading.Lock()
+        self._bodies = {}
+
+    def bump(self, extra=10):
+        with self._lock:
+            for source in ("socrata", "mmwr", "vsrr"):
+                self.sizes[source] += extra
+            self._bodies.clear()
+
+    def document(self, source):
+        # -> (body, content type, etag), built once per size
+        with self._lock:
+            if source not in self._bodies:
+                body, content_type = getattr(self, f"_{source}")(self.sizes[source])
+                self._bodies[source] = (body, content_type, f'"{hashlib.sha1(body).hexdigest()[:16]}"')
+            return self._bodies[source]
+
+    def _spread(self, n, i):
+        return START + timedelta(days=int(i * 5400 / max(n, 1)))
+
+    def _socrata(self, n):
+        views = [
+            {"id": f"cdc-{i:05d}", "name": f"Synthetic CDC view {i}",
+             "createdAt": self._spread(n, i).strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+             "description": "Synthetic Socrata view used by the fetch benchmarks. " * 3}
+            for i in range(n)
+        ]
+        return json.dumps(views).encode(), "application/json"
+
+    def _mmwr(self, n):
+        items = "".join(
+            f"<item><title>MMWR issue {i}</title><link>https://example.gov/mmwr/{i}</link>"
+            f"<pubDate>{self._spread(n, i).strftime('%a, %d %b %Y 10:00:00 GMT')}</pubDate></item>"
+            for i in range(n)
+        )
+        return f'<?xml version="1.0"?><rss version="2.0"><channel><title>MMWR</title>{items}</channel></rss>'.encode(), "application/rss+xml"
+
+    def _vaers(self, years):
+        links = "".join(
+            f'<li><a href="/data/{year}VAERS{kind}.csv">{year} {kind}</a></li>'
+            for year in range(date.today().year - years + 1, date.today().year + 1)
+            for kind in ("DATA", "VAX", "SYMPTOMS")
+        )
+        return f"<html><body><ul>{links}</ul></body></html>".encode(), "text/html"
+
+    def _vsrr(self, n):
+        cards = "".join(
+            f'<section class="card-body"><a href="/nchs/vsrr/{i}">Release {i}, '
+            f'{self._spread(n, i).strftime("%B %d, %Y")}</a></section>'
+            for i in range(n)
+        )
+        return f"<html><body>{cards}</body></html>".encode(), "text/html"
+
+
+class MockServerState:
+    def __init__(self, catalog, cdc, latency=None, failures=None, rate_limits=None, seed=0):
+        self.catalog = catalog
+        self.cdc = cdc
+        self.latency = dict(latency or {})          # source -> seconds per request
+        self.failures = dict(failures or {})        # source -> probability of a 503
+        self.rate_limits = dict(rate_limits or {})  # source -> requests/s before 429s
+        self._allowance = {}                        # source -> (tokens, last refill)
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.reset_counters()
+
+    def reset_counters(self):
+        with self._lock:
+            self.counters = {source: {"requests": 0, "bytes": 0, "not_modified": 0, "failed": 0, "throttled": 0}
+                             for source in SOURCES}
+
+    def should_fail(self, source):
+        rate = self.failures.get(source, 0)
+        with self._lock:
+            return rate > 0 and self._random.random() < rate
+
+    def should_throttle(self, source):
+        # token bucket of rate_limits[source] requests/s, one second of burst
+        rate = self.rate_limits.get(source)
+        if not rate:
+            return False
+        with self._lock:
+            now = time.monotonic()
+            tokens, last = self._allowance.get(source, (rate, now))
+            tokens = min(rate, tokens + (now - last) * rate)
+            throttled = tokens < 1
+            self._allowance[source] = (tokens if throttled else tokens - 1, now)
+            return throttled
+
+    def record(self, source, nbytes, outcome=None):
+        with self._lock:
+            self.counters[source]["requests"] += 1
+            self.counters[source]["bytes"] += nbytes
+            if outcome:
+                self.counters[source][outcome] += 1
+
+    def totals(self):
+        with self._lock:
+            return {
+                "requests": sum(c["requests"] for c in self.counters.values()),
+                "bytes": sum(c["bytes"] for c in self.counters.values()),
+            }
+
+
+def make_handler(state):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            source = PATHS.get(url.path)
+            if source is None:
+                self.send_error(404)
+                return
+            if state.should_throttle(source):
+                state.record(source, 0, "throttled")
+                self._send(429, b"", "text/plain", headers={"Retry-After": "1"})
+                return
+            if state.latency.get(source):
+                time.sleep(state.latency[source])
+            if state.should_fail(source):
+                state.record(source, 0, "failed")
+                self._send(503, b"", "text/plain")
+                return
+
+            if source == "ckan":
+                params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+                body = json.dumps({"success": True, "result": state.catalog.package_search(params)}).encode()
+                state.record(source, len(body))
+                self._send(200, body, "application/json")
+                return
+
+            body, content_type, etag = state.cdc.document(source)
+            if self.headers.get("If-None-Match") == etag:
+                state.record(source, 0, "not_modified")
+                self._send(304, b"", content_type, etag)
+                return
+            state.record(source, len(body))
+            self._send(200, body, content_type, etag)
+
+        def _send(self, status, body, content_type, etag=None, headers=None):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            if etag:
+                self.send_header("ETag", etag)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def serve(state, port=0):
+    # Start the server in a daemon thread -> (server, base_url)
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(state))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def urls(base_url):
+    # environment that points data/fetch.py and data/fetch_cdc.py at the mock
+    by_source = {source: base_url + path for path, source in PATHS.items()}
+    return {
+        "CKAN_URL": base_url,
+        "CDC_SOCRATA_URL": by_source["socrata"],
+        "CDC_MMWR_URL": by_source["mmwr"],
+        "CDC_VAERS_URL": by_source["vaers"],
+        "CDC_VSRR_URL": by_source["vsrr"],
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run a mock catalog server for every pipeline source")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--packages", type=int, default=5000, help="CKAN packages per organization")
+    parser.add_argument("--socrata", type=int, default=2000, help="Socrata views")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per request, every source")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="probability of a 503, every source")
+    args = parser.parse_args()
+
+    orgs = {org: args.packages for org in ("epa-gov", "hhs-gov", "doj-gov", "usda-gov", "nsf-gov", "noaa-gov")}
+    state = MockServerState(
+        MockCatalog(orgs),
+        MockCDC(socrata=args.socrata),
+        latency={source: args.latency for source in SOURCES},
+        failures={source: args.fail_rate for source in SOURCES},
+    )
+    server, base_url = serve(state, port=args.port)
+    print(f"🧪 Mock catalog listening on {base_url}")
+    for name, value in urls(base_url).items():
+        print(f"   export {name}={value}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
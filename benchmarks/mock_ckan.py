@@ -0,0 +1,210 @@
+import json
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+# ===== MOCK CKAN SERVER (for benchmarks) =====
+# Serves synthetic /api/3/action/package_search pages that look like
+# catalog.data.gov: full package documents (resources, tags, extras),
+# `organization:<org>` and `metadata_created:[<from> TO *]` / `[<from> TO <to>}`
+# filtering, `facet.field=["organization"]` counts over every org (rows=0),
+# rows/start paging, `fl` field projection and a fixed per-request latency.
+# Packages are generated on the fly so large catalogs cost no memory. Packages sort by (metadata_created, id), which is
+# creation order, and the keyset clauses ckan.key_filter() builds are
+# understood, so keyset paging works like against Solr.
+#
+# fl_support: "yes" honours fl, "ignore" sends full documents anyway and
+# "strip" only returns `id` (a server that doesn't know the requested fields).
+
+START = datetime(2010, 1, 1)
+SPAN_SECONDS = 15 * 365 * 24 * 3600
+MAX_ROWS = 1000
+
+
+def parse_time(value):
+    return datetime.fromisoformat(value.rstrip("Z"))
+
+
+def floor_ms(created):
+    return created.replace(microsecond=created.microsecond // 1000 * 1000)
+
+
+class MockCatalog:
+    def __init__(self, orgs, latency=0.0, fl_support="yes"):
+        self.orgs = dict(orgs)  # org name -> number of packages
+        # fixed spacing per org, so add_packages() appends newer packages
+        self.step = {org: SPAN_SECONDS / max(n, 1) for org, n in self.orgs.items()}
+        self.latency = latency
+        self.fl_support = fl_support
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.bytes_sent = 0
+
+    def created_at(self, org, i):
+        # package i of an org; ids are in creation order
+        return START + timedelta(seconds=int(i * self.step[org]))
+
+    def package_id(self, org, i):
+        return f"{org}-{i:08d}"
+
+    def add_packages(self, org, count):
+        # simulate an agency publishing `count` new datasets
+        self.step.setdefault(org, SPAN_SECONDS / max(count, 1))
+        self.orgs[org] = self.orgs.get(org, 0) + count
+
+    def package(self, org, i):
+        created = self.created_at(org, i).strftime("%Y-%m-%dT%H:%M:%S.%f")
+        name = f"{org}-dataset-{i}"
+        return {
+            "id": self.package_id(org, i),
+            "name": name,
+            "title": f"Synthetic dataset {i} from {org}",
+            "notes": "Synthetic package used to benchmark the Inkwell fetch pipeline. " * 4,
+            "metadata_created": created,
+            "metadata_modified": created,
+            "state": "active",
+            "organization": {"name": org, "title": org.upper(), "type": "organization"},
+            "resources": [
+                {
+                    "id": f"{org}-{i}-res-{r}",
+                    "format": fmt,
+                    "url": f"https://example.gov/{org}/{i}/data.{fmt.lower()}",
+                    "created": created,
+                    "description": f"{fmt} download",
+                }
+                for r, fmt in enumerate(["CSV", "JSON", "XML"])
+            ],
+            "tags": [{"name": tag, "display_name": tag} for tag in ("open-data", org, "synthetic")],
+            "extras": [
+                {"key": "publisher", "value": org.upper()},
+                {"key": "accessLevel", "value": "public"},
+                {"key": "bureauCode", "value": "000:00"},
+            ],
+        }
+
+    def _org_from_fq(self, fq):
+        for part in fq.split():
+            if part.startswith("organization:"):
+                return part.split(":", 1)[1]
+        return None
+
+    def _first_index(self, org, after):
+        # index of the first package whose (metadata_created, id) is past `after`
+        lo, hi = 0, self.orgs.get(org, 0)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if after(self.created_at(org, mid), self.package_id(org, mid)):
+                hi = mid
+            else:
+                lo = mid + 1
+        return lo
+
+    def _range(self, org, fq):
+        # [lo, hi) package indexes matched by the metadata_created / keyset clauses
+        lo, hi = 0, self.orgs.get(org, 0)
+        match = re.search(r"metadata_created:\[(\S+) TO \*\]", fq)
+        if match:
+            since = parse_time(match.group(1))
+            lo = max(lo, self._first_index(org, lambda created, _: created >= since))
+        match = re.search(r"metadata_created:\[(\d\S*) TO (\d\S*)\}", fq)
+        if match:
+            since, until = parse_time(match.group(1)), parse_time(match.group(2))
+            lo = max(lo, self._first_index(org, lambda created, _: created >= since))
+            hi = min(hi, self._first_index(org, lambda created, _: created >= until))
+        match = re.search(r'\(metadata_created:\{(\S+) TO \*\] OR \(\S+ \S+ \S+ AND id:\{"([^"]+)" TO \*\]\)\)', fq)
+        if match:
+            at, after_id = parse_time(match.group(1)), match.group(2)
+            lo = max(lo, self._first_index(org, lambda created, pid: (floor_ms(created), pid) > (at, after_id)))
+        match = re.search(r'\(metadata_created:\[\* TO (\S+)\} OR \(\S+ \S+ \S+ AND id:\[\* TO "([^"]+)"\]\)\)', fq)
+        if match:
+            at, through_id = parse_time(match.group(1)), match.group(2)
+            hi = min(hi, self._first_index(org, lambda created, pid: (floor_ms(created), pid) > (at, through_id)))
+        return lo, max(lo, hi)
+
+    def package_search(self, params):
+        fq = params.get("fq", "")
+        org = self._org_from_fq(fq)
+        if org is None and "organization" in params.get("facet.field", ""):
+            return self.organization_facets(fq)
+        rows = min(int(params.get("rows", 10)), MAX_ROWS)
+        start = int(params.get("start", 0))
+        indexes = range(*self._range(org, fq)) if org in self.orgs else range(0)
+        if params.get("sort", "").startswith("metadata_created desc"):
+            indexes = indexes[::-1]
+        results = [self.package(org, i) for i in indexes[start:start + rows]]
+        fields = [f for f in params.get("fl", "").split(",") if f]
+        if fields and self.fl_support == "yes":
+            results = [{f: item[f] for f in fields if f in item} for item in results]
+        elif fields and self.fl_support == "strip":
+            results = [{"id": item["id"]} for item in results]
+        return {"count": len(indexes), "results": results, "sort": params.get("sort", "score desc")}
+
+    def organization_facets(self, fq):
+        # rows=0 search over every org, faceted on organization (bulk.py)
+        counts = {}
+        for org in self.orgs:
+            lo, hi = self._range(org, fq)
+            if hi > lo:
+                counts[org] = hi - lo
+        return {"count": sum(counts.values()), "results": [], "facets": {"organization": counts},
+                "search_facets": {"organization": {"items": [{"name": org, "count": n} for org, n in counts.items()]}}}
+
+    def record(self, nbytes):
+        with self._lock:
+            self.requests += 1
+            self.bytes_sent += nbytes
+
+
+def make_handler(catalog):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path != "/api/3/action/package_search":
+                self.send_error(404)
+                return
+            params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            if catalog.latency:
+                time.sleep(catalog.latency)
+            body = json.dumps({"success": True, "result": catalog.package_search(params)}).encode()
+            catalog.record(len(body))
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def serve(catalog, port=0):
+    # Start the server in a daemon thread -> (server, base_url)
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(catalog))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run a mock CKAN package_search server")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--packages", type=int, default=5000, help="packages per organization")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per request")
+    args = parser.parse_args()
+
+    orgs = {org: args.packages for org in ("epa-gov", "hhs-gov", "doj-gov", "usda-gov", "nsf-gov", "noaa-gov")}
+    server, url = serve(MockCatalog(orgs, latency=args.latency), port=args.port)
+    print(f"🧪 Mock CKAN listening on {url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
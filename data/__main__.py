@@ -0,0 +1,6 @@
+from .fetch import main
+
+# `python -m data [--agencies EPA DOJ] [--workers N] [--full] [--dry-run]`
+# from the repo root: same as `python data/fetch.py`.
+
+main()
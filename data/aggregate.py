@@ -0,0 +1,105 @@
+from collections import Counter
+
+import pandas as pd
+
+# ===== STREAMING DAILY COUNTS =====
+# CKAN pages are fed in one at a time: each package bumps a per-day counter
+# and the page can be thrown away right after, so memory depends on the
+# number of distinct days (~5,500 since 2010), not on the catalog size.
+# The counter also tracks the incremental-fetch high-water mark.
+
+
+def ms_key(created):
+    # metadata_created -> (seconds part, milliseconds) for ISO strings with or
+    # without a fraction; used to compare timestamps at Solr's precision
+    fraction = created[20:23] if len(created) > 19 and created[19] == "." else ""
+    return created[:19], fraction.ljust(3, "0")
+
+
+def created_day(created):
+    # "2020-11-10T16:12:34.123456" -> "2020-11-10" without a full datetime parse
+    if len(created) >= 10 and created[4] == "-" and created[7] == "-" and created[:4].isdigit():
+        return created[:10]
+    try:
+        return pd.Timestamp(created).strftime("%Y-%m-%d")
+    except (ValueError, TypeError):
+        return None
+
+
+class CreatedCounter:
+    def __init__(self, start_year=2010, seen_ids=()):
+        self.start_year = str(start_year)
+        self.seen_ids = set(seen_ids)  # ids already counted (checkpoint boundary)
+        self.days = Counter()          # "YYYY-MM-DD" -> datasets created
+        self.packages = 0              # packages counted, before the year filter
+        self.mark = None               # newest metadata_created seen
+        self.mark_ids = set()          # ids within the mark's millisecond
+
+    def add_page(self, page):
+        records = [(item.get("id"), item["metadata_created"]) for item in page if item.get("metadata_created")]
+        if self.seen_ids:
+            records = [record for record in records if record[0] not in self.seen_ids]
+        if not records:
+            return
+
+        days = [created[:10] for _, created in records]
+        if not all(len(day) == 10 and day[4] == "-" and day[7] == "-" for day in days):
+            # unusual timestamp formats: parse those one by one, drop the invalid ones
+            days = [created_day(created) for _, created in records]
+            records = [record for record, day in zip(records, days) if day]
+            days = [day for day in days if day]
+            if not records:
+                return
+
+        self.packages += len(records)
+        # "YYYY-MM-DD" strings compare like dates, so the year filter stays a string compare
+        self.days.update(day for day in days if day >= self.start_year)
+        self._track_mark(records)
+
+    def add_pages(self, pages):
+        for page in pages:
+            self.add_page(page)
+        return self
+
+    def _track_mark(self, records):
+        page_max = max(created for _, created in records)
+        top = ms_key(page_max)
+        mark_key = ms_key(self.mark) if self.mark else None
+        if mark_key is not None and top < mark_key:
+            return
+        ids = {
+            package_id for package_id, created in records
+            if package_id and created[:19] == page_max[:19] and ms_key(created) == top
+        }
+        if mark_key is None or top > mark_key:
+            self.mark, self.mark_ids = page_max, ids
+        else:
+            self.mark = max(self.mark, page_max)
+            self.mark_ids |= ids
+
+    def state(self):
+        # JSON-able snapshot, saved with a crawl checkpoint
+        return {"days": dict(self.days), "packages": self.packages,
+                "mark": self.mark, "mark_ids": sorted(self.mark_ids)}
+
+    def restore(self, state):
+        self.days = Counter(state["days"])
+        self.packages = state["packages"]
+        self.mark = state["mark"]
+        self.mark_ids = set(state["mark_ids"])
+        return self
+
+    def daily_counts(self, agency):
+        counts = pd.DataFrame(sorted(self.days.items()), columns=["created_date", "datasets_created"])
+        counts["created_date"] = pd.to_datetime(counts["created_date"]).dt.date
+        counts["Agency"] = agency
+        return counts
+
+    def monthly_counts(self, agency):
+        months = Counter()
+        for day, count in self.days.items():
+            months[day[:7] + "-01"] += count
+        monthly = pd.DataFrame(sorted(months.items()), columns=["month", "datasets_created"])
+        monthly["month"] = pd.to_datetime(monthly["month"])
+        monthly["Agency"] = agency
+        return monthly
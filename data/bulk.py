@@ -0,0 +1,118 @@
+import json
+import os
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from . import registry
+from . import store
+from .checkpoints import write_json
+
+# ===== BULK CRAWL: EVERY DATA.GOV ORGANIZATION =====
+# One paged crawl per organization costs at least one request per 1000
+# packages per org - thousands for all of data.gov. The bulk mode asks
+# package_search for no documents at all, only the `organization` facet of the
+# packages created in one month (rows=0, metadata_created:[month TO next
+# month}), so one request gives every organization's count for that month:
+# about 200 requests since 2010, however many organizations there are.
+#
+# Months are kept in data/bulk_state.json ({"months": {"2024-05": {org:
+# count}}}). A month is final once it is over, so a normal run only asks again
+# for the last CKAN_BULK_RECENT_MONTHS months and any month that failed
+# before; --full asks for all of them.
+#
+# The counts become monthly partitions for every organization whose registry
+# source is "facet". Organizations not in the registry are only kept in the
+# state file unless registration is asked for (`--register-orgs`): every one
+# of them then becomes a "facet" agency in data/agencies.json and goes through
+# the combine step, the main chart and the dropdown like any other agency -
+# hundreds of them for all of data.gov. An org whose label another org
+# already has is registered as LABEL-2 (-3, ...). Agencies crawled one by one
+# (source ckan / cdc / csv) keep their own, daily, counts.
+
+BULK_STATE_FILE = os.path.join("data", "bulk_state.json")
+BULK_RECENT_MONTHS = int(os.environ.get("CKAN_BULK_RECENT_MONTHS", 2))
+
+
+def load_state(path=BULK_STATE_FILE):
+    if not os.path.exists(path):
+        return {"months": {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def month_ranges(start_year=2010, today=None):
+    # [(month start, next month start)] from January start_year to this month
+    today = pd.Timestamp.today() if today is None else pd.Timestamp(today)
+    starts = pd.date_range(f"{start_year}-01-01", today.replace(day=1).normalize(), freq="MS")
+    return [(start, start + pd.DateOffset(months=1)) for start in starts]
+
+
+def due_months(state, start_year=2010, full=False, recent=BULK_RECENT_MONTHS, today=None):
+    months = month_ranges(start_year, today)
+    if full:
+        return months
+    keep = len(months) - max(1, recent)  # the current month is never final
+    return [(start, end) for i, (start, end) in enumerate(months)
+            if i >= keep or start.strftime("%Y-%m") not in state["months"]]
+
+
+def crawl(client, start_year=2010, full=False, path=BULK_STATE_FILE):
+    # Ask for every due month -> (state, months that failed). The state is
+    # saved even when interrupted, so finished months aren't asked for again.
+    state = {"months": {}} if full else load_state(path)
+    months = due_months(state, start_year, full)
+    print(f"🔍 Bulk crawl: {len(months)} month(s) of organization counts")
+    failed = 0
+    try:
+        for start, counts in client.monthly_facets(months):
+            if counts is None:
+                failed += 1  # asked again next run (a recent month keeps its last counts)
+                continue
+            state["months"][start.strftime("%Y-%m")] = counts
+    finally:
+        state["updated"] = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        write_json(state, path)
+    return state, failed
+
+
+def monthly_counts(state):
+    # long frame: month, org, datasets_created (months with datasets only)
+    rows = [(month, org, count) for month, counts in state["months"].items() for org, count in counts.items()]
+    df = pd.DataFrame(rows, columns=["month", "org", "datasets_created"])
+    df["month"] = pd.to_datetime(df["month"], format="%Y-%m")
+    return df
+
+
+def save(state, agencies=None, register=False):
+    # monthly partitions of the "facet" agencies (registering new
+    # organizations first when asked to) -> labels saved
+    agencies = registry.load() if agencies is None else agencies
+    df = monthly_counts(state)
+    by_org = {entry["org"]: label for label, entry in agencies.items()}
+    new = sorted(org for org in df["org"].unique() if org not in by_org)
+    if new and not register:
+        print(f"🔍 {len(new)} organization(s) not in the registry, counts kept in {BULK_STATE_FILE} "
+              f"(--register-orgs adds them all to the dashboard)")
+    elif new:
+        taken = {store.normalize_agency(label) for label in agencies}
+        entries = []
+        for org in new:
+            label = registry.unique_label(org, taken)
+            entry = {"org": org, "source": "facet"}
+            if label != registry.org_label(org):
+                print(f"⚠️ {org} is labelled {registry.org_label(org)} like another organization, "
+                      f"registered as {label}")
+                entry["label"] = label
+            entries.append(entry)
+        registry.register(entries)
+        print(f"✅ Registered {len(new)} new organization(s) from the bulk crawl")
+        agencies = registry.load()
+        by_org = {entry["org"]: label for label, entry in agencies.items()}
+    facet = {org: label for org, label in by_org.items() if agencies[label]["source"] == "facet"}
+    df = df[df["org"].isin(facet)]
+    if df.empty:
+        return []
+    df["Agency"] = df["org"].map(facet)
+    store.save("monthly", df[["month", "Agency", "datasets_created"]])
+    return sorted(df["Agency"].unique())
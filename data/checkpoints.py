@@ -0,0 +1,128 @@
+import json
+import os
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from .aggregate import ms_key
+
+# ===== INCREMENTAL FETCH CHECKPOINTS =====
+# Per agency we remember the newest metadata_created seen (the high-water
+# mark) and the ids of the packages at that instant. The next run only asks
+# CKAN for metadata_created >= mark and drops ids it already counted, so the
+# boundary packages are never counted twice (see aggregate.CreatedCounter).
+
+CHECKPOINT_FILE = "data/fetch_checkpoints.json"
+
+# While a crawl runs, its range cursors (ckan.py) and the counts so far are
+# saved every CRAWL_CHECKPOINT_PAGES pages to data/crawl_checkpoints/<org>.json,
+# so a crash at page 40 resumes at page 40. The file is tied to the exact
+# query (filters, start year, full or incremental) and removed once the
+# agency's counts and high-water mark are saved.
+CRAWL_DIR = "data/crawl_checkpoints"
+CRAWL_CHECKPOINT_PAGES = int(os.environ.get("CKAN_CHECKPOINT_PAGES", 5))
+
+
+class IncompleteFetchError(Exception):
+    # a fetch that would leave an agency's counts short; its saved files are
+    # kept as they were and it is retried next run
+    pass
+
+
+def load_checkpoints(path=CHECKPOINT_FILE):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_checkpoints(checkpoints, path=CHECKPOINT_FILE):
+    # write-then-rename so a crash never leaves a half-written file
+    write_json(checkpoints, path)
+
+
+def write_json(data, path):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+class CrawlCheckpoint:
+    def __init__(self, org, query, crawl_dir=CRAWL_DIR, every=CRAWL_CHECKPOINT_PAGES):
+        self.path = os.path.join(crawl_dir, f"{org}.json")
+        self.query = query
+        self.every = max(1, every)
+        self._pages = 0
+
+    def load(self):
+        # -> {"crawl": iter_pages snapshot, "counter": CreatedCounter state}, or
+        # None when there is nothing to resume for this query
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path) as f:
+            saved = json.load(f)
+        if saved.get("query") != self.query:
+            return None  # an older crawl of a different query (the mark moved since)
+        if not saved["crawl"].get("slices"):
+            return None  # it had finished: resuming would fetch nothing, ever
+        return saved
+
+    def save(self, crawl, counter, force=False):
+        self._pages += 1
+        if not force and self._pages % self.every:
+            return
+        if not crawl.get("slices"):
+            return  # finished, nothing to resume (the last open snapshot stays until clear())
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        write_json({
+            "query": self.query,
+            "crawl": crawl,
+            "counter": counter.state(),
+            "updated": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        }, self.path)
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def solr_time(timestamp):
+    # Solr wants UTC with a Z and at most millisecond precision; flooring keeps
+    # the range inclusive of the mark itself
+    return pd.Timestamp(timestamp).floor("ms").strftime("%Y-%m-%dT%H:%M:%S.%f")[:23] + "Z"
+
+
+def since_filter(checkpoint):
+    if not checkpoint:
+        return ()
+    return (f"metadata_created:[{solr_time(checkpoint['metadata_created'])} TO *]",)
+
+
+def seen_ids(checkpoint):
+    return checkpoint.get("ids", []) if checkpoint else []
+
+
+def advance(checkpoint, counter):
+    # New high-water mark after a CreatedCounter has consumed every page
+    if counter.mark is None:
+        return checkpoint
+    ids = set(counter.mark_ids)
+    if checkpoint and ms_key(checkpoint["metadata_created"]) == ms_key(counter.mark):
+        # same millisecond as before: the next query returns the old ids again too
+        ids.update(checkpoint.get("ids", []))
+    return {
+        "metadata_created": counter.mark,
+        "ids": sorted(ids),
+        "updated": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+
+
+def merge_counts(existing, new_counts, key):
+    # Add freshly fetched counts onto the counts saved so far (both store-typed)
+    if existing is None or existing.empty:
+        return new_counts
+    merged = pd.concat([existing, new_counts], ignore_index=True)
+    merged["Agency"] = merged["Agency"].astype(str)
+    merged = merged.groupby([key, "Agency"], as_index=False)["datasets_created"].sum()
+    return merged.sort_values(key).reset_index(drop=True)
@@ -0,0 +1,377 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, as_completed, FIRST_COMPLETED
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .aggregate import ms_key
+from .checkpoints import solr_time
+from .metrics import FETCH_PAGE_SECONDS
+from .transport import Transport, limit_host, RETRIES, BACKOFF
+
+# ===== CKAN CLIENT (catalog.data.gov) =====
+# One pooled session shared by every agency. Searches are sorted on a stable
+# key (metadata_created, then id) and paged by key, not by offset: each
+# request asks for the packages after the last key seen, so packages added
+# or removed mid-crawl can't shift a page and make us skip or double-count.
+# Keys only ever increase, which also drops any duplicate the server sends.
+#
+# The first page tells us the total `count`; the rest of the key space is cut
+# into up to `prefetch` (default: max_workers) ranges that are paged
+# concurrently, within the host's rate limit, one page in flight per range, so
+# callers can aggregate page by page with flat memory. The range cursors are
+# all it takes to resume an interrupted crawl (see progress= / resume=).
+#
+# Requests go through transport.Transport (backoff, Retry-After, per-host
+# adaptive rate limit, circuit breaker). A page that still fails is not
+# dropped: it is re-fetched once the rest of the search is done, and only
+# pages that fail that too count as failures(org).
+
+CATALOG_URL = "https://catalog.data.gov"
+PAGE_SIZE = 1000
+
+SORT = "metadata_created asc, id asc"
+
+# Lightweight mode: ask CKAN for just these fields (`fl`) instead of full
+# package documents with resources/tags/extras. Pass fields=None for full records.
+LIGHT_FIELDS = ("id", "metadata_created")
+
+# agency_stats key for the bulk crawl's facet searches (they span every org)
+FACET_STATS_KEY = "all-orgs"
+
+
+class CKANClient:
+    def __init__(self, base_url=CATALOG_URL, max_workers=8, rate_limit=None,
+                 page_size=PAGE_SIZE, timeout=30, retries=None, retry_wait=None,
+                 fields=LIGHT_FIELDS, prefetch=None):
+        self.search_url = f"{base_url}/api/3/action/package_search"
+        self.page_size = page_size
+        self.prefetch = prefetch or max_workers
+        self.fields = tuple(fields) if fields else None
+        self.timeout = timeout
+
+        # keep-alive connections, one per worker
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.transport = Transport(self.session, retries=retries or RETRIES, backoff=retry_wait or BACKOFF,
+                                   timeout=timeout)
+        # CKAN_RATE_LIMIT caps the host's adaptive rate
+        limit_host(self.search_url, rate_limit)
+
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ckan")
+        self._stats_lock = threading.Lock()
+        self.stats = {"requests": 0, "failures": 0}
+        # per-agency numbers: org -> {requests, bytes, parse_seconds, packages, failures, mode}
+        self.agency_stats = {}
+        # org -> params of pages that failed even after the re-fetch
+        self.failed_pages = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+        self.session.close()
+
+    def _count(self, key):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def _agency(self, org):
+        # caller holds _stats_lock
+        return self.agency_stats.setdefault(
+            org, {"requests": 0, "bytes": 0, "parse_seconds": 0.0, "packages": 0, "failures": 0, "mode": "full"}
+        )
+
+    def _record(self, org, nbytes, parse_seconds, packages):
+        with self._stats_lock:
+            entry = self._agency(org)
+            entry["requests"] += 1
+            entry["bytes"] += nbytes
+            entry["parse_seconds"] += parse_seconds
+            entry["packages"] += packages
+
+    def _set_mode(self, org, mode):
+        with self._stats_lock:
+            self._agency(org)["mode"] = mode
+
+    # === one package_search call (with retries) -> CKAN "result" dict ===
+    def _parse(self, r, org):
+        parse_start = time.perf_counter()
+        result = r.json()["result"]
+        self._record(org, len(r.content), time.perf_counter() - parse_start, len(result.get("results", [])))
+        return result
+
+    def search(self, params, org=None):
+        # None once the transport's retries are used up (the caller decides
+        # whether to re-fetch the page later)
+        self._count("requests")
+        request_start = time.perf_counter()
+        try:
+            result = self.transport.get(self.search_url, params=params, parse=lambda r: self._parse(r, org))
+        except (requests.exceptions.RequestException, ValueError, KeyError) as e:
+            print(f"⚠️ Page for {org} failed: {e}")
+            return None
+        FETCH_PAGE_SECONDS.observe(time.perf_counter() - request_start, org)
+        return result
+
+    def _page_failed(self, org, params):
+        self._count("failures")
+        with self._stats_lock:
+            self._agency(org)["failures"] += 1
+            self.failed_pages.setdefault(org, []).append(dict(params))
+        print(f"⚠️ {org}: page still failing after the re-fetch ({params['fq']}), the fetch is incomplete")
+
+    # === every page of results for one organization ===
+    def iter_pages(self, org, filters=(), resume=None, progress=None, **extra_params):
+        # filters: extra Solr fq clauses, e.g. a metadata_created range.
+        # resume: a snapshot passed to progress() by an earlier, interrupted
+        # crawl of the same query; progress(snapshot) is called every time the
+        # caller has consumed a page.
+        fq = " AND ".join([f"organization:{org}", *filters])
+        params = {"fq": fq, "rows": self.page_size, "start": 0, **extra_params, "sort": SORT}
+        if self.fields:
+            params["fl"] = ",".join(self.fields)
+
+        if resume:
+            if not resume.get("fields"):
+                params.pop("fl", None)
+            self._set_mode(org, "projected" if "fl" in params else "full")
+            slices = [dict(s) for s in resume["slices"]]
+        else:
+            # the first page can't wait for the end of the crawl: one more try right away
+            first = self.search(params, org) or self.search(params, org)
+            if not first:
+                self._page_failed(org, params)
+                return
+
+            results = first.get("results", [])
+            if self.fields:
+                mode = projection_mode(results, self.fields)
+                if mode == "unsupported":
+                    # projection stripped the fields we need - start over with full records
+                    print(f"⚠️ {org}: server returned no metadata_created with fl, using full records")
+                    del params["fl"]
+                    first = self.search(params, org) or self.search(params, org)
+                    if not first:
+                        self._page_failed(org, params)
+                        return
+                    results = first.get("results", [])
+                    mode = "full"
+                elif mode == "ignored":
+                    # server sent full documents anyway; they still carry metadata_created
+                    print(f"⚠️ {org}: server ignored fl projection, receiving full records")
+                    del params["fl"]
+                self._set_mode(org, mode)
+            else:
+                self._set_mode(org, "full")
+
+            done = len(results) < self.page_size or first.get("count", 0) <= self.page_size
+            first_slice = {"after": None, "through": None, "done": done}
+            page = keep_after(first_slice, results)
+            slices = [first_slice]
+            if not first_slice["done"]:
+                slices += self._split(org, params, first_slice, first.get("count", 0))
+            yield page
+            if progress:
+                progress(crawl_snapshot(params, slices))
+
+        yield from self._crawl(org, params, slices, progress)
+
+    def _split(self, org, params, first_slice, total):
+        # Cut what is left after the first page into key ranges of about equal
+        # size, one per concurrent page: sample the key at evenly spaced
+        # offsets (rows=1 each). Offsets can drift if the catalog changes, but
+        # they only place the cuts - every range is crawled by key, so nothing
+        # is skipped or counted twice either way.
+        pages = -(-(total - self.page_size) // self.page_size)
+        n = min(self.prefetch, pages)
+        if n < 2:
+            return []
+        # whole pages per range, so no range ends on a short extra page
+        per_slice = -(-pages // n)
+        probe = {**params, "rows": 1}
+        if "fl" in probe:
+            probe["fl"] = "id,metadata_created"
+        # each cut is the last package of a range (ranges are (after, through])
+        offsets = [self.page_size * (1 + k * per_slice) - 1 for k in range(1, n) if k * per_slice < pages]
+        jobs = [self._pool.submit(self.search, {**probe, "start": offset}, org) for offset in offsets]
+        cuts = []
+        for job in jobs:
+            result = job.result()
+            items = (result or {}).get("results", [])
+            if items and items[0].get("metadata_created"):
+                cut = [items[0]["metadata_created"], items[0].get("id") or ""]
+                if cut_key(cut) > cut_key(first_slice["after"]) and (not cuts or cut_key(cut) > cut_key(cuts[-1])):
+                    cuts.append(cut)
+        # (after, through] ranges: the first slice runs up to the first cut,
+        # the last one is open-ended and picks up packages added meanwhile
+        slices = [{"after": cut, "through": None, "done": False} for cut in cuts]
+        if cuts:
+            first_slice["through"] = cuts[0]
+        for s, following in zip(slices, cuts[1:]):
+            s["through"] = following
+        return slices
+
+    def _crawl(self, org, params, slices, progress):
+        # Keyset paging: each slice asks for the page_size packages after its
+        # cursor, then moves the cursor to the last one. Slices are fetched
+        # concurrently, one page in flight each; pages are handed out as they
+        # arrive. A slice whose page fails is parked and retried once the
+        # others are done; if it fails again its cursor stays where it was, so
+        # a resumed crawl picks it up from there.
+        pending = {}
+        parked = []
+
+        def submit(s):
+            pending[self._pool.submit(self.search, slice_params(params, s), org)] = s
+
+        for s in slices:
+            if not s["done"]:
+                submit(s)
+        retried = False
+        while pending or (parked and not retried):
+            if not pending:
+                retried = True
+                print(f"🔍 {org}: re-fetching {len(parked)} failed page(s)")
+                for s in parked:
+                    submit(s)
+                parked = []
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for job in done:
+                s = pending.pop(job)
+                result = job.result()
+                if result is None:
+                    if retried:
+                        self._page_failed(org, slice_params(params, s))
+                    else:
+                        parked.append(s)
+                    continue
+                results = result.get("results", [])
+                page = keep_after(s, results)
+                # count: everything left in the slice, this page included
+                if len(results) < self.page_size or result.get("count", 0) <= len(results):
+                    s["done"] = True
+                elif not page:
+                    # a full page with nothing past the cursor: the server
+                    # ignored the range filter, paging on would loop forever
+                    print(f"⚠️ {org}: server did not honour the keyset filter after {s['after']}")
+                    self._page_failed(org, slice_params(params, s))
+                    continue
+                yield page
+                if progress:
+                    progress(crawl_snapshot(params, slices))
+                if not s["done"]:
+                    submit(s)
+
+    # === packages per organization, no documents (the bulk crawl, bulk.py) ===
+    def facet_counts(self, start, end, field="organization"):
+        # {org name: packages created in [start, end)} from one rows=0 search
+        # faceted on `field`; None when the request failed after the retries
+        params = {
+            "q": "*:*",
+            "fq": f"metadata_created:[{solr_time(start)} TO {solr_time(end)}}}",
+            "rows": 0,
+            "facet": "true",
+            "facet.field": json.dumps([field]),
+            "facet.limit": -1,  # CKAN's default is the top 50
+            "facet.mincount": 1,
+        }
+        result = self.search(params, org=FACET_STATS_KEY)
+        if result is None:
+            return None
+        return result.get("facets", {}).get(field, {})
+
+    def monthly_facets(self, months, field="organization"):
+        # facet_counts() for every (start, end), up to max_workers at a time
+        # -> (start, counts or None) as they arrive
+        jobs = {self._pool.submit(self.facet_counts, start, end, field): start for start, end in months}
+        for job in as_completed(jobs):
+            yield jobs[job], job.result()
+
+    def created_dates(self, org, filters=(), **extra_params):
+        return [
+            item["metadata_created"]
+            for page in self.iter_pages(org, filters, **extra_params)
+            for item in page
+            if item.get("metadata_created")
+        ]
+
+    def failures(self, org):
+        return self.agency_stats.get(org, {}).get("failures", 0)
+
+    def report(self, org):
+        entry = self.agency_stats.get(org)
+        if not entry:
+            return
+        print(f"📦 {org}: {entry['packages']} packages, {entry['requests']} requests, "
+              f"{entry['bytes'] / 1e6:.1f} MB, parse {entry['parse_seconds']:.2f} s ({entry['mode']} records)")
+
+
+def projection_mode(results, fields):
+    # Did the server honour `fl`? -> "projected", "ignored" or "unsupported"
+    if not results:
+        return "projected"
+    sample = results[:10]
+    if any(not item.get("metadata_created") for item in sample):
+        return "unsupported"
+    if any(set(item) - set(fields) for item in sample):
+        return "ignored"
+    return "projected"
+
+
+# === keyset paging helpers ===
+# A key is [metadata_created, id]; ranges are (after, through], None = open.
+def cut_key(key):
+    # at Solr's precision: millisecond timestamps, then id
+    return (ms_key(key[0]), key[1]) if key else ((), "")
+
+
+def key_filter(key, after=True):
+    # Solr fq clause for packages after (or up to and including) key
+    at = solr_time(key[0])
+    same = f'metadata_created:[{at} TO {at}]'
+    if after:
+        return f'(metadata_created:{{{at} TO *] OR ({same} AND id:{{"{key[1]}" TO *]))'
+    return f'(metadata_created:[* TO {at}}} OR ({same} AND id:[* TO "{key[1]}"]))'
+
+
+def slice_params(params, s):
+    clauses = [params["fq"]]
+    if s["after"]:
+        clauses.append(key_filter(s["after"]))
+    if s["through"]:
+        clauses.append(key_filter(s["through"], after=False))
+    return {**params, "fq": " AND ".join(clauses), "start": 0}
+
+
+def keep_after(s, results):
+    # The page's packages in key order past the slice cursor, then move the
+    # cursor to the last one. Anything at or before the cursor (a duplicate,
+    # or a server that ignored the filter) or past the slice end is dropped.
+    after = cut_key(s["after"])
+    through = cut_key(s["through"]) if s["through"] else None
+    page = []
+    for item in results:
+        if not item.get("metadata_created"):
+            continue
+        key = [item["metadata_created"], item.get("id") or ""]
+        k = cut_key(key)
+        if k <= after or (through and k > through):
+            continue
+        page.append(item)
+        after = k
+        s["after"] = key
+    return page
+
+
+def crawl_snapshot(params, slices):
+    # what progress() gets: enough to resume the crawl with iter_pages(resume=...)
+    return {"fields": "fl" in params, "slices": [dict(s) for s in slices if not s["done"]]}
@@ -0,0 +1,114 @@
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from . import store
+
+# ===== INCREMENTAL COMBINE =====
+# The combined table (every agency's monthly counts + `normalized`, the count
+# divided by that agency's peak month) is kept up to date one agency at a time
+# instead of being rebuilt from every monthly partition on each run:
+#   - data/combine_state.json remembers, per agency, the signature of the
+#     monthly partition it was built from, its peak and a digest of its rows
+#   - an agency whose monthly partition is unchanged (store.save leaves
+#     identical partitions alone) is skipped without being read
+#   - for a changed agency, if its peak is the same only the months whose
+#     counts changed get a new `normalized`; a new peak rescales that agency
+#   - agencies gone from the monthly table (or from the registry) are
+#     dropped from combined
+# Partitions and the state file are written atomically. The state's
+# `version` (a hash of every agency's digest) changes exactly when the
+# combined data does.
+
+COMBINE_STATE_FILE = os.path.join("data", "combine_state.json")
+
+
+def load_state(path=COMBINE_STATE_FILE):
+    if not os.path.exists(path):
+        return {"version": None, "agencies": {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_state(state, path=COMBINE_STATE_FILE):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def normalize(counts, peak):
+    # counts / peak, all zeros for an agency without datasets
+    return np.divide(counts, peak, out=np.zeros(len(counts)), where=peak > 0)
+
+
+def digest(df):
+    # changes whenever the agency's months or counts do
+    rows = df["month"].to_numpy("datetime64[ns]").tobytes() + df["datasets_created"].to_numpy("int64").tobytes()
+    return hashlib.sha1(rows).hexdigest()
+
+
+def combine_agency(monthly, previous, previous_peak):
+    # -> (combined rows, peak, months that changed)
+    counts = monthly["datasets_created"].to_numpy("float64")
+    peak = float(counts.max()) if len(counts) else 0.0
+    combined = monthly.reset_index(drop=True)
+    if previous is None or previous_peak != peak:
+        # new agency or new scale: every month of this agency moves
+        combined["normalized"] = normalize(counts, peak)
+        return combined, peak, len(combined)
+    # same scale: keep the stored value for months whose count didn't change
+    before = previous.set_index("month")
+    old_counts = before["datasets_created"].reindex(combined["month"]).to_numpy("float64")
+    normalized = before["normalized"].reindex(combined["month"]).to_numpy("float64", copy=True)
+    changed = old_counts != counts  # NaN (a new month) counts as changed
+    normalized[changed] = normalize(counts[changed], peak)
+    combined["normalized"] = normalized
+    return combined, peak, int(changed.sum())
+
+
+def combine_monthly(agencies=None, store_dir=store.STORE_DIR, state_file=COMBINE_STATE_FILE):
+    # Bring the combined table up to date -> ({agency: months changed}, version);
+    # agencies=None combines every monthly partition, otherwise only those
+    state = load_state(state_file)
+    entries = state.setdefault("agencies", {})
+    sources = store.partition_signatures("monthly", store_dir)
+    if agencies is not None:
+        # the store keys partitions by the normalized label ("doj-gov" -> "DOJ")
+        registered = {store.normalize_agency(agency) for agency in agencies}
+        sources = {agency: source for agency, source in sources.items() if agency in registered}
+    built = store.partition_signatures("combined", store_dir)
+    candidates = [agency for agency, source in sorted(sources.items())
+                  if not (agency in entries and entries[agency]["source"] == list(source) and agency in built)]
+    changed = {}
+    if candidates:
+        # one read of the changed agencies' partitions (not one per agency)
+        monthly = store.load("monthly", agencies=candidates, store_dir=store_dir)
+        rebuilt = [agency for agency in candidates if agency in built]
+        previous = store.load("combined", agencies=rebuilt, store_dir=store_dir) if rebuilt else None
+        previous = {} if previous is None else dict(list(previous.groupby("Agency", observed=True)))
+        parts = []
+        for agency, rows in monthly.groupby("Agency", observed=True):
+            entry = entries.get(agency)
+            combined, peak, months = combine_agency(rows, previous.get(agency), entry["max"] if entry else None)
+            parts.append(combined)
+            entries[agency] = {"source": list(sources[agency]), "max": peak, "rows": len(combined),
+                               "digest": digest(combined)}
+            if not entry or entry["digest"] != entries[agency]["digest"]:
+                changed[agency] = months
+        store.save("combined", pd.concat(parts, ignore_index=True), store_dir=store_dir)
+    gone = sorted((set(entries) | set(built)) - set(sources))
+    store.drop("combined", gone, store_dir)
+    for agency in gone:
+        entries.pop(agency, None)
+        changed[agency] = 0
+    if changed or state.get("version") is None:
+        digests = "".join(f"{agency}:{entries[agency]['digest']}\n" for agency in sorted(entries))
+        state["version"] = hashlib.sha1(digests.encode()).hexdigest()[:16]
+        state["updated"] = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    save_state(state, state_file)
+    return changed, state["version"]
@@ -1,181 +1,150 @@
 import pandas as pd
-import requests
-import plotly.express as px
-import dash
-from dash import dcc, html, Input, Output
 import os
-import time
+import sys
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+if __name__ == "__main__" and not __package__:
+    # `python data/fetch.py`: run as `python -m data` from the repo root, so
+    # the pipeline is imported once, as the data.* modules the dashboard uses
+    import runpy
+    sys.path[0] = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    runpy.run_module("data", run_name="__main__", alter_sys=True)
+    sys.exit()
 
 # === STEP 1: FETCH & CLEAN METADATA===
+# Importing this module does no network or file work beyond reading the
+# checkpoints; `python data/fetch.py` (or `python -m data`) is the CLI, see main().
 # ==============CDC==============
-from fetch_cdc import fetch_cdc_datasets_counts
-
-# ===============epa===============
-def fetch_epa_dataset_counts(start_year=2010):
-    base_url = "https://catalog.data.gov"
-    org_name = "epa-gov"
-    search_url = f"{base_url}/api/3/action/package_search"
-
-    params = {"fq": f"organization:{org_name}", "rows": 1000, "start": 0}
-    all_results = []
-
-    while True:
-        r = requests.get(search_url, params=params)
-        results = r.json()["result"]["results"]
-        if not results:
-            break
-        all_results.extend(results)
-        params["start"] += len(results)
-        if len(results) < 1000:
-            break
-
-    created_dates = [r.get("metadata_created") for r in all_results if r.get("metadata_created")]
-    df = pd.DataFrame({"createdAt": pd.to_datetime(created_dates, errors="coerce")})
-    df = df[df["createdAt"].dt.year >= start_year]
-    df["created_date"] = df["createdAt"].dt.date
-    counts = df.groupby("created_date").size().reset_index(name="datasets_created")
-    counts["Agency"] = "EPA"
-    counts.to_csv("data/epa_dataset_counts.csv", index=False)
-    print("✅ EPA fetch complete ✔️")
-
-# ========usda=============
-def fetch_usda_dataset_counts(start_year=2010):
-    base_url = "https://catalog.data.gov"
-    org_name = "usda-gov"
-    search_url = f"{base_url}/api/3/action/package_search"
-
-    params = {
-        "fq": f"organization:{org_name}",
-        "sort": "metadata_created asc",
-        "rows": 1000,
-        "start": 0
-    }
-    all_results = []
-
-    while True:
-        r = requests.get(search_url, params=params)
-        results = r.json()["result"]["results"]
-        if not results:
-            break
-        all_results.extend(results)
-        params["start"] += len(results)
-        if len(results) < 1000:
-            break
-
-    created_dates = [r.get("metadata_created") for r in all_results if r.get("metadata_created")]
-    df = pd.DataFrame({"createdAt": pd.to_datetime(created_dates, errors="coerce")})
-    df = df.dropna()
-    df = df[df["createdAt"].dt.year >= start_year]
-    df["created_date"] = df["createdAt"].dt.date
-
-    counts = df.groupby("created_date").size().reset_index(name="datasets_created")
-    counts["Agency"] = "USDA"
-    counts.to_csv("data/usda_dataset_counts.csv", index=False)
-
-    print("✅ USDA fetch complete ✔️")
-
-#=== NOAA ===#
-def fetch_noaa_created_timestamps(start_year=2010):
-    base_url = "https://catalog.data.gov"
-    org_name = "noaa-gov"
-    search_url = f"{base_url}/api/3/action/package_search"
-    batch_size = 1000
-    created_dates = []
-
-    print("🔍 Fetching ALL NOAA datasets (filtering locally)...")
-
-    start = 0
-    while True:
-        params = {
-            "fq": f"organization:{org_name}",
-            "rows": batch_size,
-            "start": start
-        }
+# fetch_cdc (bs4 + feedparser) is imported when CDC is actually fetched.
+
+# ==============CKAN (catalog.data.gov)==============
+# One pooled client shared by every CKAN agency below.
+# CKAN_MAX_WORKERS caps parallel page requests, CKAN_RATE_LIMIT (req/s) throttles them.
+# Only id + metadata_created are requested per package; CKAN_FULL_RECORDS=1
+# downloads complete package documents instead. CKAN_URL points the client
+# at another catalog (e.g. benchmarks/mock_catalog.py).
+from .ckan import CKANClient, CATALOG_URL, LIGHT_FIELDS, FACET_STATS_KEY
+
+ckan_client = CKANClient(
+    base_url=os.environ.get("CKAN_URL", CATALOG_URL),
+    max_workers=int(os.environ.get("CKAN_MAX_WORKERS", 8)),
+    rate_limit=float(os.environ.get("CKAN_RATE_LIMIT", 0)) or None,
+    fields=None if os.environ.get("CKAN_FULL_RECORDS") == "1" else LIGHT_FIELDS
+)
 
-        for attempt in range(3):
-            try:
-                r = requests.get(search_url, params=params, timeout=30)
-                r.raise_for_status()
-                break
-            except requests.exceptions.RequestException as e:
-                print(f"Attempt {attempt + 1} failed at start={start}: {e}")
-                time.sleep(5 * (attempt + 1))
-        else:
-            print(f"⚠️ Skipping batch at start={start} after 3 failed attempts.")
-            start += batch_size
-            continue
-
-        batch = r.json()["result"]["results"]
-        if not batch:
-            break
-
-        created_dates.extend([
-            item["metadata_created"]
-            for item in batch
-            if "metadata_created" in item
-        ])
-
-        print(f"✅ Fetched {start + len(batch)} records so far...")
-        start += batch_size
-        time.sleep(1)
-
-    if not created_dates:
-        print("⚠️ No NOAA data fetched.")
-        return pd.DataFrame()
-
-    df = pd.DataFrame({"createdAt": pd.to_datetime(created_dates, errors="coerce")})
-    df = df[df["createdAt"].dt.year >= start_year]
-    df["month"] = df["createdAt"].dt.to_period("M").dt.to_timestamp()
-    monthly = df.groupby("month").size().reset_index(name="datasets_created")
-    monthly["Agency"] = "NOAA"
-    monthly.to_csv("data/noaa_monthly_dataset_counts.csv", index=False)
-
-    print("✅ NOAA fetch complete ✔️")
-    return monthly
-
-# ======= ckan data (doj, nsf - started in 2019, census 2010 ========
-def fetch_ckan_dataset_counts(agency_key, output_csv, start_year=2010):
-    base_url = "https://catalog.data.gov"
-    search_url = f"{base_url}/api/3/action/package_search"
-
-    params = {
-        "fq": f"organization:{agency_key}",
-        "rows": 1000,
-        "start": 0
-    }
-
-    created_dates = []
-    print(f"🔍 Fetching CKAN data for: {agency_key}")
-
-    while True:
-        r = requests.get(search_url, params=params)
-        results = r.json().get("result", {}).get("results", [])
-
-        if not results:
-            break
-
-        for r in results:
-            created_str = r.get("metadata_created")
-            if created_str:
-                created_dates.append(created_str)
-
-        params["start"] += len(results)
-        if len(results) < 1000:
-            break
-
-    if not created_dates:
-        print(f"⚠️ No new records found for {agency_key}")
+# ==============INCREMENTAL FETCH==============
+# Each CKAN agency keeps a checkpoint (newest metadata_created + the ids at
+# that instant) in data/fetch_checkpoints.json. Normal runs only download
+# packages created since the checkpoint and add their counts to the existing
+# files; --full ignores checkpoints and rebuilds everything. An interrupted
+# crawl (crash, failed pages) resumes from its crawl checkpoint next run.
+from .checkpoints import (load_checkpoints, save_checkpoints, since_filter, seen_ids, advance, merge_counts,
+                          CrawlCheckpoint, IncompleteFetchError)
+from .aggregate import CreatedCounter
+
+# ==============DATA STORE==============
+# Everything is written to the Parquet store in data/store (see store.py);
+# the CSVs under data/ are exported from the same frames for compatibility.
+from . import store
+from .store import normalize_agency
+from .rollups import build_rollups, save_rollups, load_rollups, fingerprint
+from .combine import combine_monthly
+
+# ==============AGENCIES==============
+# Which agencies exist, where they come from and what they're called: data/registry.py
+from . import registry
+from .registry import AGENCIES, fetched, daily_csv, monthly_csv
+from . import bulk
+
+COMBINED_CSV = "data/combined_monthly.csv"
+
+# ==============TIMING==============
+# Per-page (ckan.py) and per-agency step timers; the run's histograms are
+# written to data/fetch_metrics.prom and served by the dashboard's /metrics.
+from .metrics import FETCH_STEP_SECONDS, profiled, write_textfile
+
+# agencies fetched at the same time by run() (CKAN pages are capped separately)
+FETCH_AGENCY_WORKERS = int(os.environ.get("FETCH_AGENCY_WORKERS", 6))
+
+checkpoints = load_checkpoints()
+checkpoint_lock = threading.Lock()
+
+
+def fetch_new_counts(org, start_year=2010, full=False, client=ckan_client, **extra_params):
+    # Streams every page into per-day counters -> (counter, checkpoint used);
+    # checkpoint is None for a full download
+    checkpoint = None if full else checkpoints.get(org)
+    failures_before = client.failures(org)
+    filters = since_filter(checkpoint)
+    counter = CreatedCounter(start_year, seen_ids(checkpoint))
+    crawl = CrawlCheckpoint(org, {"filters": list(filters), "start_year": start_year, "full": full, **extra_params})
+    saved = crawl.load()
+    if saved:
+        counter.restore(saved["counter"])
+        print(f"🔍 {org}: resuming an interrupted crawl ({counter.packages} packages already counted)")
+    last = {"crawl": saved["crawl"] if saved else None}
+
+    def progress(snapshot):
+        last["crawl"] = snapshot
+        crawl.save(snapshot, counter)
+
+    with profiled(f"fetch-{org}"), FETCH_STEP_SECONDS.time(normalize_agency(org), "download"):
+        counter.add_pages(client.iter_pages(org, filters, resume=last["crawl"], progress=progress, **extra_params))
+    client.report(org)
+    if client.failures(org) > failures_before:
+        # pages still missing after the re-fetch: merging a partial increment would
+        # leave a permanent gap behind the new mark, and a partial full download
+        # would under-count - keep the saved counts and retry the agency next run,
+        # from where this crawl stopped
+        if last["crawl"]:
+            crawl.save(last["crawl"], counter, force=True)
+        raise IncompleteFetchError(f"{org}: {client.failures(org) - failures_before} page(s) failed during the fetch")
+    return counter, checkpoint
+
+
+def existing_counts(table, agency, output_csv):
+    df = store.load(table, [agency])
+    if (df is None or df.empty) and os.path.exists(output_csv):
+        df = store.typed(table, pd.read_csv(output_csv))
+    return df
+
+
+def save_counts(counts, agency, output_csv, table, checkpoint):
+    # incremental runs add onto the saved counts, full runs replace them
+    with FETCH_STEP_SECONDS.time(agency, "save"):
+        counts = store.typed(table, counts)
+        if checkpoint:
+            counts = merge_counts(existing_counts(table, agency, output_csv), counts, store.TABLES[table]["date"])
+        return store.save(table, counts, csv_path=output_csv)
+
+
+def update_checkpoint(org, checkpoint, counter):
+    with checkpoint_lock:
+        checkpoints[org] = advance(checkpoint, counter)
+        if checkpoints[org] is None:
+            del checkpoints[org]
+        save_checkpoints(checkpoints)
+    # counts and mark are saved: nothing left to resume
+    CrawlCheckpoint(org, None).clear()
+
+
+# ======= every CKAN agency in the registry (data/registry.py) ========
+def fetch_ckan_counts(agency, full=False, client=ckan_client):
+    entry = AGENCIES[agency]
+    print(f"🔍 Fetching CKAN data for: {entry['org']}")
+    counter, checkpoint = fetch_new_counts(entry["org"], entry["start_year"], full, client)
+
+    if not counter.packages:
+        print(f"⚠️ No new records found for {entry['org']}")
+        CrawlCheckpoint(entry["org"], None).clear()  # the mark didn't move: the same query would resume it
         return
 
-    df = pd.DataFrame({"createdAt": pd.to_datetime(created_dates, errors="coerce")})
-    df = df.dropna()
-    df = df[df["createdAt"].dt.year >= start_year]
-    df["created_date"] = df["createdAt"].dt.date
-
-    counts = df.groupby("created_date").size().reset_index(name="datasets_created")
-    counts["Agency"] = agency_key.upper()
-    counts.to_csv(output_csv, index=False)
-    print(f"✅ {agency_key.upper()} fetch complete — {len(df)} records processed")
+    counts = counter.daily_counts(agency)
+    save_counts(counts, agency, daily_csv(agency), "daily", checkpoint)
+    update_checkpoint(entry["org"], checkpoint, counter)
+    print(f"✅ {agency} fetch complete — {counter.packages} new")
 
 # ======clean it up nice =======
 def clean_agency_file_by_month(filepath, agency_name):
@@ -189,82 +158,184 @@ def clean_agency_file_by_month(filepath, agency_name):
     return monthly_counts
 
 # === RUN FETCH + CLEAN + SAVE (ALL AGENCIES, 2010–present) ===
-
-#NOAA
-#noaa_data = fetch_noaa_created_timestamps()
-#noaa_data.to_csv("data/noaa_monthly.csv", index=False)
-#print("✅ NOAA monthly summary saved to noaa_monthly.csv")
-
-# CDC (Socrata)
-fetch_cdc_datasets_counts()
-cdc_monthly = clean_agency_file_by_month("data/cdc_dataset_counts.csv", "CDC")
-cdc_monthly.to_csv("data/cdc_monthly.csv", index=False)
-print("✅ CDC monthly summary saved to cdc_monthly.csv")
-
-# EPA
-fetch_epa_dataset_counts()
-epa_monthly = clean_agency_file_by_month("data/epa_dataset_counts.csv", "EPA")
-epa_monthly.to_csv("data/epa_monthly.csv", index=False)
-print("✅ EPA monthly summary saved to epa_monthly.csv")
-
-# HHS
-fetch_ckan_dataset_counts("hhs-gov", "data/hhs_dataset_counts.csv")
-hhs_monthly = clean_agency_file_by_month("data/hhs_dataset_counts.csv", "HHS")
-hhs_monthly.to_csv("data/hhs_monthly.csv", index=False)
-print("✅ HHS monthly summary saved to hhs_monthly.csv")
-
-# DOJ
-fetch_ckan_dataset_counts("doj-gov", "data/doj_dataset_counts.csv")
-doj_monthly = clean_agency_file_by_month("data/doj_dataset_counts.csv", "DOJ")
-doj_monthly.to_csv("data/doj_monthly.csv", index=False)
-print("✅ DOJ monthly summary saved to doj_monthly.csv")
-
-# USDA
-fetch_ckan_dataset_counts("usda-gov", "data/usda_dataset_counts.csv")
-usda_monthly = clean_agency_file_by_month("data/usda_dataset_counts.csv", "USDA")
-usda_monthly.to_csv("data/usda_monthly.csv", index=False)
-print("✅ USDA monthly summary saved to usda_monthly.csv")
-
-# NSF
-fetch_ckan_dataset_counts("nsf-gov", "data/nsf_dataset_counts.csv")
-nsf_monthly = clean_agency_file_by_month("data/nsf_dataset_counts.csv", "NSF")
-nsf_monthly.to_csv("data/nsf_monthly.csv", index=False)
-print("✅ NSF monthly summary saved to nsf_monthly.csv")
-
-#census
-#fetch_ckan_dataset_counts("census-gov", "data/census_monthly.csv")
-#census_monthly = clean_agency_file_by_month("data/census_monthly.csv", "Census")
-#census_monthly.to_csv("data/census_monthly.csv", index=False)
-#print("✅ Census monthly summary saved to census_monthly.csv")
-
-
-# Helper to safely load a CSV
-def safe_read(path):
-    if os.path.exists(path):
-        df = pd.read_csv(path, parse_dates=["month"])
-        if not df.empty and "datasets_created" in df.columns:
-            return df
-    return None
-
-# Only include valid, non-empty files
-dataframes = [
-    safe_read("data/cdc_monthly.csv"),
-    safe_read("data/epa_monthly.csv"),
-    safe_read("data/hhs_monthly.csv"),
-    safe_read("data/doj_monthly.csv"),
-    safe_read("data/usda_monthly.csv"),
-    safe_read("data/nsf_monthly.csv"),
-    safe_read("data/noaa_monthly.csv"),
-    safe_read("data/census_monthly.csv")
-]
-
-# Filter out None entries
-dataframes = [df for df in dataframes if df is not None]
-
-# Combine safely
-combined_df = pd.concat(dataframes, ignore_index=True)
-combined_df["normalized"] = combined_df.groupby("Agency")["datasets_created"].transform(
-    lambda x: x / x.max() if x.max() > 0 else 0
-)
-combined_df.to_csv("data/combined_monthly.csv", index=False)
-print("✅ combined_monthly complete ✔️")
+# Nothing below runs on import: refresh.py (the dashboard's background
+# scheduler) imports this module and calls refresh_agency() / combine();
+# `python data/fetch.py` / `python -m data` call main(): run() for every
+# agency (or --agencies), or --dry-run to only print the plan.
+
+def fetch_cdc_counts(full=False):
+    # CDC (Socrata/RSS/scrape) has no checkpoints, every run is complete
+    from .fetch_cdc import fetch_cdc_datasets_counts
+    with FETCH_STEP_SECONDS.time("CDC", "download"):
+        fetch_cdc_datasets_counts()
+    store.save("daily", pd.read_csv("data/cdc_dataset_counts.csv"))
+
+
+# registry source -> fetch(agency, full); "csv" agencies aren't fetched
+SOURCE_FETCHERS = {
+    "ckan": fetch_ckan_counts,
+    "cdc": lambda agency, full: fetch_cdc_counts(full),
+}
+
+
+def prepare_store():
+    # First run with the store: seed it from the CSVs already in data/
+    if not store.exists("monthly"):
+        store.import_csvs()
+    # pick up checkpoints written by another process since we last looked
+    with checkpoint_lock:
+        checkpoints.clear()
+        checkpoints.update(load_checkpoints())
+
+
+def save_monthly(agency):
+    # one agency's monthly partition + CSV from its daily file
+    if not os.path.exists(daily_csv(agency)):
+        print(f"⚠️ No daily counts for {agency} yet, skipping its monthly summary")
+        return
+    monthly = clean_agency_file_by_month(daily_csv(agency), agency)
+    store.save("monthly", monthly, csv_path=monthly_csv(agency))
+    print(f"✅ {agency} monthly summary saved to {os.path.basename(monthly_csv(agency))}")
+
+
+def refresh_agency(agency, full=False):
+    # download + save one agency (daily and monthly); raises IncompleteFetchError
+    # when an incremental fetch lost pages - the saved counts are left as they were
+    SOURCE_FETCHERS[AGENCIES[agency]["source"]](agency, full)
+    save_monthly(agency)
+
+
+def combine():
+    # Bring the combined table up to date: only agencies whose monthly
+    # partition changed are re-read and re-normalized (data/combine.py)
+    with FETCH_STEP_SECONDS.time("all", "combine"):
+        changed, version = combine_monthly(agencies=list(registry.load()))  # incl. ones registered since import
+        combined_df = store.load("combined")
+    if changed:
+        names = ", ".join(sorted(changed)) if len(changed) <= 10 else f"{len(changed)} agencies"
+        print(f"✅ combined_monthly updated for {names} (data version {version}) ✔️")
+    else:
+        print(f"✅ combined_monthly unchanged (data version {version}) ✔️")
+
+    # Window totals + YoY slope series the dashboard would otherwise compute
+    # per request; rebuilt when the data or the current month changed. Written
+    # before the CSV so the CSV-only dashboard never sees new data with old
+    # rollups (the store's readers check rollups.fingerprint() instead)
+    rollups = load_rollups()
+    if changed or not rollups or rollups.get("data_version") != fingerprint(combined_df) \
+            or rollups.get("anchor") != pd.Timestamp.today().strftime("%Y-%m"):
+        with FETCH_STEP_SECONDS.time("all", "rollups"):
+            save_rollups(build_rollups(combined_df))
+        print("✅ rollups.json complete ✔️")
+
+    if changed or not os.path.exists(COMBINED_CSV):
+        with FETCH_STEP_SECONDS.time("all", "combine"):
+            store.export_csv("combined", combined_df, COMBINED_CSV)
+
+    publish_snapshot()
+    write_textfile("data/fetch_metrics.prom")
+    print("✅ fetch_metrics.prom complete ✔️")
+    return combined_df
+
+
+def publish_snapshot():
+    # The store is complete now: parse it once, here, into the snapshot every
+    # dashboard worker maps (snapshot.py at the repo root); its CURRENT marker
+    # is what they watch
+    import snapshot
+    if snapshot.SNAPSHOT_ENABLED:
+        with FETCH_STEP_SECONDS.time("all", "snapshot"):
+            snapshot.publish()
+
+
+def plan(agencies, full=False):
+    # --dry-run: what run() would fetch and write, without any request
+    marks = load_checkpoints()
+    for agency in agencies:
+        entry = AGENCIES[agency]
+        if entry["source"] != "ckan":
+            mode = f"{entry['source']}, full (no checkpoints)"
+        elif full or entry["org"] not in marks:
+            mode = f"{entry['org']}, full download from {entry['start_year']}"
+        else:
+            mode = f"{entry['org']}, incremental since {marks[entry['org']]['metadata_created']}"
+        print(f"🔍 {agency}: {mode} -> {daily_csv(agency)}, {monthly_csv(agency)}")
+    print("🔍 then: combined_monthly.csv, rollups.json, fetch_metrics.prom (changed agencies only)")
+
+
+def plan_bulk(full=False, register=False):
+    months = bulk.due_months(bulk.load_state(), full=full)
+    facet = [label for label, entry in AGENCIES.items() if entry["source"] == "facet"]
+    print(f"🔍 all organizations: {len(months)} faceted search(es), "
+          f"{months[0][0]:%Y-%m} to {months[-1][0]:%Y-%m}" if months else "🔍 all organizations: nothing due")
+    print(f"🔍 then: monthly counts for {len(facet)} registered facet agencies"
+          f"{' + every new organization' if register else ''}, combine")
+
+
+def run(full=False, agencies=None, workers=FETCH_AGENCY_WORKERS):
+    # Fetch the agencies at the same time, `workers` at most: CKAN agencies
+    # share the client's page pool, CDC (Socrata/RSS/scrape) runs alongside
+    # them. One agency failing doesn't stop the others.
+    prepare_store()
+    agencies = list(agencies or fetched())
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="agency") as agency_pool:
+        fetch_jobs = {
+            agency: agency_pool.submit(SOURCE_FETCHERS[AGENCIES[agency]["source"]], agency, full)
+            for agency in agencies
+        }
+        for agency, job in fetch_jobs.items():
+            try:
+                job.result()
+            except IncompleteFetchError as e:
+                print(f"⚠️ {e} — keeping the previous counts, it will be retried next run")
+            except Exception as e:
+                print(f"⚠️ {agency} fetch failed ({type(e).__name__}: {e}) — keeping the previous counts")
+            save_monthly(agency)
+    return combine()
+
+
+def run_bulk(full=False, register=False):
+    # Every organization's monthly counts from faceted searches (bulk.py),
+    # instead of one crawl per agency; then the usual combine
+    prepare_store()
+    with FETCH_STEP_SECONDS.time("all", "bulk"):
+        state, failed = bulk.crawl(ckan_client, full=full)
+    client_stats = ckan_client.agency_stats.get(FACET_STATS_KEY, {})
+    saved = bulk.save(state, register=register)
+    print(f"✅ Bulk crawl complete ✔️ ({len(saved)} agencies, {client_stats.get('requests', 0)} requests)")
+    if failed:
+        print(f"⚠️ {failed} month(s) failed, they are asked for again next run")
+    return combine()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fetch dataset counts for every agency")
+    parser.add_argument("--full", action="store_true", help="ignore checkpoints and re-download every agency")
+    parser.add_argument("--agencies", nargs="+", choices=fetched(), metavar="AGENCY",
+                        help="only these agencies (default: every fetched agency in data/registry.py)")
+    parser.add_argument("--workers", type=int, default=FETCH_AGENCY_WORKERS,
+                        help="agencies fetched at the same time (1 = one after another)")
+    parser.add_argument("--all-orgs", action="store_true",
+                        help="monthly counts for every data.gov organization from faceted searches (bulk.py)")
+    parser.add_argument("--register-orgs", action="store_true",
+                        help="with --all-orgs: add organizations missing from the registry as facet agencies")
+    parser.add_argument("--dry-run", action="store_true", help="print what would be fetched and exit")
+    args = parser.parse_args(argv)
+    if args.register_orgs and not args.all_orgs:
+        parser.error("--register-orgs only applies to --all-orgs")
+    if args.dry_run:
+        if args.all_orgs:
+            plan_bulk(full=args.full, register=args.register_orgs)
+        else:
+            plan(args.agencies or fetched(), full=args.full)
+        return None
+    try:
+        if args.all_orgs:
+            return run_bulk(full=args.full, register=args.register_orgs)
+        return run(full=args.full, agencies=args.agencies, workers=args.workers)
+    finally:
+        ckan_client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,3 @@
-import requests
 from bs4 import BeautifulSoup
 import pandas as pd
 from datetime import datetime
@@ -6,14 +5,27 @@ from datetime import date
 import os
 import re
 import feedparser
+import time
+import json
 import urllib3
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, wait
+from .checkpoints import IncompleteFetchError
+from .http_cache import cached_get, load_cached
+
+# CDC_*_URL override a source, e.g. to point at benchmarks/mock_catalog.py
+SOCRATA_URL = os.environ.get("CDC_SOCRATA_URL", "https://data.cdc.gov/api/views/metadata/v1")
+MMWR_FEED_URL = os.environ.get("CDC_MMWR_URL", "https://tools.cdc.gov/api/v2/resources/media/403372.rss")
+VAERS_URL = os.environ.get("CDC_VAERS_URL", "https://vaers.hhs.gov/data/datasets.html")
+VSRR_URL = os.environ.get("CDC_VSRR_URL", "https://www.cdc.gov/nchs/nvss/vsrr.htm")
+
+# total wall-clock budget for all four CDC sources together (seconds)
+CDC_TIMEOUT_BUDGET = float(os.environ.get("CDC_TIMEOUT_BUDGET", 60))
+CDC_STATS_FILE = "data/cdc_fetch_stats.json"
 
 # === STEP 1: Fetch CDC Socrata datasets ===
-def fetch_cdc_socrata(start_year=2010):
-    url = "https://data.cdc.gov/api/views/metadata/v1"
-    r = requests.get(url)
+def parse_cdc_socrata(r, start_year=2010):
     raw_data = r.json()
     df = pd.DataFrame(raw_data)
     df["createdAt"] = pd.to_datetime(df["createdAt"], errors="coerce")
@@ -22,13 +34,17 @@ def fetch_cdc_socrata(start_year=2010):
     df["created_date"] = df["createdAt"].dt.date
     counts = df.groupby("created_date").size().reset_index(name="datasets_created")
     counts["Agency"] = "CDC"
-    print("✅ CDC Socrata fetch complete ✔️")
     return counts
 
+def fetch_cdc_socrata(start_year=2010, timeout=30, deadline=None):
+    counts, stats = cached_get("cdc_socrata", SOCRATA_URL, lambda r: parse_cdc_socrata(r, start_year),
+                               timeout=timeout, deadline=deadline)
+    print("✅ CDC Socrata fetch complete ✔️")
+    return counts, stats
+
 # === STEP 2: Fetch MMWR release dates from RSS ===
-def fetch_mmwr_rss():
-    feed_url = "https://tools.cdc.gov/api/v2/resources/media/403372.rss"
-    feed = feedparser.parse(feed_url)
+def parse_mmwr_rss(r):
+    feed = feedparser.parse(r.content)
     dates = []
 
     for entry in feed.entries:
@@ -43,13 +59,17 @@ def fetch_mmwr_rss():
     df["datasets_created"] = 1
     df = df.groupby("created_date").size().reset_index(name="datasets_created")
     df["Agency"] = "CDC"
-    print(f"✅ MMWR RSS pulled {len(df)} entries ✔️")
     return df
 
+def fetch_mmwr_rss(timeout=30, deadline=None):
+    # fetched with requests (not feedparser's own client) so the feed shares
+    # the timeout budget and the ETag/Last-Modified cache
+    df, stats = cached_get("cdc_mmwr", MMWR_FEED_URL, parse_mmwr_rss, timeout=timeout, deadline=deadline)
+    print(f"✅ MMWR RSS pulled {len(df)} entries ✔️")
+    return df, stats
+
 # === STEP 3: Scrape VAERS release date from CDC Wonder ===
-def fetch_vaers_dataset_counts():
-    url = "https://vaers.hhs.gov/data/datasets.html"
-    r = requests.get(url, verify = False)
+def parse_vaers_dataset_counts(r):
     soup = BeautifulSoup(r.text, "html.parser")
 
     # Match things like 2023VAERSDATA.csv, 2024VAERSVAX.csv, etc.
@@ -62,22 +82,26 @@ def fetch_vaers_dataset_counts():
             year = match.group(1)
             year_counts[year] += 1
 
-    if year_counts:
-        df = pd.DataFrame([
-            {"created_date": date.today(), "year": int(year), "datasets_created": count, "Agency": "CDC"}
-            for year, count in sorted(year_counts.items())
-        ])
-        print("✅ VAERS dataset counts by year:")
-        print(df)
-        return df
-    else:
+    return pd.DataFrame(
+        [{"year": int(year), "datasets_created": count, "Agency": "CDC"} for year, count in sorted(year_counts.items())],
+        columns=["year", "datasets_created", "Agency"]
+    )
+
+def fetch_vaers_dataset_counts(timeout=30, deadline=None):
+    counts, stats = cached_get("cdc_vaers", VAERS_URL, parse_vaers_dataset_counts, timeout=timeout, verify=False,
+                               deadline=deadline)
+    if counts.empty:
         print("⚠️ No VAERS datasets found on page.")
-        return pd.DataFrame(columns=["created_date", "year", "datasets_created", "Agency"])
+        return pd.DataFrame(columns=["created_date", "year", "datasets_created", "Agency"]), stats
+    # counts are stamped with the run date, cached or not
+    df = counts.copy()
+    df.insert(0, "created_date", date.today())
+    print("✅ VAERS dataset counts by year:")
+    print(df)
+    return df, stats
 
 # === STEP 4: Scrape VSRR release dates from NCHS ===
-def fetch_vsrr_release_dates():
-    url = "https://www.cdc.gov/nchs/nvss/vsrr.htm"
-    r = requests.get(url, verify=False)
+def parse_vsrr_release_dates(r):
     soup = BeautifulSoup(r.text, "html.parser")
 
     links = soup.select("section.card-body a")
@@ -98,21 +122,84 @@ def fetch_vsrr_release_dates():
     df["datasets_created"] = 1
     df = df.groupby("created_date").size().reset_index(name="datasets_created")
     df["Agency"] = "CDC"
-    print("✅ VSRR scrape complete ✔️")
     return df
 
+def fetch_vsrr_release_dates(timeout=30, deadline=None):
+    df, stats = cached_get("cdc_vsrr", VSRR_URL, parse_vsrr_release_dates, timeout=timeout, verify=False,
+                           deadline=deadline)
+    print("✅ VSRR scrape complete ✔️")
+    return df, stats
+
+# === Parallel collection of the four CDC sources ===
+CDC_SOURCES = {
+    "cdc_socrata": fetch_cdc_socrata,
+    "cdc_mmwr": fetch_mmwr_rss,
+    "cdc_vaers": fetch_vaers_dataset_counts,
+    "cdc_vsrr": fetch_vsrr_release_dates,
+}
+
+def collect_cdc_sources(timeout_budget=CDC_TIMEOUT_BUDGET):
+    # All sources run at once against one deadline, which the transport
+    # enforces too: no attempt (or retry) starts after it, each one's timeout
+    # is cut to the time left and a late answer isn't written to the cache. A
+    # source that fails or runs over falls back to its last cached result (if
+    # any) instead of holding up the whole run; stats["cache"] == "none" marks
+    # a source with neither.
+    deadline = time.monotonic() + timeout_budget
+    pool = ThreadPoolExecutor(max_workers=len(CDC_SOURCES))
+    futures = {
+        name: pool.submit(fetch, timeout=timeout_budget, deadline=deadline)
+        for name, fetch in CDC_SOURCES.items()
+    }
+    wait(futures.values(), timeout=max(0.0, deadline - time.monotonic()))
+    pool.shutdown(wait=False, cancel_futures=True)
+
+    frames, run_stats = [], []
+    for name, future in futures.items():
+        if future.done() and future.exception() is None:
+            df, stats = future.result()
+        else:
+            reason = "timed out" if not future.done() else future.exception()
+            df = load_cached(name)
+            stats = {"source": name, "status": None, "bytes": 0, "seconds": None,
+                     "cache": "stale" if df is not None else "none", "error": str(reason)}
+            print(f"⚠️ {name} failed ({reason}), using {'cached' if df is not None else 'no'} data")
+            if df is not None and name == "cdc_vaers":
+                df = df.assign(created_date=date.today())
+        if df is not None and not df.empty:
+            frames.append(df)
+        run_stats.append(stats)
+
+    for stats in run_stats:
+        seconds = "-" if stats["seconds"] is None else f"{stats['seconds']:.2f}s"
+        print(f"📦 {stats['source']}: {seconds}, {stats['bytes'] / 1024:.1f} KB, cache {stats['cache']}")
+    return frames, run_stats
+
+def save_fetch_stats(run_stats, path=CDC_STATS_FILE):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump({"fetched_at": datetime.now().isoformat(timespec="seconds"), "sources": run_stats}, f, indent=2)
+    os.replace(tmp, path)
+
 # === STEP 5: Combine, save daily, and generate monthly summary ===
-def fetch_cdc_datasets_counts(output_path_daily="data/cdc_dataset_counts.csv", output_path_monthly="data/cdc_monthly.csv"):
-    socrata_df = fetch_cdc_socrata()
-    mmwr_df = fetch_mmwr_rss()
-    vaers_df = fetch_vaers_dataset_counts()
-    vsrr_df = fetch_vsrr_release_dates()
+def fetch_cdc_datasets_counts(output_path_daily="data/cdc_dataset_counts.csv", output_path_monthly="data/cdc_monthly.csv", timeout_budget=CDC_TIMEOUT_BUDGET):
+    frames, run_stats = collect_cdc_sources(timeout_budget)
+    save_fetch_stats(run_stats)
+    missing = [stats["source"] for stats in run_stats if stats["cache"] == "none"]
+    if missing:
+        # CDC's daily counts are the sum of all four sources: without one of
+        # them (fresh or cached) the file would silently lose its datasets
+        raise IncompleteFetchError(f"CDC: no data from {', '.join(missing)} (and nothing cached), "
+                                   f"keeping the existing daily file")
 
-    combined = pd.concat([socrata_df, mmwr_df, vaers_df, vsrr_df], ignore_index=True)
+    combined = pd.concat(frames, ignore_index=True)
     combined = combined.groupby(["created_date", "Agency"]).agg({"datasets_created": "sum"}).reset_index()
     os.makedirs(os.path.dirname(output_path_daily), exist_ok=True)
-    combined.to_csv(output_path_daily, index=False)
+    tmp = f"{output_path_daily}.tmp"
+    combined.to_csv(tmp, index=False)
+    os.replace(tmp, output_path_daily)
     print(f"✅ Combined CDC daily data saved to {output_path_daily}")
+    return run_stats
 
 # === Run when called directly ===
 if __name__ == "__main__":
@@ -0,0 +1,87 @@
+import json
+import os
+import time
+
+import pandas as pd
+
+from .transport import DeadlineExceeded, Transport
+
+# ===== CONDITIONAL GET CACHE =====
+# For sources that rarely change we keep the validators (ETag /
+# Last-Modified) and the *parsed* result on disk. The next request sends
+# If-None-Match / If-Modified-Since; a 304 means we reuse the saved frame and
+# skip downloading and parsing the HTML/RSS/JSON altogether.
+#
+#   data/http_cache/<name>.json      validators + url
+#   data/http_cache/<name>.parquet   parsed DataFrame
+#
+# Requests go through the shared transport (retries, backoff, per-host rate
+# limit and circuit breaker).
+
+CACHE_DIR = os.path.join("data", "http_cache")
+
+_transport = Transport()
+
+
+def _paths(name, cache_dir):
+    return os.path.join(cache_dir, f"{name}.json"), os.path.join(cache_dir, f"{name}.parquet")
+
+
+def load_cached(name, cache_dir=CACHE_DIR):
+    # last parsed result for a source, or None
+    _, data_path = _paths(name, cache_dir)
+    if not os.path.exists(data_path):
+        return None
+    return pd.read_parquet(data_path)
+
+
+def _save(name, url, response, df, cache_dir):
+    os.makedirs(cache_dir, exist_ok=True)
+    meta_path, data_path = _paths(name, cache_dir)
+    df.to_parquet(f"{data_path}.tmp", index=False)
+    os.replace(f"{data_path}.tmp", data_path)
+    meta = {
+        "url": url,
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+    }
+    with open(f"{meta_path}.tmp", "w") as f:
+        json.dump(meta, f)
+    os.replace(f"{meta_path}.tmp", meta_path)
+
+
+def cached_get(name, url, parse, transport=None, timeout=30, verify=True, cache_dir=CACHE_DIR, deadline=None):
+    # GET `url` with validators from the last run; parse(response) -> DataFrame
+    # only runs on a 200. Returns (DataFrame, stats). With a deadline
+    # (time.monotonic()), a response that arrives after it is dropped
+    # (DeadlineExceeded) and the cache is left alone.
+    meta_path, _ = _paths(name, cache_dir)
+    headers = {}
+    cached = load_cached(name, cache_dir)
+    if cached is not None and os.path.exists(meta_path):
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if meta.get("url") == url:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+    start = time.perf_counter()
+    r = (transport or _transport).get(url, headers=headers, timeout=timeout, verify=verify, deadline=deadline)
+    if deadline is not None and time.monotonic() > deadline:
+        raise DeadlineExceeded(f"{name} answered after the deadline")
+    stats = {"source": name, "status": r.status_code, "bytes": len(r.content)}
+
+    if r.status_code == 304 and cached is not None:
+        df = cached
+        stats["cache"] = "hit"
+    else:
+        r.raise_for_status()
+        df = parse(r)
+        if deadline is not None and time.monotonic() > deadline:
+            raise DeadlineExceeded(f"{name} parsed after the deadline")
+        _save(name, url, r, df, cache_dir)
+        stats["cache"] = "miss"
+    stats["seconds"] = round(time.perf_counter() - start, 3)
+    return df, stats
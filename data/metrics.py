@@ -0,0 +1,163 @@
+import bisect
+import cProfile
+import functools
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+# ===== TIMING METRICS =====
+# Small in-process histograms in the Prometheus text format, cheap enough to
+# leave on: one perf_counter() pair, a bisect and a locked increment per
+# observation. app.py serves them at /metrics (per gunicorn worker, like the
+# caches); data/fetch.py writes its run to data/fetch_metrics.prom, which
+# /metrics appends so the last refresh shows up next to the dashboard's numbers.
+#
+# INKWELL_PROFILE_SAMPLE=<0..1> profiles that fraction of profiled() calls with
+# cProfile and dumps .prof files to INKWELL_PROFILE_DIR (default "profiles").
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+PROFILE_SAMPLE = float(os.environ.get("INKWELL_PROFILE_SAMPLE", 0) or 0)
+PROFILE_DIR = os.environ.get("INKWELL_PROFILE_DIR", "profiles")
+
+
+class Histogram:
+    def __init__(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}  # label values -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def time(self, *labels):
+        return _Timer(self, labels)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {labels: list(values) for labels, values in self._series.items()}
+        for labels, values in sorted(series.items()):
+            label_text = ",".join(f'{k}="{_escape(v)}"' for k, v in zip(self.labelnames, labels))
+            prefix = label_text + "," if label_text else ""
+            cumulative = 0
+            for bound, count in zip(self.buckets, values):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+            cumulative += values[len(self.buckets)]
+            lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {cumulative}')
+            braces = f"{{{label_text}}}" if label_text else ""
+            lines.append(f"{self.name}_sum{braces} {values[-1]:.6f}")
+            lines.append(f"{self.name}_count{braces} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "start")
+
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, *self.labels)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# === the metrics we keep ===
+STAGE_SECONDS = Histogram(
+    "inkwell_stage_seconds", "Time spent in each stage of a dashboard callback or fetch step", ("component", "stage"))
+CALLBACK_SECONDS = Histogram(
+    "inkwell_callback_seconds", "Total time per dashboard callback", ("callback",))
+REQUEST_SECONDS = Histogram(
+    "inkwell_http_request_seconds", "Flask request time, including Dash serialization", ("route", "status"))
+FETCH_PAGE_SECONDS = Histogram(
+    "inkwell_fetch_page_seconds", "Time per CKAN package_search page (request + JSON parse)", ("agency",))
+FETCH_STEP_SECONDS = Histogram(
+    "inkwell_fetch_step_seconds", "Time per data/fetch.py step and agency", ("agency", "step"))
+
+APP_METRICS = [STAGE_SECONDS, CALLBACK_SECONDS, REQUEST_SECONDS]
+FETCH_METRICS = [FETCH_PAGE_SECONDS, FETCH_STEP_SECONDS]
+REGISTRY = APP_METRICS + FETCH_METRICS
+
+
+def stage(component, name):
+    # with stage("update_graphs", "load"): ...
+    return STAGE_SECONDS.time(component, name)
+
+
+def stage_timer(component, prefix=""):
+    # stage() bound to one component, for code that takes a timer callback
+    return lambda name: STAGE_SECONDS.time(component, prefix + name)
+
+
+def render(histograms=REGISTRY):
+    # empty histograms are left out, so the app's families and the ones in a
+    # fetch textfile never appear twice in /metrics
+    return "".join(histogram.render() for histogram in histograms if histogram._series)
+
+
+def write_textfile(path, histograms=FETCH_METRICS):
+    # node_exporter "textfile" style snapshot of this process's fetch metrics
+    # (only those: a refresh inside the dashboard shares this registry)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        f.write(render(histograms))
+    os.replace(tmp, path)
+
+
+# === sampled cProfile captures ===
+_profile_lock = threading.Lock()
+
+
+@contextmanager
+def profiled(name, sample=None):
+    rate = PROFILE_SAMPLE if sample is None else sample
+    # only one capture at a time: cProfile hooks are per thread and costly
+    if not rate or random.random() >= rate or not _profile_lock.acquire(blocking=False):
+        yield
+        return
+    profile = cProfile.Profile()
+    try:
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        profile.dump_stats(os.path.join(PROFILE_DIR, f"{name}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.prof"))
+    finally:
+        _profile_lock.release()
+
+
+def timed_callback(name):
+    # decorator: callback total time + sampled profiling
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with profiled(name), CALLBACK_SECONDS.time(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
@@ -0,0 +1,115 @@
+import json
+import os
+
+from .store import normalize_agency
+
+# ===== AGENCY REGISTRY =====
+# Every agency the pipeline and the dashboard know about, declared once:
+#   label       how the store and the dashboard name it; for CKAN orgs what
+#               store.normalize_agency(org) gives ("epa-gov" -> "EPA")
+#   org         CKAN organization (checkpoints are kept per org)
+#   source      ckan  catalog.data.gov, crawled by the shared CKAN client
+#               cdc   CDC's Socrata catalog + MMWR RSS + VAERS/VSRR scrapes (fetch_cdc.py)
+#               csv   not fetched: the committed data/<label>_monthly.csv is the data
+#               facet monthly counts only, from the bulk crawl of every
+#                     organization (`fetch.py --all-orgs`, bulk.py)
+#   start_year  first year counted
+# data/fetch.py runs every fetched agency through the same engine (run():
+# FETCH_AGENCY_WORKERS agencies and CKAN_MAX_WORKERS pages at a time, however
+# many are registered), the combine step includes exactly these agencies and
+# app.py builds its agency dropdown from them.
+#
+# More agencies (up to every data.gov organization) go in INKWELL_AGENCIES_FILE
+# (default data/agencies.json), no code needed; its entries add to or replace
+# the built-in ones, label defaults to the org's:
+#   [{"org": "doe-gov"}, {"org": "nasa-gov", "start_year": 2015}]
+# `fetch.py --all-orgs --register-orgs` adds the organizations the bulk crawl
+# finds there as source "facet" (without --register-orgs their counts are only
+# kept in data/bulk_state.json). Two entries of the file may not end up with
+# the same store label (normalize_agency) for different orgs.
+
+AGENCIES_FILE = os.environ.get("INKWELL_AGENCIES_FILE", os.path.join("data", "agencies.json"))
+SOURCES = ("ckan", "cdc", "csv", "facet")
+
+BUILTIN = [
+    {"label": "CDC", "org": "cdc", "source": "cdc"},
+    {"label": "Census", "org": "census-gov", "source": "csv"},
+    {"label": "DOJ", "org": "doj-gov", "source": "ckan"},
+    {"label": "EPA", "org": "epa-gov", "source": "ckan"},
+    {"label": "HHS", "org": "hhs-gov", "source": "ckan"},
+    {"label": "NSF", "org": "nsf-gov", "source": "ckan"},
+    {"label": "NOAA", "org": "noaa-gov", "source": "csv"},  # too big to crawl on every run
+    {"label": "USDA", "org": "usda-gov", "source": "ckan"},
+]
+
+
+def org_label(org):
+    # "doe-gov" -> "DOE" (the store's own mapping, e.g. "Census", still applies on save)
+    key = str(org).strip().upper()
+    return key[:-4] if key.endswith("-GOV") else key
+
+
+def load(path=AGENCIES_FILE):
+    # label -> entry: the built-in agencies, then the file's
+    extra = []
+    if path and os.path.exists(path):
+        with open(path) as f:
+            extra = json.load(f)
+    agencies = {}
+    from_file = {}  # store label -> org, for the file's entries
+    for i, entry in enumerate(BUILTIN + extra):
+        entry = {"source": "ckan", "start_year": 2010, **entry}
+        entry.setdefault("label", org_label(entry["org"]))
+        if entry["source"] not in SOURCES:
+            raise ValueError(f"Unknown source {entry['source']!r} for {entry['label']}, expected one of {SOURCES}")
+        if i >= len(BUILTIN):
+            key = normalize_agency(entry["label"])
+            if from_file.setdefault(key, entry["org"]) != entry["org"]:
+                raise ValueError(f"{path}: {from_file[key]} and {entry['org']} are both labelled {key}, "
+                                 f"give one of them its own \"label\"")
+        agencies[entry["label"]] = entry
+    return agencies
+
+
+AGENCIES = load()
+
+
+def register(entries, path=AGENCIES_FILE):
+    # append entries to the registry file (written atomically)
+    existing = []
+    if os.path.exists(path):
+        with open(path) as f:
+            existing = json.load(f)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(existing + list(entries), f, indent=1)
+    os.replace(tmp, path)
+
+
+def unique_label(org, taken):
+    # org_label(org), or with -2, -3... when another org already has that
+    # store label (e.g. "nasa" and "nasa-gov" are both NASA); adds it to taken
+    base = org_label(org)
+    label, n = base, 1
+    while normalize_agency(label) in taken:
+        n += 1
+        label = f"{base}-{n}"
+    taken.add(normalize_agency(label))
+    return label
+
+
+def fetched(agencies=AGENCIES):
+    # labels the pipeline downloads one by one (CKAN crawls and CDC)
+    return [label for label, entry in agencies.items() if entry["source"] in ("ckan", "cdc")]
+
+
+def daily_csv(label):
+    return os.path.join("data", f"{label.lower()}_dataset_counts.csv")
+
+
+def monthly_csv(label):
+    return os.path.join("data", f"{label.lower()}_monthly.csv")
+
+
+def dropdown_options(agencies=AGENCIES):
+    return [{"label": label, "value": label} for label in agencies]
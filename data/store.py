@@ -0,0 +1,181 @@
+import glob
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from pyarrow import fs
+
+# ===== COLUMNAR DATA STORE =====
+# One Parquet store for everything the pipeline produces, laid out as
+#   data/store/<table>/Agency=<label>/data.parquet
+# with typed dates, integer counts and a categorical Agency column on read.
+# Files are memory-mapped when read. The old CSVs are still written next to
+# it (export_csv) so the notebook and anything else reading them keeps working.
+#
+#   daily     created_date, Agency, datasets_created
+#   monthly   month, Agency, datasets_created
+#   combined  month, Agency, datasets_created, normalized
+
+STORE_DIR = os.path.join("data", "store")
+
+TABLES = {
+    "daily": {"date": "created_date", "csv_columns": ["created_date", "datasets_created", "Agency"]},
+    "monthly": {"date": "month", "csv_columns": ["month", "datasets_created", "Agency"]},
+    "combined": {"date": "month", "csv_columns": ["month", "datasets_created", "Agency", "normalized"]},
+}
+
+# labels that aren't just the upper-cased CKAN org name without "-gov"
+AGENCY_LABELS = {"CENSUS": "Census"}
+
+
+def normalize_agency(label):
+    # "doj-gov", "DOJ-GOV", "doj" -> "DOJ"; "census-gov" -> "Census"
+    key = str(label).strip().upper()
+    if key.endswith("-GOV"):
+        key = key[:-4]
+    return AGENCY_LABELS.get(key, key)
+
+
+def table_dir(table, store_dir=STORE_DIR):
+    if table not in TABLES:
+        raise ValueError(f"Unknown table {table!r}, expected one of {sorted(TABLES)}")
+    return os.path.join(store_dir, table)
+
+
+def typed(table, df):
+    # Enforce the store's column types on a frame coming from the pipeline or a CSV
+    date_col = TABLES[table]["date"]
+    df = df.copy()
+    df[date_col] = pd.to_datetime(df[date_col]).astype("datetime64[ns]")
+    df["Agency"] = df["Agency"].map(normalize_agency)
+    df["datasets_created"] = pd.to_numeric(df["datasets_created"]).fillna(0).astype("int64")
+    if "normalized" in df.columns:
+        df["normalized"] = df["normalized"].astype("float64")
+    columns = [c for c in TABLES[table]["csv_columns"] if c in df.columns]
+    return df[columns]
+
+
+def save(table, df, csv_path=None, replace=False, store_dir=STORE_DIR):
+    # Write one partition per agency in df (replacing those partitions only,
+    # or the whole table with replace=True); optionally export the CSV too.
+    # A partition whose rows are unchanged is left alone (same file, same
+    # signature), so readers keyed on signatures don't see a change.
+    df = typed(table, df)
+    root = table_dir(table, store_dir)
+    os.makedirs(root, exist_ok=True)
+    for agency, part in df.groupby("Agency", sort=True):
+        part_dir = os.path.join(root, f"Agency={agency}")
+        os.makedirs(part_dir, exist_ok=True)
+        data = pa.Table.from_pandas(part.drop(columns="Agency").reset_index(drop=True), preserve_index=False)
+        path = os.path.join(part_dir, "data.parquet")
+        if os.path.exists(path) and pq.read_table(path).equals(data):
+            continue
+        tmp = os.path.join(part_dir, ".data.parquet.tmp")
+        pq.write_table(data, tmp)
+        os.replace(tmp, path)
+    if replace:
+        keep = set(df["Agency"].unique())
+        drop(table, [agency for agency in partition_signatures(table, store_dir) if agency not in keep], store_dir)
+    if csv_path:
+        export_csv(table, df, csv_path)
+    return df
+
+
+def export_csv(table, df, path):
+    # same layout and date format as the CSVs the pipeline always wrote
+    date_col = TABLES[table]["date"]
+    out = df[[c for c in TABLES[table]["csv_columns"] if c in df.columns]].copy()
+    out[date_col] = out[date_col].dt.strftime("%Y-%m-%d")
+    tmp = f"{path}.tmp"
+    out.to_csv(tmp, index=False)
+    os.replace(tmp, path)
+
+
+def partition_files(table, store_dir=STORE_DIR):
+    return sorted(glob.glob(os.path.join(table_dir(table, store_dir), "Agency=*", "data.parquet")))
+
+
+def exists(table, store_dir=STORE_DIR):
+    return bool(partition_files(table, store_dir))
+
+
+def signature(table, store_dir=STORE_DIR):
+    # Changes whenever any partition of the table is rewritten; None if empty
+    stats = []
+    for path in partition_files(table, store_dir):
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        stats.append((path, st.st_mtime_ns, st.st_size))
+    return tuple(stats) or None
+
+
+def partition_signatures(table, store_dir=STORE_DIR):
+    # agency -> (mtime, size) of its partition file
+    stats = {}
+    for path in partition_files(table, store_dir):
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        stats[os.path.basename(os.path.dirname(path))[len("Agency="):]] = (st.st_mtime_ns, st.st_size)
+    return stats
+
+
+def drop(table, agencies, store_dir=STORE_DIR):
+    # remove these agencies' partitions
+    for agency in agencies:
+        part_dir = os.path.join(table_dir(table, store_dir), f"Agency={agency}")
+        for path in glob.glob(os.path.join(part_dir, "*")):
+            os.remove(path)
+        if os.path.isdir(part_dir):
+            os.rmdir(part_dir)
+
+
+def load(table, agencies=None, store_dir=STORE_DIR):
+    # Typed DataFrame for a table (optionally only some agencies), read via mmap
+    root = table_dir(table, store_dir)
+    if not exists(table, store_dir):
+        return None
+    dataset = ds.dataset(
+        root,
+        format="parquet",
+        partitioning=ds.partitioning(pa.schema([("Agency", pa.string())]), flavor="hive"),
+        filesystem=fs.LocalFileSystem(use_mmap=True),
+    )
+    expression = None
+    if agencies is not None:
+        expression = ds.field("Agency").isin([normalize_agency(a) for a in agencies])
+    df = dataset.to_table(filter=expression).to_pandas()
+    date_col = TABLES[table]["date"]
+    df["Agency"] = df["Agency"].astype("category")
+    df = df.sort_values(["Agency", date_col], kind="stable").reset_index(drop=True)
+    return df[[c for c in TABLES[table]["csv_columns"] if c in df.columns]]
+
+
+# === one-off import of the existing CSVs into the store ===
+def import_csvs(data_dir="data", store_dir=STORE_DIR):
+    for path in sorted(glob.glob(os.path.join(data_dir, "*_dataset_counts.csv"))):
+        df = pd.read_csv(path)
+        if "created_date" in df.columns and not df.empty:
+            save("daily", df, store_dir=store_dir)
+    for path in sorted(glob.glob(os.path.join(data_dir, "*_monthly.csv"))):
+        if os.path.basename(path) == "combined_monthly.csv":
+            continue
+        df = pd.read_csv(path)
+        if not df.empty:
+            save("monthly", df, store_dir=store_dir)
+    combined = os.path.join(data_dir, "combined_monthly.csv")
+    if os.path.exists(combined):
+        save("combined", pd.read_csv(combined), replace=True, store_dir=store_dir)
+
+
+if __name__ == "__main__":
+    import_csvs()
+    for name in TABLES:
+        df = load(name)
+        print(f"✅ {name}: {0 if df is None else len(df)} rows, agencies: "
+              f"{[] if df is None else list(df['Agency'].cat.categories)}")
@@ -0,0 +1,230 @@
+import email.utils
+import os
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+
+# ===== SHARED HTTP TRANSPORT =====
+# Every fetcher (CKAN pages, the CDC sources) goes through Transport.get():
+#   - retries on connection errors, timeouts, 429 and 5xx, with exponential
+#     backoff and full jitter (a random wait in [0, base * 2**attempt]),
+#     honouring Retry-After when the server sends one
+#   - a token bucket per host, shared by every thread and fetcher. A 429/503
+#     halves its rate (at most once a second, so a burst of rejections from
+#     requests already in flight counts once), each success adds a little
+#     back (AIMD), so a long crawl settles just under what the server accepts
+#   - a circuit breaker per host: after FETCH_BREAKER_FAILURES failures in a
+#     row, requests to that host fail fast for FETCH_BREAKER_COOLDOWN seconds,
+#     then a single trial request decides whether it closes again
+#
+# Callers get the response, or a requests exception once the retries are used
+# up; what to do with a page that could not be fetched is up to them (see
+# CKANClient's targeted re-fetch of failed pages). A caller with a time budget
+# passes deadline= (a time.monotonic() value): no attempt starts after it and
+# each attempt's timeout and backoff wait are cut to what is left of it.
+
+RETRIES = int(os.environ.get("FETCH_RETRIES", 4))
+BACKOFF = float(os.environ.get("FETCH_BACKOFF", 1.0))          # first retry waits up to this
+MAX_BACKOFF = float(os.environ.get("FETCH_MAX_BACKOFF", 60))    # cap for backoff and Retry-After
+THROTTLE_RATE = float(os.environ.get("FETCH_THROTTLE_RATE", 5))  # req/s after the first 429 on an unlimited host
+BREAKER_FAILURES = int(os.environ.get("FETCH_BREAKER_FAILURES", 8))
+BREAKER_COOLDOWN = float(os.environ.get("FETCH_BREAKER_COOLDOWN", 30))
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+THROTTLE_STATUSES = {429, 503}
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    pass
+
+
+class DeadlineExceeded(requests.exceptions.Timeout):
+    pass
+
+
+class TokenBucket:
+    # rate=None: unlimited until the server first pushes back
+    def __init__(self, rate=None, burst=1, max_rate=None, min_rate=1.0, increase=0.5):
+        self.rate = rate
+        self.max_rate = max_rate or rate
+        self.min_rate = min_rate
+        self.increase = increase
+        self.burst = burst
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+        self._last_cut = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            if not self.rate:
+                return
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= 1  # may go negative: later callers queue behind us
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+
+    def throttled(self):
+        with self._lock:
+            now = time.monotonic()
+            if now - self._last_cut < 1.0:
+                return
+            self._last_cut = now
+            self.rate = max(self.min_rate, (self.rate or THROTTLE_RATE * 2) / 2)
+
+    def succeeded(self):
+        with self._lock:
+            if not self.rate:
+                return
+            self.rate += self.increase
+            if self.max_rate:
+                self.rate = min(self.rate, self.max_rate)
+
+
+class CircuitBreaker:
+    def __init__(self, failures=BREAKER_FAILURES, cooldown=BREAKER_COOLDOWN):
+        self.threshold = failures
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at < self.cooldown or self._trial:
+                return False
+            self._trial = True  # half-open: let one request through
+            return True
+
+    def succeeded(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial = False
+
+    def failed(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial or self.failures >= self.threshold:
+                if self.opened_at is None or self._trial:
+                    print(f"⚠️ Circuit open after {self.failures} failures, pausing for {self.cooldown:.0f}s")
+                self.opened_at = time.monotonic()
+                self._trial = False
+
+    @property
+    def state(self):
+        with self._lock:
+            if self.opened_at is None:
+                return "closed"
+            return "half-open" if self._trial else "open"
+
+
+# one bucket + breaker per host, shared by every Transport in the process
+_hosts = {}
+_hosts_lock = threading.Lock()
+
+
+def host_state(url):
+    host = urlsplit(url).netloc
+    with _hosts_lock:
+        if host not in _hosts:
+            _hosts[host] = {"bucket": TokenBucket(), "breaker": CircuitBreaker()}
+        return _hosts[host]
+
+
+def limit_host(url, rate):
+    # cap a host at `rate` requests/s (CKAN_RATE_LIMIT); the adaptive rate never exceeds it
+    if rate:
+        bucket = host_state(url)["bucket"]
+        with bucket._lock:
+            bucket.rate = bucket.max_rate = rate
+
+
+def retry_after(response):
+    # seconds from a Retry-After header (delta-seconds or HTTP-date), or None
+    value = response.headers.get("Retry-After") if response is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class Transport:
+    def __init__(self, session=None, retries=RETRIES, backoff=BACKOFF, max_backoff=MAX_BACKOFF, timeout=30):
+        self.session = session or requests.Session()
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+
+    def _wait(self, attempt, response=None, deadline=None):
+        delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+        server_delay = retry_after(response)
+        if server_delay is not None:
+            delay = max(delay, min(server_delay, self.max_backoff))
+        if deadline is not None:
+            delay = min(delay, max(0.0, deadline - time.monotonic()))
+        time.sleep(delay)
+
+    def get(self, url, parse=None, deadline=None, **kwargs):
+        # -> response, or parse(response) when given; a parse error (truncated
+        # JSON, missing keys) is retried like a failed request
+        kwargs.setdefault("timeout", self.timeout)
+        timeout = kwargs["timeout"]
+        host = host_state(url)
+        bucket, breaker = host["bucket"], host["breaker"]
+        error = None
+        for attempt in range(self.retries):
+            if not breaker.allow():
+                raise CircuitOpenError(f"circuit open for {urlsplit(url).netloc}")
+            bucket.acquire()
+            if deadline is not None:
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    raise DeadlineExceeded(f"deadline passed before attempt {attempt + 1} for {url}"
+                                           + (f" (last error: {error})" if error else ""))
+                kwargs["timeout"] = min(timeout, left)
+            response = None
+            try:
+                response = self.session.get(url, **kwargs)
+                if response.status_code in RETRY_STATUSES:
+                    if response.status_code in THROTTLE_STATUSES:
+                        bucket.throttled()
+                    response.raise_for_status()
+                if response.status_code >= 400:
+                    breaker.succeeded()  # the host is up, the request itself is wrong
+                    response.raise_for_status()
+                result = parse(response) if parse else response
+            except requests.exceptions.HTTPError as e:
+                if e.response is None or e.response.status_code not in RETRY_STATUSES:
+                    raise
+                error = e
+            except (requests.exceptions.RequestException, ValueError, KeyError) as e:
+                error = e
+            else:
+                bucket.succeeded()
+                breaker.succeeded()
+                return result
+            breaker.failed()
+            print(f"Attempt {attempt + 1} failed for {url}: {error}")
+            if attempt + 1 < self.retries:
+                self._wait(attempt, response, deadline)
+        raise error
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,204 @@
+import hashlib
+import os
+import threading
+import pandas as pd
+
+from data import store
+from data import rollups
+from data import registry
+from timeseries import TimeSeriesStore
+import snapshot
+
+# ===== SHARED DATA ACCESS FOR THE DASHBOARD =====
+# Each table is loaded once per worker and kept in memory as a typed
+# DataFrame. Every lookup does a cheap os.stat(); the data is only re-read
+# when a file's mtime or size changes, so a refresh by data/fetch.py is picked
+# up on the next request without restarting the server.
+#
+# Tables come from the shared snapshot of the Parquet store (snapshot.py: one
+# memory-mapped copy for all gunicorn workers, parsed once per refresh), from
+# the store itself with INKWELL_SNAPSHOT=0, and fall back to the exported CSVs
+# when the store hasn't been built yet.
+#
+# The frames handed out are shared between requests - treat them as read-only
+# (filtering / .copy() is fine, assigning columns in place is not).
+
+DATA_DIR = "data"
+COMBINED_FILE = os.path.join(DATA_DIR, "combined_monthly.csv")
+
+
+def file_signature(path):
+    # (mtime, size) of the file on disk, or None if it is missing
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+class DatasetCache:
+    def __init__(self):
+        self._entries = {}  # key -> (signature, DataFrame)
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "reloads": 0}
+
+    def get_versioned(self, key, signature, load):
+        # (DataFrame, version token) for `key`; load() runs only when
+        # signature() differs from the cached one. None signature = missing.
+        sig = signature()
+        if sig is None:
+            with self._lock:
+                self._entries.pop(key, None)
+            return None, None
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == sig:
+                self._stats["hits"] += 1
+                return entry[1], _token(sig)
+
+        # Load outside the lock so one slow table doesn't block the others
+        df = load()
+
+        with self._lock:
+            current = self._entries.get(key)
+            if current is not None and current[0] == sig:
+                # another thread loaded the same version while we were reading
+                self._stats["hits"] += 1
+                return current[1], _token(sig)
+            self._stats["misses" if entry is None else "reloads"] += 1
+            self._entries[key] = (sig, df)
+        return df, _token(sig)
+
+    def get_csv(self, path, parse_dates=("month",)):
+        return self.get_versioned(
+            path,
+            lambda: file_signature(path),
+            lambda: pd.read_csv(path, parse_dates=list(parse_dates))
+        )
+
+    def get_table(self, table):
+        return self.get_versioned(
+            ("store", table),
+            lambda: store.signature(table),
+            lambda: store.load(table)
+        )
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["tables"] = sorted(str(key) for key in self._entries)
+        return stats
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def _token(sig):
+    # short, stable version string for any signature tuple
+    return hashlib.sha1(repr(sig).encode()).hexdigest()[:16]
+
+
+# One cache per process (i.e. per gunicorn worker)
+cache = DatasetCache()
+
+
+def load_snapshot():
+    # the shared snapshot of the store (None when disabled or there's no store)
+    return snapshot.reader.get() if snapshot.SNAPSHOT_ENABLED else None
+
+
+def load_combined_versioned():
+    snap = load_snapshot()
+    if snap is not None and "combined" in snap.tables:
+        return snap.tables["combined"], snap.version
+    if store.exists("combined"):
+        return cache.get_table("combined")
+    return cache.get_csv(COMBINED_FILE)
+
+
+def load_combined():
+    return load_combined_versioned()[0]
+
+
+def load_agency_monthly(agency):
+    snap = load_snapshot()
+    if snap is not None and "monthly" in snap.tables:
+        df = snap.tables["monthly"]
+        df = df[df["Agency"] == store.normalize_agency(agency)]
+        return df if not df.empty else None
+    if store.exists("monthly"):
+        df, _ = cache.get_table("monthly")
+        df = df[df["Agency"] == store.normalize_agency(agency)]
+        return df if not df.empty else None
+    return cache.get_csv(registry.monthly_csv(agency))[0]
+
+
+# fingerprint of the combined data per data version (one hash per snapshot)
+_fingerprints = {}
+
+
+def load_rollups(combined_df, version):
+    # precomputed totals / slope series written by data/fetch.py, or None when
+    # missing or built from other data than combined_df (compute live then)
+    path = rollups.ROLLUPS_FILE
+    built = cache.get_versioned(path, lambda: file_signature(path), lambda: rollups.load_rollups(path))[0]
+    if not built:
+        return None
+    fingerprint = _fingerprints.get(version)
+    if fingerprint is None:
+        fingerprint = rollups.fingerprint(combined_df)
+        if len(_fingerprints) >= 8:
+            _fingerprints.clear()
+        _fingerprints[version] = fingerprint
+    return rollups.matching(built, fingerprint)
+
+
+def load_timeseries_versioned():
+    # daily engine over the store's daily + monthly tables ((None, None) without a store)
+    snap = load_snapshot()
+    if snap is not None and snap.timeseries is not None:
+        return snap.timeseries, snap.version
+    if not store.exists("daily"):
+        return None, None
+    return cache.get_versioned(
+        ("timeseries",),
+        lambda: (store.signature("daily"), store.signature("monthly")),
+        TimeSeriesStore.from_store
+    )
+
+
+def load_timeseries():
+    return load_timeseries_versioned()[0]
+
+
+def load_series_versioned():
+    # the time-series engine, or one over combined_monthly.csv (monthly
+    # resolution) when the store hasn't been built yet; (None, None) without data
+    series, version = load_timeseries_versioned()
+    if series is not None:
+        return series, version
+    return cache.get_versioned(
+        ("timeseries", COMBINED_FILE),
+        lambda: file_signature(COMBINED_FILE),
+        lambda: TimeSeriesStore.from_frames(monthly=pd.read_csv(COMBINED_FILE, parse_dates=["month"]))
+    )
+
+
+def data_version():
+    snap = load_snapshot()
+    if snap is not None:
+        return snap.version
+    if store.exists("combined"):
+        sig = store.signature("combined")
+    else:
+        sig = file_signature(COMBINED_FILE)
+    return None if sig is None else _token(sig)
+
+
+def cache_stats():
+    stats = cache.stats()
+    if snapshot.SNAPSHOT_ENABLED:
+        stats["snapshot"] = snapshot.reader.stats()
+    return stats
@@ -0,0 +1,78 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+# ===== LEVEL OF DETAIL FOR LONG WINDOWS =====
+# Keeps what we send to the browser bounded as windows, agencies and
+# granularity grow:
+#   - line charts over INKWELL_LOD_MAX_POINTS points are thinned per agency
+#     with LTTB (largest-triangle-three-buckets: keeps peaks and drops, unlike
+#     plain striding) and drawn as WebGL (scattergl) traces instead of SVG
+#   - bar charts over INKWELL_LOD_MAX_BARS bars are summed into quarters, or
+#     years if quarters are still too many (WebGL has no bar trace)
+# Below the thresholds figures are exactly what they were before.
+
+MAX_LINE_POINTS = int(os.environ.get("INKWELL_LOD_MAX_POINTS", 2000))
+MAX_BARS = int(os.environ.get("INKWELL_LOD_MAX_BARS", 120))
+
+PERIODS = (("Q", "quarterly"), ("Y", "yearly"))
+
+
+def lttb_indices(x, y, threshold):
+    # positions of the `threshold` points LTTB keeps out of len(x)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    keep = np.empty(threshold, dtype="int64")
+    keep[0], keep[-1] = 0, n - 1
+    # bucket edges for the n-2 points between the fixed first and last
+    edges = np.linspace(1, n - 1, threshold - 1).astype("int64")
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        # average of the next bucket (the last point for the final bucket)
+        next_start, next_end = end, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        # point in this bucket with the largest triangle (a, point, next average)
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(area.argmax())
+        keep[i + 1] = a
+    return keep
+
+
+def downsample_lines(df, x_col, y_col, group_col="Agency", max_points=None):
+    # -> (frame, downsampled?) with at most ~max_points rows, LTTB per group
+    max_points = max_points or MAX_LINE_POINTS
+    if len(df) <= max_points:
+        return df, False
+    groups = df.groupby(group_col, sort=False, observed=True)
+    per_group = max(3, max_points // max(groups.ngroups, 1))
+    parts = []
+    for _, part in groups:
+        part = part.sort_values(x_col)
+        x = part[x_col].to_numpy()
+        if np.issubdtype(x.dtype, np.datetime64):
+            x = x.astype("datetime64[ns]").astype("int64")
+        parts.append(part.iloc[lttb_indices(x, part[y_col].to_numpy(), per_group)])
+    return pd.concat(parts), True
+
+
+def sum_bars(df, date_col, value_col, freq):
+    # bars summed per period (pandas code, e.g. "Q"), labelled by period start
+    periods = df[date_col].dt.to_period(freq).dt.start_time
+    return df.groupby(periods, sort=True)[value_col].sum().reset_index()
+
+
+def aggregate_bars(df, date_col, value_col, max_bars=None):
+    # -> (frame, label) summed into the finest of month/quarter/year that fits
+    max_bars = max_bars or MAX_BARS
+    if len(df) <= max_bars:
+        return df, "monthly"
+    for freq, label in PERIODS:
+        out = sum_bars(df, date_col, value_col, freq)
+        if len(out) <= max_bars or label == PERIODS[-1][1]:
+            return out, label
@@ -0,0 +1,77 @@
+import json
+import threading
+from collections import OrderedDict
+from contextlib import nullcontext
+from plotly.utils import PlotlyJSONEncoder
+
+# ===== BOUNDED LRU =====
+# Thread-safe LRU with hit/miss/eviction counters, shared by the figure cache
+# below and api.response_cache (encoded API responses). Keys carry the data
+# version token, so a refresh naturally misses and old entries age out.
+
+
+class LRUCache:
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = len(self._entries)
+            stats["maxsize"] = self.maxsize
+        return stats
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# ===== MEMOIZED FIGURES =====
+# Values are serialized figure JSON keyed by the callback inputs plus the data
+# version. JSON strings (not Figure objects), so nothing shared between
+# requests can be mutated by a caller.
+
+
+class FigureCache(LRUCache):
+    def get_or_build(self, key, build, timer=None):
+        # build() returns a list of plotly Figures; we hand back plain dicts.
+        # timer(stage) -> context manager, to time build / serialize / decode
+        timer = timer or _no_timer
+        cached = self.get(key)
+        if cached is None:
+            with timer("build"):
+                figures = list(build())
+            with timer("serialize"):
+                cached = json.dumps(figures, cls=PlotlyJSONEncoder)
+            self.put(key, cached)
+        with timer("decode"):
+            return json.loads(cached)
+
+
+def _no_timer(stage):
+    return nullcontext()
@@ -0,0 +1,244 @@
+import argparse
+import fcntl
+import json
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+# ===== BACKGROUND DATA REFRESH =====
+# Runs the data/fetch.py pipeline on a schedule, either inside the dashboard
+# process (INKWELL_REFRESH=1 starts a daemon thread from app.py) or on its own
+# (`python refresh.py`). Each agency has its own clock:
+#   - INKWELL_REFRESH_INTERVAL seconds after its last success (default 6h),
+#     +/- INKWELL_REFRESH_JITTER of that so agencies and restarts spread out
+#   - after a failure, exponential backoff from INKWELL_REFRESH_RETRY seconds
+#     up to INKWELL_REFRESH_MAX_BACKOFF (default: the interval)
+# After any agency refreshes, the combined table and rollups are rebuilt.
+#
+# The pipeline writes every file to a temp file and os.replace()s it, so a
+# request never reads a half-written CSV / Parquet partition; data_cache.py
+# sees the new mtimes and reloads on the next request. The shared snapshot
+# every worker maps (snapshot.py) is published at the end of the combine step.
+#
+# Only one process refreshes at a time (flock on data/.refresh.lock), so every
+# gunicorn worker can start a scheduler and the others stand by. Last refresh
+# time, duration and error per agency go to data/refresh_state.json, which
+# any worker serves at /refresh-status.
+
+REFRESH_ENABLED = os.environ.get("INKWELL_REFRESH", "0") == "1"
+REFRESH_INTERVAL = float(os.environ.get("INKWELL_REFRESH_INTERVAL", 6 * 3600))
+REFRESH_JITTER = float(os.environ.get("INKWELL_REFRESH_JITTER", 0.1))
+REFRESH_RETRY = float(os.environ.get("INKWELL_REFRESH_RETRY", 300))
+REFRESH_MAX_BACKOFF = float(os.environ.get("INKWELL_REFRESH_MAX_BACKOFF", 0)) or REFRESH_INTERVAL
+
+STATE_FILE = os.path.join("data", "refresh_state.json")
+LOCK_FILE = os.path.join("data", ".refresh.lock")
+LOCK_POLL = 60  # seconds between attempts to take over from another process
+
+def load_pipeline():
+    # data/fetch.py, imported lazily: the dashboard only pays for it when a
+    # refresh actually runs. Same data.* modules (store, metrics, ...) as the
+    # dashboard's, so there is one copy of their state per process.
+    from data import fetch
+    return fetch
+
+
+def _iso(ts):
+    return None if ts is None else datetime.fromtimestamp(ts, timezone.utc).isoformat(timespec="seconds")
+
+
+def _ts(iso):
+    return None if not iso else datetime.fromisoformat(iso).timestamp()
+
+
+def load_state(path=STATE_FILE):
+    if not os.path.exists(path):
+        return {"agencies": {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_state(state, path=STATE_FILE):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def status(path=STATE_FILE):
+    # what /refresh-status serves: the last state written by whichever process refreshes
+    state = load_state(path)
+    state["enabled"] = REFRESH_ENABLED
+    state["interval_seconds"] = REFRESH_INTERVAL
+    return state
+
+
+class RefreshScheduler:
+    def __init__(self, agencies=None, interval=REFRESH_INTERVAL, jitter=REFRESH_JITTER, retry=REFRESH_RETRY,
+                 max_backoff=REFRESH_MAX_BACKOFF, state_file=STATE_FILE, lock_file=LOCK_FILE, workers=None):
+        self.agencies = list(agencies) if agencies else None  # None = every fetched agency in data/registry.py
+        self.workers = workers  # agencies at once; None = FETCH_AGENCY_WORKERS, like `fetch.py`
+        self.interval = interval
+        self.jitter = jitter
+        self.retry = retry
+        self.max_backoff = max_backoff
+        self.state_file = state_file
+        self.lock_file = lock_file
+        self.state = {"agencies": {}}
+        self._next_run = {}  # agency -> epoch seconds
+        self._state_lock = threading.Lock()
+        self._lock_fd = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    # === scheduling ===
+    def _delay(self, failures):
+        if failures:
+            base = min(self.max_backoff, self.retry * 2 ** (failures - 1))
+        else:
+            base = self.interval
+        return max(1.0, base * (1 + random.uniform(-self.jitter, self.jitter)))
+
+    def _plan(self):
+        # next run per agency from the saved state: due `interval` after the
+        # last success, or spread over the first jitter window if never run
+        self.state = load_state(self.state_file)
+        self.state.setdefault("agencies", {})
+        now = time.time()
+        for agency in self.agencies or load_pipeline().fetched():
+            entry = self.state["agencies"].get(agency, {})
+            next_run = _ts(entry.get("next_run"))
+            if next_run is None:
+                next_run = now + random.uniform(0, self.jitter * min(self.interval, LOCK_POLL * 10))
+            self._next_run[agency] = next_run
+
+    def _acquire(self):
+        # True while this process owns the refresh lock
+        if self._lock_fd is not None:
+            return True
+        fd = open(self.lock_file, "a+")
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            fd.close()
+            return False
+        self._lock_fd = fd
+        self._plan()  # another process may have refreshed before us
+        print(f"✅ Data refresh scheduler active in pid {os.getpid()}")
+        return True
+
+    def _release(self):
+        if self._lock_fd is not None:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+            self._lock_fd.close()
+            self._lock_fd = None
+
+    # === refresh ===
+    def _refresh_one(self, fetch, agency, full):
+        start = time.time()
+        error = None
+        try:
+            fetch.refresh_agency(agency, full=full)
+        except Exception as e:  # one agency failing must not stop the others
+            error = f"{type(e).__name__}: {e}"
+        finished = time.time()
+        with self._state_lock:
+            entry = self.state["agencies"].setdefault(agency, {"failures": 0})
+            entry["last_attempt"] = _iso(start)
+            entry["duration_seconds"] = round(finished - start, 3)
+            if error is None:
+                entry.update(last_success=_iso(finished), failures=0, last_error=None)
+            else:
+                entry["failures"] = entry.get("failures", 0) + 1
+                entry["last_error"] = error
+            self._next_run[agency] = finished + self._delay(entry["failures"])
+            entry["next_run"] = _iso(self._next_run[agency])
+        if error is None:
+            print(f"✅ {agency} refreshed in {finished - start:.1f}s")
+        else:
+            print(f"⚠️ {agency} refresh failed ({error}), retrying at {entry['next_run']}")
+        return error is None
+
+    def refresh(self, agencies, full=False):
+        # fetch + save the given agencies in parallel, then rebuild combined / rollups
+        fetch = load_pipeline()
+        fetch.prepare_store()
+        workers = max(1, min(len(agencies), self.workers or fetch.FETCH_AGENCY_WORKERS))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="refresh") as pool:
+            jobs = {agency: pool.submit(self._refresh_one, fetch, agency, full) for agency in agencies}
+        refreshed = [agency for agency, job in jobs.items() if job.result()]
+        if refreshed:
+            start = time.time()
+            try:
+                fetch.combine()  # publishes the new snapshot too
+                self.state["combined"] = {"last_success": _iso(time.time()),
+                                          "duration_seconds": round(time.time() - start, 3)}
+            except Exception as e:
+                print(f"⚠️ Combine step failed ({type(e).__name__}: {e}), keeping the previous combined table")
+        with self._state_lock:
+            self.state["pid"] = os.getpid()
+            self.state["updated"] = _iso(time.time())
+            save_state(self.state, self.state_file)
+        return refreshed
+
+    def run_forever(self):
+        while not self._stop.is_set():
+            if not self._acquire():
+                self._stop.wait(LOCK_POLL)  # another process is refreshing
+                continue
+            now = time.time()
+            due = [agency for agency, next_run in self._next_run.items() if next_run <= now]
+            if due:
+                self.refresh(due)
+            wait = min(self._next_run.values()) - time.time()
+            self._stop.wait(min(max(wait, 1.0), LOCK_POLL))
+        self._release()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.run_forever, name="inkwell-refresh", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
+# One scheduler per process (started by app.py when INKWELL_REFRESH=1)
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def start_background_refresh(**kwargs):
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = RefreshScheduler(**kwargs).start()
+    return _scheduler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Refresh the dashboard data on a schedule")
+    parser.add_argument("--once", action="store_true", help="refresh every agency now and exit")
+    parser.add_argument("--agencies", nargs="*", help="only these agencies (default: all)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="agencies refreshed at the same time (default: FETCH_AGENCY_WORKERS)")
+    args = parser.parse_args()
+
+    scheduler = RefreshScheduler(agencies=args.agencies, workers=args.workers)
+    if args.once:
+        if not scheduler._acquire():
+            sys.exit("⚠️ Another process is refreshing the data right now")
+        scheduler.refresh(scheduler.agencies or load_pipeline().fetched())
+        scheduler._release()
+    else:
+        try:
+            scheduler.run_forever()
+        except KeyboardInterrupt:
+            scheduler._release()
@@ -0,0 +1,207 @@
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import threading
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from data import store
+from timeseries import TimeSeriesStore
+
+# ===== SHARED READ-ONLY DATA SNAPSHOT (all gunicorn workers) =====
+# The store's tables are published once per refresh as a versioned snapshot:
+#   data/snapshot/<version>/<table>.arrow     Arrow IPC, uncompressed, one chunk
+#   data/snapshot/<version>/timeseries.npy    TimeSeriesStore values (int32)
+#   data/snapshot/<version>/timeseries.json   its agencies + resolutions
+#   data/snapshot/CURRENT                     the version workers should use
+# Every worker memory-maps the same files and builds its DataFrames as numpy
+# views onto the mapping (typed columns, categorical Agency), so the data
+# lives once in the page cache however many workers run, and only the worker
+# that publishes a version parses the store.
+#
+# The version is a hash of the store's file signatures, taken by whoever
+# publishes: the writers, once the store is complete - data/fetch.py's combine
+# step, which refresh.py runs too - never a request. CURRENT is written last,
+# so it only ever names a finished snapshot, and it is the one file a worker
+# reads per lookup: partitions rewritten one by one during a refresh don't
+# make workers parse (or publish) intermediate versions. Only when there is
+# no CURRENT yet (a store built before snapshots existed) does the first
+# worker publish one, under data/snapshot/.lock while the others wait.
+#
+# Columns are read-only views (only the one-byte Agency codes are copied per
+# worker): filtering / .copy() is fine, assigning in place raises.
+# INKWELL_SNAPSHOT=0 goes back to a private copy per worker.
+
+SNAPSHOT_ENABLED = os.environ.get("INKWELL_SNAPSHOT", "1") == "1"
+SNAPSHOT_DIR = os.path.join("data", "snapshot")
+TABLES = ("daily", "monthly", "combined")
+KEEP_VERSIONS = 2  # the previous version stays until the next publish, for workers still switching
+
+
+def store_version(store_dir=store.STORE_DIR):
+    # None without a store; changes whenever any partition is rewritten
+    sigs = tuple(store.signature(table, store_dir) for table in TABLES)
+    if not any(sigs):
+        return None
+    return hashlib.sha1(repr(sigs).encode()).hexdigest()[:16]
+
+
+def current_version(snapshot_dir=SNAPSHOT_DIR):
+    try:
+        with open(os.path.join(snapshot_dir, "CURRENT")) as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+# === publishing (one process per version) ===
+def _write_table(df, path, version, table):
+    columns = {}
+    for name in df.columns:
+        if name == "Agency":
+            agency = df["Agency"].astype("category").cat
+            columns[name] = pa.DictionaryArray.from_arrays(
+                pa.array(agency.codes.to_numpy()), pa.array(agency.categories.astype(str).tolist())
+            )
+        else:
+            columns[name] = pa.array(df[name].to_numpy())
+    data = pa.table(columns).replace_schema_metadata({
+        "inkwell.version": version,
+        "inkwell.table": table,
+        "inkwell.built": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    })
+    with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, data.schema) as writer:
+        writer.write_table(data)
+
+
+def _build(version, store_dir, out_dir):
+    for table in TABLES:
+        df = store.load(table, store_dir=store_dir)
+        if df is not None:
+            _write_table(df, os.path.join(out_dir, f"{table}.arrow"), version, table)
+    if store.exists("daily", store_dir):
+        series = TimeSeriesStore.from_store(store_dir)
+        np.save(os.path.join(out_dir, "timeseries.npy"), series.values)
+        with open(os.path.join(out_dir, "timeseries.json"), "w") as f:
+            json.dump({"agencies": series.agencies, "resolutions": series.resolutions}, f)
+
+
+def publish(store_dir=store.STORE_DIR, snapshot_dir=SNAPSHOT_DIR):
+    # Make sure a snapshot of the store as it is now exists -> its version.
+    # Safe to call from any number of processes at once.
+    return _publish(store_dir, snapshot_dir)[0]
+
+
+def _publish(store_dir, snapshot_dir):
+    # -> (version, whether this call built it)
+    os.makedirs(snapshot_dir, exist_ok=True)
+    with open(os.path.join(snapshot_dir, ".lock"), "a+") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        version = store_version(store_dir)
+        if version is None or current_version(snapshot_dir) == version:
+            return version, False
+        tmp = os.path.join(snapshot_dir, f".{version}.tmp")
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        _build(version, store_dir, tmp)
+        final = os.path.join(snapshot_dir, version)
+        shutil.rmtree(final, ignore_errors=True)
+        os.rename(tmp, final)
+        with open(os.path.join(snapshot_dir, ".CURRENT.tmp"), "w") as f:
+            f.write(version)
+        os.replace(os.path.join(snapshot_dir, ".CURRENT.tmp"), os.path.join(snapshot_dir, "CURRENT"))
+        _prune(snapshot_dir, version)
+    print(f"✅ Data snapshot {version} published")
+    return version, True
+
+
+def _prune(snapshot_dir, keep_version):
+    # drop all but the newest KEEP_VERSIONS; a worker that still maps an
+    # unlinked file keeps reading it until it moves on
+    versions = sorted(
+        (entry for entry in os.scandir(snapshot_dir) if entry.is_dir() and not entry.name.startswith(".")),
+        key=lambda entry: entry.stat().st_mtime_ns, reverse=True
+    )
+    for entry in versions[KEEP_VERSIONS:]:
+        if entry.name != keep_version:
+            shutil.rmtree(entry.path, ignore_errors=True)
+
+
+# === attaching (every worker) ===
+def _read_table(path):
+    # DataFrame whose columns are views onto the memory-mapped Arrow file
+    data = pa.ipc.open_file(pa.memory_map(path)).read_all()
+    columns = {}
+    for name in data.column_names:
+        chunk = data.column(name).chunk(0)
+        if pa.types.is_dictionary(chunk.type):
+            dtype = pd.CategoricalDtype(chunk.dictionary.to_pylist())
+            columns[name] = pd.Categorical.from_codes(chunk.indices.to_numpy(zero_copy_only=True), dtype=dtype)
+        else:
+            columns[name] = chunk.to_numpy(zero_copy_only=True)
+    return pd.DataFrame(columns, copy=False)
+
+
+class Snapshot:
+    def __init__(self, version, path):
+        self.version = version
+        self.path = path
+        self.tables = {}
+        for table in TABLES:
+            file = os.path.join(path, f"{table}.arrow")
+            if os.path.exists(file):
+                self.tables[table] = _read_table(file)
+        self.timeseries = None
+        if os.path.exists(os.path.join(path, "timeseries.npy")):
+            with open(os.path.join(path, "timeseries.json")) as f:
+                meta = json.load(f)
+            values = np.load(os.path.join(path, "timeseries.npy"), mmap_mode="r")
+            self.timeseries = TimeSeriesStore(meta["agencies"], values, meta["resolutions"])
+
+
+class SnapshotReader:
+    def __init__(self, store_dir=store.STORE_DIR, snapshot_dir=SNAPSHOT_DIR):
+        self.store_dir = store_dir
+        self.snapshot_dir = snapshot_dir
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self._stats = {"attaches": 0, "publishes": 0}
+
+    def get(self):
+        # the Snapshot CURRENT names (None without a store); one small read
+        version = current_version(self.snapshot_dir)
+        if version is None and (not os.path.isdir(self.store_dir) or store_version(self.store_dir) is None):
+            return None  # no store: data_cache reads the CSVs
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == version:
+            return snapshot
+        with self._lock:
+            if version is None:
+                # nothing published yet: the first worker does it once, the
+                # others wait on the lock and find it there
+                version, built = _publish(self.store_dir, self.snapshot_dir)
+                self._stats["publishes"] += built
+                if version is None:
+                    return None
+            if self._snapshot is None or self._snapshot.version != version:
+                try:
+                    self._snapshot = Snapshot(version, os.path.join(self.snapshot_dir, version))
+                except FileNotFoundError:
+                    # pruned between reading CURRENT and opening it: the
+                    # next lookup attaches to the newer version
+                    return self._snapshot
+                self._stats["attaches"] += 1
+            return self._snapshot
+
+    def stats(self):
+        snapshot = self._snapshot
+        return {**self._stats, "version": snapshot.version if snapshot else None}
+
+
+# One reader per process (i.e. per gunicorn worker)
+reader = SnapshotReader()
@@ -0,0 +1,113 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from data import store
+
+# ===== DAILY TIME-SERIES ENGINE =====
+# Every agency's counts as one dense int32 row per agency, indexed by day
+# ordinal since 2010-01-01 (a few hundred KB for all agencies). Built from the
+# store's daily table; agencies we only have monthly counts for (NOAA,
+# Census) are placed on the first day of each month, so they resample exactly
+# to months and coarser but show as monthly lumps at day/week resolution.
+#
+# Per-frequency period sums are computed once per snapshot with
+# np.add.reduceat over the day axis; slicing a date range is then a binary
+# search over period starts. No extra files: any granularity comes from the
+# same arrays.
+
+EPOCH = np.datetime64("2010-01-01", "D")
+
+# dashboard names -> pandas period codes (weeks run Monday-Sunday)
+FREQUENCIES = {"day": "D", "week": "W", "month": "M", "quarter": "Q", "year": "Y"}
+
+
+class TimeSeriesStore:
+    def __init__(self, agencies, values, resolutions):
+        self.agencies = list(agencies)
+        self._row = {agency: i for i, agency in enumerate(self.agencies)}
+        self.values = values            # int32[n_agencies, n_days]
+        self.resolutions = resolutions  # agency -> "day" | "month"
+        self.days = EPOCH + np.arange(values.shape[1])
+        self._periods = {}              # freq -> (period starts, sums)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_frames(cls, daily=None, monthly=None, end=None):
+        # daily: created_date/Agency/datasets_created; monthly: month/Agency/...
+        # (monthly rows are only used for agencies without daily data)
+        parts = []
+        resolutions = {}
+        if daily is not None and not daily.empty:
+            parts.append(daily.rename(columns={"created_date": "date"})[["date", "Agency", "datasets_created"]])
+            resolutions.update({str(a): "day" for a in daily["Agency"].unique()})
+        if monthly is not None and not monthly.empty:
+            only_monthly = monthly[~monthly["Agency"].astype(str).isin(resolutions)]
+            parts.append(only_monthly.rename(columns={"month": "date"})[["date", "Agency", "datasets_created"]])
+            resolutions.update({str(a): "month" for a in only_monthly["Agency"].unique()})
+        frame = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=["date", "Agency", "datasets_created"])
+
+        day = (pd.to_datetime(frame["date"]).to_numpy().astype("datetime64[D]") - EPOCH).astype("int64")
+        keep = day >= 0  # nothing before 2010 is tracked
+        last = np.datetime64(pd.Timestamp.today() if end is None else pd.Timestamp(end), "D")
+        n_days = max(int((last - EPOCH).astype("int64")), int(day.max()) if len(day) else 0) + 1
+
+        agencies = sorted(resolutions)
+        codes = pd.Categorical(frame["Agency"].astype(str), categories=agencies).codes
+        values = np.zeros((len(agencies), n_days), dtype="int32")
+        np.add.at(values, (codes[keep], day[keep]), frame["datasets_created"].to_numpy()[keep].astype("int32"))
+        return cls(agencies, values, resolutions)
+
+    @classmethod
+    def from_store(cls, store_dir=store.STORE_DIR):
+        return cls.from_frames(store.load("daily", store_dir=store_dir), store.load("monthly", store_dir=store_dir))
+
+    def has(self, agency):
+        return store.normalize_agency(agency) in self._row
+
+    def _period_sums(self, freq):
+        # (period start dates, int64[n_agencies, n_periods]) for the whole range
+        with self._lock:
+            cached = self._periods.get(freq)
+        if cached is not None:
+            return cached
+        periods = pd.DatetimeIndex(self.days).to_period(freq).asi8
+        starts = np.flatnonzero(np.r_[True, periods[1:] != periods[:-1]])
+        labels = pd.PeriodIndex.from_ordinals(periods[starts], freq=freq).start_time.to_numpy()
+        sums = np.add.reduceat(self.values, starts, axis=1, dtype="int64")
+        with self._lock:
+            self._periods[freq] = (labels, sums)
+        return labels, sums
+
+    def resample(self, granularity="month", start=None, end=None, agencies=None, drop_zero=True):
+        # Long frame [period, Agency, datasets_created] for periods whose start
+        # lies in [start, end]; the last (current) period may be partial.
+        freq = FREQUENCIES.get(granularity, granularity)
+        labels, sums = self._period_sums(freq)
+        lo = 0 if start is None else int(np.searchsorted(labels, np.datetime64(pd.Timestamp(start)), side="left"))
+        hi = len(labels) if end is None else int(np.searchsorted(labels, np.datetime64(pd.Timestamp(end)), side="right"))
+
+        names = self.agencies if agencies is None else [store.normalize_agency(a) for a in agencies]
+        rows = [self._row[name] for name in names if name in self._row]
+        block = sums[rows, lo:hi]
+        out = pd.DataFrame({
+            "period": np.tile(labels[lo:hi], len(rows)),
+            "Agency": np.repeat([self.agencies[r] for r in rows], hi - lo),
+            "datasets_created": block.ravel(),
+        })
+        if drop_zero:
+            out = out[out["datasets_created"] > 0].reset_index(drop=True)
+        return out
+
+    def peaks(self, granularity="month"):
+        # each agency's largest period over the whole history -> Series by agency
+        _, sums = self._period_sums(FREQUENCIES.get(granularity, granularity))
+        return pd.Series(sums.max(axis=1, initial=0), index=self.agencies)
+
+    def daily(self, agency, start=None, end=None):
+        # raw day slice for one agency -> (dates, counts); O(1) index math
+        row = self._row[store.normalize_agency(agency)]
+        lo = 0 if start is None else max(0, int((np.datetime64(pd.Timestamp(start), "D") - EPOCH).astype("int64")))
+        hi = self.values.shape[1] if end is None else int((np.datetime64(pd.Timestamp(end), "D") - EPOCH).astype("int64")) + 1
+        return self.days[lo:hi], self.values[row, lo:hi]